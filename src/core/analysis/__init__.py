@@ -0,0 +1,7 @@
+"""
+Analysis tools for Teletypathy encodings.
+
+The tools are command-line modules (python -m src.core.analysis.<tool>)
+and are not imported here, so that running one does not import it twice;
+import them from their submodules.
+"""
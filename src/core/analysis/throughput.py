@@ -0,0 +1,450 @@
+"""
+Transmission-time and throughput estimation for Teletypathy encoders.
+
+Streams a text file or a directory of text files through one or more
+encoders and reports total playback duration, characters and words per
+minute, pattern count, mode switches and actuator-on time.
+
+Durations are computed from a histogram of distinct patterns (encoders
+share pattern instances), and the gap and mode-switch arithmetic runs on
+numpy arrays. Table-driven encoders (letter, single_byte) are indexed
+straight from code points with numpy and run at roughly 20 MB of text per
+second, so a multi-GB corpus takes minutes. Other encoders tokenize words,
+phonemes or symbols in Python and run at 1-2 MB/s (multi_ring well below),
+so use a sample of the corpus for them. Requires numpy.
+
+Usage:
+
+    python -m src.core.analysis.throughput article_text.txt \\
+        -e single_byte -e phoneme -e hybrid:adaptive -e word
+"""
+
+import os
+import sys
+from dataclasses import asdict, dataclass
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from ..encoding.hybrid import HybridEncoder
+from ..encoding.multi_ring import MultiRingPhonemeEncoder
+from ..encoding.pattern import Pattern, PatternEncoder
+from ..encoding.phoneme import PhonemeEncoder
+from ..encoding.single_byte import SingleByteEncoder
+from ..encoding.symbol_stream import SPACE_CODE, SymbolStreamEncoder
+from ..encoding.timeline import NO_SPACING, SpacingRules
+from ..encoding.word import WordEncoder
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is an optional dependency
+    np = None
+
+
+# Encoder specs: name[:option]
+ENCODERS = {
+    'letter': lambda option: PatternEncoder(),
+    'phoneme': lambda option: PhonemeEncoder(),
+    'single_byte': lambda option: SingleByteEncoder(option or 'ring_based'),
+    'hybrid': lambda option: HybridEncoder(option or 'adaptive'),
+    'word': lambda option: WordEncoder(fallback=option or 'character'),
+    'symbol_stream': lambda option: SymbolStreamEncoder(option or 'adaptive'),
+    'multi_ring': lambda option: MultiRingPhonemeEncoder(overflow=option or 'sequential'),
+}
+
+DEFAULT_ENCODERS = ('letter', 'phoneme', 'single_byte', 'hybrid:adaptive', 'word', 'symbol_stream')
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+DEFAULT_BATCH_SIZE = 1 << 16
+
+# Pattern categories for gap arithmetic
+_EMPTY, _SYMBOL, _SENTENCE = 0, 1, 2
+
+# Mode ID of whitespace, which keeps the mode of the surrounding text
+_NO_MODE = -1
+
+
+@dataclass
+class ThroughputStats:
+    """Throughput of one encoder over a corpus."""
+    encoder: str
+    characters: int
+    words: int
+    patterns: int              # Non-empty patterns played
+    pattern_ms: int            # Sum of pattern durations
+    gap_ms: int                # Sum of spacing gaps
+    actuator_on_ms: int        # Sum of all actuator activation durations
+    mode_switches: int         # Changes of encoding mode between consecutive patterns
+
+    @property
+    def duration_ms(self) -> int:
+        """Total playback duration (ms)."""
+        return self.pattern_ms + self.gap_ms
+
+    @property
+    def minutes(self) -> float:
+        """Total playback duration (minutes)."""
+        return self.duration_ms / 60000
+
+    @property
+    def cps(self) -> float:
+        """Characters per second."""
+        return self.characters * 1000 / self.duration_ms if self.duration_ms else 0.0
+
+    @property
+    def wpm(self) -> float:
+        """Words per minute."""
+        return self.words * 60000 / self.duration_ms if self.duration_ms else 0.0
+
+    def to_dict(self) -> dict:
+        """Get the fields and derived metrics as a dictionary."""
+        result = asdict(self)
+        result.update(duration_ms=self.duration_ms, minutes=self.minutes,
+                      cps=self.cps, wpm=self.wpm)
+        return result
+
+
+def create_encoder(spec: str):
+    """
+    Create an encoder from a spec such as 'single_byte:pure' or 'hybrid:word_level'.
+
+    Args:
+        spec: Encoder name (see ENCODERS), optionally followed by ':option'
+            (mode, strategy, fallback or overflow strategy)
+
+    Returns:
+        Encoder instance
+    """
+    name, _, option = spec.partition(':')
+    factory = ENCODERS.get(name)
+    if factory is None:
+        raise ValueError(f"Unknown encoder: {name} (choose from {', '.join(ENCODERS)})")
+    return factory(option or None)
+
+
+def iter_corpus(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[str]:
+    """
+    Read a text file, or every file under a directory, in chunks.
+
+    Files in a directory are read in sorted order; undecodable bytes are
+    replaced.
+
+    Args:
+        path: File or directory
+        chunk_size: Characters per chunk
+
+    Yields:
+        Text chunks
+    """
+    if os.path.isdir(path):
+        paths = sorted(
+            os.path.join(root, name)
+            for root, _, names in os.walk(path)
+            for name in names
+        )
+    else:
+        paths = [path]
+    for file_path in paths:
+        with open(file_path, encoding='utf-8', errors='replace') as f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+
+class _TextCounter:
+    """Counts characters and words of chunks passing through it."""
+
+    def __init__(self, chunks: Iterable[str]):
+        self.chunks = chunks
+        self.characters = 0
+        self.words = 0
+        self._in_word = False
+
+    def __iter__(self) -> Iterator[str]:
+        for chunk in self.chunks:
+            if not chunk:
+                continue
+            self.characters += len(chunk)
+            words = len(chunk.split())
+            if self._in_word and not chunk[0].isspace():
+                words -= 1  # Word continues from the previous chunk
+            self.words += words
+            self._in_word = not chunk[-1].isspace()
+            yield chunk
+
+
+class _PatternHistogram:
+    """
+    Accumulates playback statistics over batches of pattern indices.
+
+    Distinct patterns are registered once; each batch is an array of
+    indices into them, plus an optional parallel array of mode IDs.
+    """
+
+    def __init__(self, rules: SpacingRules):
+        self.rules = rules
+        self.durations: List[int] = []
+        self.on_times: List[int] = []
+        self.categories: List[int] = []
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.gap_ms = 0
+        self.mode_switches = 0
+        self._started = False
+        self._last_category = _EMPTY
+        self._last_mode = _NO_MODE
+        self._pending_boundary = False
+        self._arrays = None
+
+    def register(self, pattern: Pattern) -> int:
+        """Register a distinct pattern and get its index."""
+        if not pattern.events:
+            category = _EMPTY
+        elif pattern in self.rules.sentence_patterns:
+            category = _SENTENCE
+        else:
+            category = _SYMBOL
+        self.durations.append(pattern.total_duration_ms)
+        self.on_times.append(sum(event.duration_ms for event in pattern.events))
+        self.categories.append(category)
+        self._arrays = None
+        return len(self.durations) - 1
+
+    def add(self, index: 'np.ndarray', modes: Optional['np.ndarray'] = None):
+        """Add a batch of pattern indices (in playback order)."""
+        if not len(index):
+            return
+        if self._arrays is None:
+            self._arrays = np.array(self.categories, dtype=np.int8)
+        counts = np.bincount(index, minlength=len(self.durations))
+        if len(self.counts) < len(counts):
+            self.counts = np.concatenate(
+                (self.counts, np.zeros(len(counts) - len(self.counts), dtype=np.int64)))
+        self.counts[:len(counts)] += counts
+
+        categories = self._arrays.take(index)
+        played = np.flatnonzero(categories)
+        if not len(played):
+            self._pending_boundary = self._pending_boundary or self._started
+            return
+
+        rules = self.rules
+        # Gap before each played pattern but the first of the batch
+        gaps = np.full(len(played) - 1, rules.symbol_gap_ms, dtype=np.int64)
+        if len(played) > 1:
+            boundary = np.diff(played) > 1
+            gaps = np.where(boundary, np.maximum(gaps, rules.word_gap_ms), gaps)
+            sentence = categories.take(played[:-1]) == _SENTENCE
+            gaps = np.where(sentence, np.maximum(gaps, rules.sentence_gap_ms), gaps)
+        self.gap_ms += int(gaps.sum())
+        if self._started:
+            gap = rules.symbol_gap_ms
+            if self._pending_boundary or played[0] > 0:
+                gap = max(gap, rules.word_gap_ms)
+            if self._last_category == _SENTENCE:
+                gap = max(gap, rules.sentence_gap_ms)
+            self.gap_ms += gap
+
+        if modes is not None:
+            played_modes = modes.take(played)
+            played_modes = played_modes[played_modes != _NO_MODE]
+            if len(played_modes):
+                self.mode_switches += int(np.count_nonzero(played_modes[1:] != played_modes[:-1]))
+                if self._last_mode != _NO_MODE and played_modes[0] != self._last_mode:
+                    self.mode_switches += 1
+                self._last_mode = played_modes[-1]
+
+        self._started = True
+        self._last_category = int(categories[played[-1]])
+        self._pending_boundary = played[-1] < len(categories) - 1
+
+    def totals(self) -> Tuple[int, int, int]:
+        """Get (patterns played, pattern ms, actuator-on ms)."""
+        counts = self.counts
+        size = len(counts)
+        played = int(counts[np.array(self.categories[:size], dtype=np.int8) != _EMPTY].sum())
+        pattern_ms = int(counts @ np.array(self.durations[:size], dtype=np.int64))
+        on_ms = int(counts @ np.array(self.on_times[:size], dtype=np.int64))
+        return played, pattern_ms, on_ms
+
+
+def _iter_pattern_batches(encoder, chunks: Iterable[str], histogram: _PatternHistogram,
+                          batch_size: int) -> Iterator[Tuple['np.ndarray', Optional['np.ndarray']]]:
+    """Encode chunks into batches of (pattern indices, mode IDs)."""
+    # Fixed 256-entry tables: index patterns by byte code, no lookups needed
+    if isinstance(encoder, SymbolStreamEncoder):
+        for pattern in encoder.renderer.pattern_table:
+            histogram.register(pattern)
+        symbols = encoder.iter_encode_symbols(chunks)
+        while True:
+            batch = b''.join(islice(symbols, batch_size))
+            if not batch:
+                return
+            codes = np.frombuffer(batch, dtype=np.uint8)
+            modes = (codes >> 7).astype(np.int8)
+            modes[codes == SPACE_CODE] = _NO_MODE
+            yield codes.astype(np.intp), modes
+    if isinstance(encoder, SingleByteEncoder):
+        for pattern in encoder.pattern_table:
+            histogram.register(pattern)
+        for chunk in chunks:
+            yield SingleByteEncoder._to_codes(chunk).astype(np.intp), None
+        return
+    if isinstance(encoder, PatternEncoder) and type(encoder).iter_encode is PatternEncoder.iter_encode:
+        # Character table: index patterns by code point, dropping unmapped characters
+        table = encoder.pattern_table
+        lookup = np.full(max(map(ord, table)) + 1, -1, dtype=np.intp)
+        for char, pattern in table.items():
+            lookup[ord(char)] = histogram.register(pattern)
+        for chunk in chunks:
+            points = np.frombuffer(chunk.encode('utf-32-le'), dtype='<u4')
+            index = lookup.take(points[points < len(lookup)])
+            yield index[index >= 0], None
+        return
+
+    # Generic path: index distinct patterns by value, so encoders that build
+    # fresh Pattern objects register each distinct pattern only once
+    registered: Dict[Pattern, int] = {}
+    mode_ids: Dict[Optional[str], int] = {None: _NO_MODE}
+
+    def index_batch(batch: List[Pattern]) -> 'np.ndarray':
+        for pattern in dict.fromkeys(batch):
+            if pattern not in registered:
+                registered[pattern] = histogram.register(pattern)
+        return np.fromiter(map(registered.__getitem__, batch), dtype=np.intp, count=len(batch))
+
+    if hasattr(encoder, 'iter_encode_segments'):
+        batch: List[Pattern] = []
+        modes: List[int] = []
+        for mode, patterns in encoder.iter_encode_segments(chunks):
+            mode_id = mode_ids.setdefault(mode, len(mode_ids) - 1)
+            batch.extend(patterns)
+            modes.extend([mode_id] * len(patterns))
+            if len(batch) >= batch_size:
+                yield index_batch(batch), np.array(modes, dtype=np.int16)
+                batch, modes = [], []
+        if batch:
+            yield index_batch(batch), np.array(modes, dtype=np.int16)
+        return
+
+    patterns = encoder.iter_encode(chunks)
+    while True:
+        batch = list(islice(patterns, batch_size))
+        if not batch:
+            return
+        yield index_batch(batch), None
+
+
+def measure_throughput(encoder, chunks: Iterable[str], name: Optional[str] = None,
+                       rules: Optional[SpacingRules] = None,
+                       batch_size: int = DEFAULT_BATCH_SIZE) -> ThroughputStats:
+    """
+    Stream text through an encoder and measure its playback throughput.
+
+    Patterns are played back to back with the gaps of the spacing rules
+    (none by default, as in the transmission analyses).
+
+    Mode switches are counted between consecutive non-empty patterns:
+    character/phoneme/contraction segments for HybridEncoder, the mode bit
+    for SymbolStreamEncoder; other encoders report 0. Whitespace keeps the
+    mode of the text around it.
+
+    Args:
+        encoder: Any encoder with iter_encode()
+        chunks: Text chunks (e.g. from iter_corpus)
+        name: Label for the result (defaults to the encoder class name)
+        rules: Spacing rules (defaults to NO_SPACING)
+        batch_size: Patterns per vectorized batch
+
+    Returns:
+        ThroughputStats
+    """
+    if np is None:
+        raise ImportError("measure_throughput requires numpy (pip install numpy)")
+
+    text = _TextCounter(chunks)
+    histogram = _PatternHistogram(rules if rules is not None else NO_SPACING)
+    for index, modes in _iter_pattern_batches(encoder, text, histogram, batch_size):
+        histogram.add(index, modes)
+    played, pattern_ms, on_ms = histogram.totals()
+    return ThroughputStats(
+        encoder=name or type(encoder).__name__,
+        characters=text.characters,
+        words=text.words,
+        patterns=played,
+        pattern_ms=pattern_ms,
+        gap_ms=histogram.gap_ms,
+        actuator_on_ms=on_ms,
+        mode_switches=histogram.mode_switches,
+    )
+
+
+def analyze_corpus(path: str, specs: Sequence[str] = DEFAULT_ENCODERS,
+                   rules: Optional[SpacingRules] = None,
+                   chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[ThroughputStats]:
+    """
+    Measure every encoder spec over a text file or directory.
+
+    Args:
+        path: File or directory
+        specs: Encoder specs (see create_encoder)
+        rules: Spacing rules (defaults to NO_SPACING)
+        chunk_size: Characters per read
+
+    Returns:
+        One ThroughputStats per spec
+    """
+    return [
+        measure_throughput(create_encoder(spec), iter_corpus(path, chunk_size), spec, rules)
+        for spec in specs
+    ]
+
+
+def format_table(results: Sequence[ThroughputStats]) -> str:
+    """Format results as a plain-text table."""
+    header = (f"{'Encoder':<24} {'Duration':>10} {'cps':>7} {'wpm':>7} {'Patterns':>10} "
+              f"{'Switches':>9} {'On-time':>10}")
+    lines = [header, '-' * len(header)]
+    for r in results:
+        lines.append(
+            f"{r.encoder:<24} {r.minutes:>8.2f} m {r.cps:>7.1f} {r.wpm:>7.1f} {r.patterns:>10,} "
+            f"{r.mode_switches:>9,} {r.actuator_on_ms / 60000:>8.2f} m")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(
+        description="Estimate playback duration and throughput of Teletypathy encoders.")
+    parser.add_argument('path', help="Text file or directory of text files")
+    parser.add_argument('-e', '--encoder', action='append', dest='encoders',
+                        help="Encoder spec, repeatable (e.g. single_byte:pure, "
+                             "hybrid:word_level, word:phoneme, multi_ring:split). "
+                             f"Default: {' '.join(DEFAULT_ENCODERS)}")
+    parser.add_argument('--spacing', metavar='SYMBOL,WORD,SENTENCE',
+                        help="Gaps in ms between symbols, words and sentences (default: none)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    rules = None
+    if args.spacing:
+        try:
+            symbol, word, sentence = (int(value) for value in args.spacing.split(','))
+        except ValueError:
+            parser.error("--spacing expects three integers, e.g. 150,350,700")
+        rules = SpacingRules(symbol, word, sentence)
+
+    results = analyze_corpus(args.path, args.encoders or DEFAULT_ENCODERS, rules, args.chunk_size)
+    if args.json:
+        print(json.dumps([r.to_dict() for r in results], indent=2))
+    else:
+        print(format_table(results))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
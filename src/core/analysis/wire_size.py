@@ -0,0 +1,246 @@
+"""
+Wire size of Teletypathy patterns in each protocol encoding.
+
+Compares the PATTERN payload bytes needed by the legacy (version 0),
+packed (version 1) and compact chord-step (version 2) encodings, either
+over the distinct patterns of an encoder's table or weighted by how
+often each pattern occurs in a corpus. Sizes are computed once per
+distinct pattern (encoders share pattern instances).
+
+Patterns that use actuators beyond 0-7 (multi-ring layouts) cannot be
+sent in the compact format; they are counted at their packed size and
+reported as fallbacks.
+
+Usage:
+
+    python -m src.core.analysis.wire_size -e letter -e phoneme -e single_byte
+    python -m src.core.analysis.wire_size article_text.txt -e hybrid:adaptive -e word
+"""
+
+import sys
+from dataclasses import asdict, dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from ..encoding.pattern import Pattern
+from ..protocol import codec
+from ..protocol.message import PatternMessage
+from .throughput import DEFAULT_CHUNK_SIZE, create_encoder, iter_corpus
+
+DEFAULT_ENCODERS = ('letter', 'phoneme', 'single_byte')
+
+# Attributes holding an encoder's pattern table
+_TABLE_ATTRIBUTES = ('pattern_table', 'phoneme_table')
+
+
+@dataclass
+class WireSizeStats:
+    """Pattern payload sizes of one encoder in each encoding."""
+    encoder: str
+    patterns: int              # Non-empty patterns measured
+    events: int                # Actuator events in those patterns
+    steps: int                 # Chord steps in those patterns (compact format)
+    legacy_bytes: int          # Version 0 PATTERN payload bytes
+    packed_bytes: int          # Version 1 PATTERN payload bytes
+    compact_bytes: int         # Version 2 PATTERN payload bytes
+    fallbacks: int             # Patterns not expressible as steps (counted packed)
+
+    @property
+    def compact_ratio(self) -> float:
+        """Compact size as a fraction of the packed size."""
+        return self.compact_bytes / self.packed_bytes if self.packed_bytes else 0.0
+
+    def bytes_per_pattern(self, version: int) -> float:
+        """
+        Get the mean payload size of a pattern.
+
+        Args:
+            version: Encoding version (0, 1 or 2)
+
+        Returns:
+            Mean bytes per pattern
+        """
+        total = (self.legacy_bytes, self.packed_bytes, self.compact_bytes)[version]
+        return total / self.patterns if self.patterns else 0.0
+
+    def to_dict(self) -> dict:
+        """Convert to a JSON-serializable dictionary."""
+        result = asdict(self)
+        result['compact_ratio'] = self.compact_ratio
+        return result
+
+
+def pattern_events(pattern: Pattern) -> List[dict]:
+    """
+    Convert a pattern to protocol event dictionaries.
+
+    Args:
+        pattern: Pattern to convert
+
+    Returns:
+        List of actuator events as used by PatternMessage
+    """
+    return [
+        {
+            'actuator': event.actuator_id,
+            'time_offset': event.time_offset_ms,
+            'duration': event.duration_ms,
+            'intensity': event.intensity
+        }
+        for event in pattern.events
+    ]
+
+
+def pattern_sizes(pattern: Pattern) -> Tuple[int, int, int, int]:
+    """
+    Get the PATTERN payload size of a pattern in each encoding.
+
+    Args:
+        pattern: Non-empty pattern
+
+    Returns:
+        (legacy bytes, packed bytes, compact bytes, compact steps); compact
+        bytes and steps are -1 if the pattern cannot be sent as steps
+    """
+    message = PatternMessage('\0', pattern_events(pattern))
+    packed = len(codec.encode_payload(message, codec.CODEC_VERSION))
+    try:
+        compact = codec.encode_payload(message, codec.COMPACT_VERSION)
+    except ValueError:
+        return len(message.payload), packed, -1, -1
+    return len(message.payload), packed, len(compact), compact[1]
+
+
+def table_patterns(encoder) -> List[Pattern]:
+    """
+    Get the distinct non-empty patterns of an encoder's table.
+
+    Args:
+        encoder: Encoder with a pattern table (letter, phoneme, single_byte)
+
+    Returns:
+        Distinct patterns
+
+    Raises:
+        ValueError: If the encoder has no pattern table
+    """
+    for attribute in _TABLE_ATTRIBUTES:
+        table = getattr(encoder, attribute, None)
+        if table is not None:
+            values = table.values() if hasattr(table, 'values') else table
+            return list(dict.fromkeys(pattern for pattern in values if pattern.events))
+    raise ValueError(f"{type(encoder).__name__} has no pattern table; measure it over a corpus")
+
+
+def measure_sizes(patterns: Iterable[Pattern], name: str) -> WireSizeStats:
+    """
+    Sum the payload sizes of patterns in each encoding.
+
+    Args:
+        patterns: Patterns as played (repeats count every time; empty
+            patterns are skipped)
+        name: Encoder name for the report
+
+    Returns:
+        WireSizeStats
+    """
+    counts: Dict[Pattern, int] = {}
+    for pattern in patterns:
+        counts[pattern] = counts.get(pattern, 0) + 1
+
+    stats = WireSizeStats(name, 0, 0, 0, 0, 0, 0, 0)
+    for pattern, count in counts.items():
+        if not pattern.events:
+            continue
+        legacy, packed, compact, steps = pattern_sizes(pattern)
+        if compact < 0:
+            compact, steps = packed, len(pattern.events)
+            stats.fallbacks += count
+        stats.patterns += count
+        stats.events += count * len(pattern.events)
+        stats.steps += count * steps
+        stats.legacy_bytes += count * legacy
+        stats.packed_bytes += count * packed
+        stats.compact_bytes += count * compact
+    return stats
+
+
+def analyze_tables(specs: Sequence[str] = DEFAULT_ENCODERS) -> List[WireSizeStats]:
+    """
+    Measure the distinct patterns of each encoder's table.
+
+    Args:
+        specs: Encoder specs with pattern tables (see throughput.ENCODERS)
+
+    Returns:
+        WireSizeStats per encoder
+    """
+    return [measure_sizes(table_patterns(create_encoder(spec)), spec) for spec in specs]
+
+
+def analyze_corpus_sizes(path: str, specs: Sequence[str] = DEFAULT_ENCODERS,
+                         chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[WireSizeStats]:
+    """
+    Measure the patterns each encoder produces for a corpus.
+
+    Args:
+        path: Text file or directory of .txt files
+        specs: Encoder specs (see throughput.ENCODERS)
+        chunk_size: Characters per chunk read from the corpus
+
+    Returns:
+        WireSizeStats per encoder
+    """
+    return [
+        measure_sizes(create_encoder(spec).iter_encode(iter_corpus(path, chunk_size)), spec)
+        for spec in specs
+    ]
+
+
+def format_table(results: Sequence[WireSizeStats]) -> str:
+    """Format results as a plain-text table."""
+    header = (f"{'Encoder':<24} {'Patterns':>10} {'Events':>7} {'Steps':>7} "
+              f"{'v0 B/pat':>9} {'v1 B/pat':>9} {'v2 B/pat':>9} {'v2/v1':>6}")
+    lines = [header, '-' * len(header)]
+    for r in results:
+        events = r.events / r.patterns if r.patterns else 0.0
+        steps = r.steps / r.patterns if r.patterns else 0.0
+        lines.append(
+            f"{r.encoder:<24} {r.patterns:>10,} {events:>7.2f} {steps:>7.2f} "
+            f"{r.bytes_per_pattern(0):>9.2f} {r.bytes_per_pattern(1):>9.2f} "
+            f"{r.bytes_per_pattern(2):>9.2f} {r.compact_ratio:>6.2f}")
+    return '\n'.join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(
+        description="Compare pattern payload sizes of the Teletypathy wire encodings.")
+    parser.add_argument('path', nargs='?',
+                        help="Text file or directory of text files (default: encoder tables)")
+    parser.add_argument('-e', '--encoder', action='append', dest='encoders',
+                        help="Encoder spec, repeatable (without a corpus only encoders "
+                             f"with a pattern table). Default: {' '.join(DEFAULT_ENCODERS)}")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--json', action='store_true', help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    specs = args.encoders or DEFAULT_ENCODERS
+    try:
+        if args.path:
+            results = analyze_corpus_sizes(args.path, specs, args.chunk_size)
+        else:
+            results = analyze_tables(specs)
+    except ValueError as e:
+        parser.error(str(e))
+    if args.json:
+        print(json.dumps([r.to_dict() for r in results], indent=2))
+    else:
+        print(format_table(results))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,6 +5,14 @@ from .phoneme import PhonemeEncoder
 from .unified import UnifiedEncoder, EncodingMode
 from .hybrid import HybridEncoder
 from .single_byte import SingleByteEncoder
+from .cache import WordCache, get_shared_word_cache
+from .frequency import COMMON_WORDS, load_frequency_list, CodeTable
+from .lexicon import Lexicon, compile_lexicon
+from .word import WordEncoder, ContractionReport
+from .multi_ring import MultiRingPhonemeEncoder, RingFrame, WordFrames
+from .symbol_stream import SymbolStreamEncoder, decode_symbols
+from .timeline import Timeline, TimelineEvent, SpacingRules, compile_timeline
+from .scheduler import PipelineScheduler, ScheduleReport
 
 __all__ = [
     'Pattern',
@@ -15,6 +23,26 @@ __all__ = [
     'EncodingMode',
     'HybridEncoder',
     'SingleByteEncoder',
+    'WordCache',
+    'get_shared_word_cache',
+    'COMMON_WORDS',
+    'load_frequency_list',
+    'CodeTable',
+    'Lexicon',
+    'compile_lexicon',
+    'WordEncoder',
+    'ContractionReport',
+    'MultiRingPhonemeEncoder',
+    'RingFrame',
+    'WordFrames',
+    'SymbolStreamEncoder',
+    'decode_symbols',
+    'Timeline',
+    'TimelineEvent',
+    'SpacingRules',
+    'compile_timeline',
+    'PipelineScheduler',
+    'ScheduleReport',
 ]
 
 
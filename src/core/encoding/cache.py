@@ -0,0 +1,151 @@
+"""
+Word-level memoization for Teletypathy encoders.
+
+Natural text is highly repetitive (the top 100 words cover about half of
+running text), so encoders cache the result of G2P and pattern lookup per
+normalized word instead of recomputing it for every occurrence.
+"""
+
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+
+class WordCache:
+    """
+    Bounded LRU cache with hit/miss counters.
+
+    Keys are hashable (encoders use (namespace, word) tuples so one cache
+    can be shared between encoders with different configurations).
+    """
+
+    def __init__(self, maxsize: int = 8192):
+        """
+        Initialize word cache.
+
+        Args:
+            maxsize: Maximum number of entries (least recently used entries
+                are evicted beyond this)
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self._entries: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        Get a cached value, marking it as recently used.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None on a miss
+        """
+        try:
+            value = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        """
+        Store a value, evicting the least recently used entry if full.
+
+        Args:
+            key: Cache key
+            value: Value to cache (must not be None)
+        """
+        entries = self._entries
+        entries[key] = value
+        entries.move_to_end(key)
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """
+        Get a cached value, computing and storing it on a miss.
+
+        Args:
+            key: Cache key
+            compute: Zero-argument callable producing the value
+
+        Returns:
+            Cached or newly computed value
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    def warm(self, items: Iterable[Tuple[Hashable, Any]]):
+        """
+        Pre-populate the cache without affecting hit/miss counters.
+
+        Items should be ordered most frequent first; only the first
+        ``maxsize`` items are kept, with the most frequent ones marked as
+        most recently used.
+
+        Args:
+            items: Iterable of (key, value) pairs, most frequent first
+        """
+        selected = []
+        for item in items:
+            if len(selected) >= self.maxsize:
+                break
+            selected.append(item)
+        for key, value in reversed(selected):
+            if key not in self._entries:
+                self.put(key, value)
+
+    def clear(self):
+        """Remove all entries and reset counters."""
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def hit_rate(self) -> float:
+        """Get the fraction of lookups that were hits."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        return {
+            'size': len(self._entries),
+            'maxsize': self.maxsize,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hit_rate(),
+        }
+
+
+_shared_word_cache: Optional[WordCache] = None
+
+
+def get_shared_word_cache() -> WordCache:
+    """
+    Get the process-wide word cache used by encoders by default.
+
+    PhonemeEncoder, UnifiedEncoder and HybridEncoder all use this cache
+    unless given their own.
+    """
+    global _shared_word_cache
+    if _shared_word_cache is None:
+        _shared_word_cache = WordCache()
+    return _shared_word_cache
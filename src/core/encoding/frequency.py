@@ -0,0 +1,312 @@
+"""
+Word and symbol frequency data for Teletypathy encoders.
+
+Frequency-ranked lists are used to pre-warm caches and to choose which
+words get dedicated encodings. Symbol counts from a corpus drive the
+frequency-optimized byte code tables used by SingleByteEncoder.
+
+Build a code table from a corpus with CodeTable.from_corpus(), or:
+
+    python -m src.core.encoding.frequency article_text.txt codes.json
+"""
+
+import json
+import sys
+import zlib
+from collections import Counter
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+
+# Most common English words, most frequent first
+COMMON_WORDS = (
+    'the', 'be', 'to', 'of', 'and', 'a', 'in', 'that', 'have', 'it',
+    'for', 'not', 'on', 'with', 'he', 'as', 'you', 'do', 'at', 'this',
+    'but', 'his', 'from', 'they', 'we', 'say', 'her', 'she', 'or', 'an',
+    'will', 'my', 'one', 'all', 'would', 'there', 'their', 'what', 'so',
+    'up', 'out', 'if', 'about', 'who', 'get', 'which', 'go', 'me', 'when',
+    'make', 'can', 'like', 'time', 'no', 'just', 'him', 'know', 'take',
+    'people', 'into', 'year', 'your', 'good', 'some', 'could', 'them',
+    'see', 'other', 'than', 'then', 'now', 'look', 'only', 'come', 'its',
+    'over', 'think', 'also', 'back', 'after', 'use', 'two', 'how', 'our',
+    'work', 'first', 'well', 'way', 'even', 'new', 'want', 'because', 'any',
+    'these', 'give', 'day', 'most', 'us',
+)
+
+
+def load_frequency_list(path: str, limit: Optional[int] = None) -> List[str]:
+    """
+    Load a word frequency list.
+
+    Each non-empty line holds a word, optionally followed by a count
+    (whitespace separated). If counts are present, words are sorted by
+    descending count; otherwise file order is kept. Lines starting with
+    '#' are ignored.
+
+    Args:
+        path: Path to the frequency list
+        limit: Optional maximum number of words to return
+
+    Returns:
+        Words, most frequent first
+    """
+    entries = []
+    has_counts = True
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            fields = line.split()
+            if not fields or fields[0].startswith('#'):
+                continue
+            count = None
+            if len(fields) > 1:
+                try:
+                    count = float(fields[1])
+                except ValueError:
+                    pass
+            if count is None:
+                has_counts = False
+            entries.append((fields[0].lower(), count))
+
+    if has_counts:
+        # Stable sort keeps file order for ties
+        entries.sort(key=lambda entry: -entry[1])
+    words = [word for word, _ in entries]
+    return words[:limit] if limit is not None else words
+
+
+CODE_TABLE_FORMAT = 'teletypathy-code-table'
+CODE_TABLE_VERSION = 1
+
+CODE_TABLE_LAYOUTS = ('ring', 'linear')
+
+# Code 0 fires no actuators and is read as a word boundary, so
+# frequency-optimized tables reserve it for the space symbol
+PAUSE_SYMBOL = ord(' ')
+
+
+def count_symbols(corpus: Iterable[str]) -> Counter:
+    """
+    Count byte symbols in a corpus.
+
+    Symbols are the low 8 bits of each character code, as used by
+    SingleByteEncoder.
+
+    Args:
+        corpus: Text chunks (a string, a list of strings or an open text file)
+
+    Returns:
+        Counter of byte symbol -> count
+    """
+    if isinstance(corpus, str):
+        corpus = (corpus,)
+    counts: Counter = Counter()
+    for chunk in corpus:
+        counts.update(chunk)
+    symbols: Counter = Counter()
+    for char, count in counts.items():
+        symbols[ord(char) & 0xFF] += count
+    return symbols
+
+
+def _min_separation(positions: Sequence[int], ring_size: Optional[int]) -> int:
+    """Smallest distance between active actuators (circular if ring_size is set)."""
+    if len(positions) < 2:
+        return 8
+    distances = []
+    for i, a in enumerate(positions):
+        for b in positions[i + 1:]:
+            distance = b - a
+            if ring_size is not None:
+                distance = min(distance, ring_size - distance)
+            distances.append(distance)
+    return min(distances)
+
+
+def code_rank_key(code: int, layout: str = 'ring') -> Tuple[int, ...]:
+    """
+    Sort key ranking byte codes from easiest to hardest to perceive.
+
+    Fewer active actuators first; among codes with the same bit count,
+    ring layouts prefer codes that spread actuators over both rings, then
+    codes whose actuators are further apart (linear layouts use the
+    separation only).
+
+    Args:
+        code: Byte code (0-255)
+        layout: 'ring' (two rings of 4) or 'linear'
+
+    Returns:
+        Sort key
+    """
+    bits = [i for i in range(8) if (code >> i) & 1]
+    if layout == 'ring':
+        lower = [b for b in bits if b < 4]
+        upper = [b - 4 for b in bits if b >= 4]
+        crowding = max(len(lower), len(upper))
+        separation = min(_min_separation(lower, 4), _min_separation(upper, 4))
+        return (len(bits), crowding, -separation, code)
+    return (len(bits), -_min_separation(bits, None), code)
+
+
+class CodeTable:
+    """
+    Permutation of the 256 byte codes: input symbol -> transmitted code.
+
+    Built from corpus symbol frequencies so that the most frequent symbols
+    are sent with the fewest active actuators and the most discriminable
+    patterns. Space is always sent as the empty code 0 (a pause); every
+    other symbol fires at least one actuator.
+    """
+
+    def __init__(self, codes: Sequence[int], layout: str = 'ring'):
+        """
+        Initialize code table.
+
+        Args:
+            codes: 256 transmitted codes, indexed by input symbol
+            layout: Layout the table was optimized for
+        """
+        codes = tuple(codes)
+        if len(codes) != 256 or sorted(codes) != list(range(256)):
+            raise ValueError("Code table must be a permutation of 0-255")
+        self.codes = codes
+        self.layout = layout
+        inverse = [0] * 256
+        for symbol, code in enumerate(codes):
+            inverse[code] = symbol
+        self.inverse = tuple(inverse)
+
+    @classmethod
+    def identity(cls, layout: str = 'ring') -> 'CodeTable':
+        """Table that sends every symbol as its own code."""
+        return cls(range(256), layout)
+
+    @classmethod
+    def from_counts(cls, counts: Counter, layout: str = 'ring') -> 'CodeTable':
+        """
+        Build a frequency-optimized table from symbol counts.
+
+        Args:
+            counts: Byte symbol -> count (see count_symbols)
+            layout: 'ring' or 'linear'
+
+        Returns:
+            CodeTable
+        """
+        if layout not in CODE_TABLE_LAYOUTS:
+            raise ValueError(f"Unknown layout: {layout}")
+        # Most frequent first; unseen symbols keep their natural order
+        symbols = sorted((symbol for symbol in range(256) if symbol != PAUSE_SYMBOL),
+                         key=lambda symbol: (-counts.get(symbol, 0), symbol))
+        ranked = sorted(range(1, 256), key=lambda code: code_rank_key(code, layout))
+        codes = [0] * 256           # codes[PAUSE_SYMBOL] stays 0
+        for symbol, code in zip(symbols, ranked):
+            codes[symbol] = code
+        return cls(codes, layout)
+
+    @classmethod
+    def from_corpus(cls, corpus: Iterable[str], layout: str = 'ring') -> 'CodeTable':
+        """
+        Build a frequency-optimized table from a corpus.
+
+        Args:
+            corpus: Text chunks (a string, a list of strings or an open text file)
+            layout: 'ring' or 'linear'
+
+        Returns:
+            CodeTable
+        """
+        return cls.from_counts(count_symbols(corpus), layout)
+
+    @property
+    def is_identity(self) -> bool:
+        """Whether every symbol is sent as its own code."""
+        return self.codes == tuple(range(256))
+
+    @property
+    def digest(self) -> int:
+        """CRC-32 of the code table, identifying it compactly."""
+        return zlib.crc32(bytes(self.codes))
+
+    def mean_active_bits(self, counts: Counter) -> float:
+        """
+        Average number of active actuators per symbol for a corpus.
+
+        Args:
+            counts: Byte symbol -> count (see count_symbols)
+
+        Returns:
+            Mean active bits per symbol (0.0 for an empty corpus)
+        """
+        total = sum(counts.values())
+        if not total:
+            return 0.0
+        codes = self.codes
+        return sum(bin(codes[symbol]).count('1') * count
+                   for symbol, count in counts.items()) / total
+
+    def to_dict(self) -> dict:
+        """Get the JSON-serializable form of the table."""
+        return {
+            'format': CODE_TABLE_FORMAT,
+            'version': CODE_TABLE_VERSION,
+            'layout': self.layout,
+            'codes': list(self.codes),
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'CodeTable':
+        """Create a table from its to_dict() form."""
+        if data.get('format') != CODE_TABLE_FORMAT:
+            raise ValueError("Not a code table")
+        if data.get('version') != CODE_TABLE_VERSION:
+            raise ValueError(f"Unsupported code table version {data.get('version')}")
+        return cls(data['codes'], data.get('layout', 'ring'))
+
+    def save(self, path: str):
+        """Write the table to a JSON file."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path: str) -> 'CodeTable':
+        """Read a table written by save()."""
+        with open(path, encoding='utf-8') as f:
+            return cls.from_dict(json.load(f))
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CodeTable):
+            return NotImplemented
+        return self.codes == other.codes
+
+    def __hash__(self) -> int:
+        return hash(self.codes)
+
+    def __repr__(self) -> str:
+        return f"CodeTable(layout={self.layout!r}, digest={self.digest:#010x})"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point: build a code table from a corpus."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Build a frequency-optimized SingleByteEncoder code table "
+                    "from a text corpus.")
+    parser.add_argument('corpus', nargs='+', help="Text files")
+    parser.add_argument('dest', help="Output JSON file")
+    parser.add_argument('--layout', choices=CODE_TABLE_LAYOUTS, default='ring')
+    args = parser.parse_args(argv)
+
+    counts: Counter = Counter()
+    for path in args.corpus:
+        with open(path, encoding='utf-8', errors='replace') as f:
+            counts.update(count_symbols(f))
+    table = CodeTable.from_counts(counts, args.layout)
+    table.save(args.dest)
+    print(f"Wrote {args.dest}: {CodeTable.identity().mean_active_bits(counts):.2f} -> "
+          f"{table.mean_active_bits(counts):.2f} active actuators per symbol")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,10 +4,18 @@ Hybrid encoding system combining character and phoneme modes.
 Automatically selects the best encoding mode based on content type.
 """
 
-from typing import List, Optional
+from itertools import islice
+from typing import Iterable, Iterator, List, Optional, Tuple
 from .pattern import Pattern
 from .pattern import PatternEncoder as LetterEncoder
 from .phoneme import PhonemeEncoder
+from .cache import WordCache
+from .frequency import COMMON_WORDS
+from .tokenizer import TokenKind, classify_token, iter_tokenize, tokenize
+from .word import WordEncoder
+
+# Patterns per segment for the single-mode strategies
+SEGMENT_SIZE = 1024
 
 
 class HybridEncoder:
@@ -20,7 +28,8 @@ class HybridEncoder:
     - Unknown words: Fallback to character mode if G2P fails
     """
     
-    def __init__(self, strategy: str = 'adaptive'):
+    def __init__(self, strategy: str = 'adaptive', word_cache: Optional[WordCache] = None,
+                 token_cache: Optional[WordCache] = None):
         """
         Initialize hybrid encoder.
         
@@ -30,25 +39,27 @@ class HybridEncoder:
                 - 'character': Always character mode
                 - 'phoneme': Always phoneme mode
                 - 'word_level': Phoneme for common words, character for rare
+                - 'word_contraction': Single patterns for common words and
+                  letter clusters (see WordEncoder)
+            word_cache: Cache of per-word phoneme results
+                (defaults to the process-wide shared cache)
+            token_cache: Cache of per-token encoded patterns, keyed by
+                strategy (defaults to a cache private to this encoder)
         """
         self.strategy = strategy
         self.letter_encoder = LetterEncoder()
-        self.phoneme_encoder = PhonemeEncoder()
+        self.phoneme_encoder = PhonemeEncoder(word_cache=word_cache)
+        self.token_cache = token_cache if token_cache is not None else WordCache(maxsize=4096)
+        
+        # Whitespace runs are encoded as a single space pattern
+        space_pattern = self.letter_encoder.encode_character(' ')
+        self._space_patterns = (space_pattern,) if space_pattern else ()
         
         # Common words for word-level strategy
-        self.common_words = {
-            'the', 'be', 'to', 'of', 'and', 'a', 'in', 'that', 'have', 'it',
-            'for', 'not', 'on', 'with', 'he', 'as', 'you', 'do', 'at', 'this',
-            'but', 'his', 'from', 'they', 'we', 'say', 'her', 'she', 'or', 'an',
-            'will', 'my', 'one', 'all', 'would', 'there', 'their', 'what', 'so',
-            'up', 'out', 'if', 'about', 'who', 'get', 'which', 'go', 'me', 'when',
-            'make', 'can', 'like', 'time', 'no', 'just', 'him', 'know', 'take',
-            'people', 'into', 'year', 'your', 'good', 'some', 'could', 'them',
-            'see', 'other', 'than', 'then', 'now', 'look', 'only', 'come', 'its',
-            'over', 'think', 'also', 'back', 'after', 'use', 'two', 'how', 'our',
-            'work', 'first', 'well', 'way', 'even', 'new', 'want', 'because', 'any',
-            'these', 'give', 'day', 'most', 'us'
-        }
+        self.common_words = set(COMMON_WORDS)
+        
+        # Contraction encoder, built on first use
+        self._word_encoder: Optional[WordEncoder] = None
     
     def encode_text(self, text: str) -> List[Pattern]:
         """
@@ -64,93 +75,156 @@ class HybridEncoder:
             return self.letter_encoder.encode_text(text)
         elif self.strategy == 'phoneme':
             return self.phoneme_encoder.encode_text(text)
-        elif self.strategy == 'adaptive':
-            return self._encode_adaptive(text)
-        elif self.strategy == 'word_level':
-            return self._encode_word_level(text)
-        else:
-            # Default to adaptive
-            return self._encode_adaptive(text)
+        
+        patterns = []
+        for run in self._iter_token_patterns(tokenize(text)):
+            patterns.extend(run)
+        return patterns
     
-    def _encode_adaptive(self, text: str) -> List[Pattern]:
+    def iter_encode(self, chunks: Iterable[str]) -> Iterator[Pattern]:
         """
-        Adaptive encoding: automatically switch modes based on content.
+        Encode a stream of text chunks using hybrid strategy.
+        
+        Produces the same patterns as encode_text(''.join(chunks)), yielding
+        them incrementally. Words that straddle chunk boundaries are
+        reassembled before their mode is chosen.
         
-        Strategy:
-        - Words: Try phoneme mode, fallback to character if G2P fails
-        - Non-words: Always character mode
+        Args:
+            chunks: Iterable of text chunks
+            
+        Yields:
+            Pattern objects
         """
-        # Split into words and non-words
-        import re
-        tokens = re.split(r'(\s+)', text)  # Split but keep spaces
+        if self.strategy == 'character':
+            yield from self.letter_encoder.iter_encode(chunks)
+        elif self.strategy == 'phoneme':
+            yield from self.phoneme_encoder.iter_encode(chunks)
+        else:
+            for run in self._iter_token_patterns(iter_tokenize(chunks)):
+                yield from run
+    
+    def iter_encode_segments(self, chunks: Iterable[str]) -> Iterator[Tuple[Optional[str], Tuple[Pattern, ...]]]:
+        """
+        Encode a stream of text chunks, yielding each token's patterns with its mode.
         
-        patterns = []
-        for token in tokens:
-            if not token.strip():  # Empty or whitespace
-                # Add space pattern
-                space_pattern = self.letter_encoder.encode_character(' ')
-                if space_pattern:
-                    patterns.append(space_pattern)
-                continue
+        Modes are 'character', 'phoneme' or 'contraction'; whitespace runs
+        have mode None. The 'character' and 'phoneme' strategies have a
+        single mode and yield runs of up to SEGMENT_SIZE patterns instead.
+        Concatenating the patterns gives iter_encode's output.
+        
+        Args:
+            chunks: Iterable of text chunks
             
-            if self._is_word(token):
-                # Try phoneme mode
-                try:
-                    phoneme_patterns = self.phoneme_encoder.encode_text(token)
-                    # Check if we got valid patterns
-                    if phoneme_patterns and len(phoneme_patterns) > 0:
-                        patterns.extend(phoneme_patterns)
-                    else:
-                        # Fallback to character mode
-                        char_patterns = self.letter_encoder.encode_text(token)
-                        patterns.extend(char_patterns)
-                except Exception:
-                    # G2P failed - use character mode
-                    char_patterns = self.letter_encoder.encode_text(token)
-                    patterns.extend(char_patterns)
-            else:
-                # Non-word (code, URL, number, etc.) - use character mode
-                char_patterns = self.letter_encoder.encode_text(token)
-                patterns.extend(char_patterns)
+        Yields:
+            (mode, patterns) per token or run
+        """
+        if self.strategy == 'character':
+            yield from self._iter_runs('character', self.letter_encoder.iter_encode(chunks))
+        elif self.strategy == 'phoneme':
+            yield from self._iter_runs('phoneme', self.phoneme_encoder.iter_encode(chunks))
+        else:
+            yield from self._iter_token_segments(iter_tokenize(chunks))
+    
+    @staticmethod
+    def _iter_runs(mode: str, patterns: Iterator[Pattern]) -> Iterator[Tuple[str, Tuple[Pattern, ...]]]:
+        """Split a single-mode pattern stream into bounded (mode, patterns) runs."""
+        while True:
+            run = tuple(islice(patterns, SEGMENT_SIZE))
+            if not run:
+                return
+            yield mode, run
+    
+    def _iter_token_patterns(self, tokens: Iterable[Tuple[TokenKind, str]]) -> Iterator[Tuple[Pattern, ...]]:
+        """
+        Encode classified tokens with the token-based strategies.
         
-        return patterns
+        Args:
+            tokens: (kind, token) pairs from the tokenizer
+            
+        Yields:
+            Tuple of patterns per token
+        """
+        for _, patterns in self._iter_token_segments(tokens):
+            yield patterns
     
-    def _encode_word_level(self, text: str) -> List[Pattern]:
+    def _iter_token_segments(self, tokens: Iterable[Tuple[TokenKind, str]]) -> Iterator[Tuple[Optional[str], Tuple[Pattern, ...]]]:
         """
-        Word-level hybrid: phoneme for common words, character for rare.
+        Encode classified tokens into (mode, patterns) segments.
         
-        Strategy:
-        - Common words: Use phoneme mode
-        - Rare/unknown words: Use character mode
+        Results are memoized per (strategy, token), so repeated tokens cost
+        a single cache lookup.
+        
+        Args:
+            tokens: (kind, token) pairs from the tokenizer
+            
+        Yields:
+            (mode, tuple of patterns) per token
         """
-        import re
-        tokens = re.split(r'(\s+)', text)
+        strategy = self.strategy
+        if strategy == 'word_level':
+            encode_token = self._encode_word_level_token
+        elif strategy == 'word_contraction':
+            encode_token = self._encode_word_contraction_token
+        else:
+            # Default to adaptive
+            encode_token = self._encode_adaptive_token
         
-        patterns = []
-        for token in tokens:
-            if not token.strip():
-                space_pattern = self.letter_encoder.encode_character(' ')
-                if space_pattern:
-                    patterns.append(space_pattern)
+        cache = self.token_cache
+        space_segment = (None, self._space_patterns)
+        for kind, token in tokens:
+            if kind is TokenKind.WHITESPACE:
+                yield space_segment
                 continue
-            
-            word_lower = token.lower().strip('.,!?;:')
-            
-            if word_lower in self.common_words:
-                # Common word - use phoneme mode
-                try:
-                    phoneme_patterns = self.phoneme_encoder.encode_text(token)
-                    if phoneme_patterns:
-                        patterns.extend(phoneme_patterns)
-                    else:
-                        patterns.extend(self.letter_encoder.encode_text(token))
-                except Exception:
-                    patterns.extend(self.letter_encoder.encode_text(token))
-            else:
-                # Rare/unknown word - use character mode
-                patterns.extend(self.letter_encoder.encode_text(token))
+            key = (strategy, token)
+            segment = cache.get(key)
+            if segment is None:
+                mode, patterns = encode_token(kind, token)
+                segment = (mode, tuple(patterns))
+                cache.put(key, segment)
+            yield segment
+    
+    def _encode_adaptive_token(self, kind: TokenKind, token: str) -> Tuple[str, List[Pattern]]:
+        """Encode one non-whitespace token with the adaptive strategy, returning (mode, patterns)."""
+        if kind is TokenKind.WORD:
+            # Try phoneme mode
+            try:
+                phoneme_patterns = self.phoneme_encoder.encode_text(token)
+                # Check if we got valid patterns
+                if phoneme_patterns:
+                    return 'phoneme', phoneme_patterns
+                # Fallback to character mode
+                return 'character', self.letter_encoder.encode_text(token)
+            except Exception:
+                # G2P failed - use character mode
+                return 'character', self.letter_encoder.encode_text(token)
         
-        return patterns
+        # Non-word (code, URL, number, etc.) - use character mode
+        return 'character', self.letter_encoder.encode_text(token)
+    
+    def _encode_word_level_token(self, kind: TokenKind, token: str) -> Tuple[str, List[Pattern]]:
+        """Encode one non-whitespace token with the word-level strategy, returning (mode, patterns)."""
+        if kind is TokenKind.WORD and token.lower().strip('.,!?;:') in self.common_words:
+            # Common word - use phoneme mode
+            try:
+                phoneme_patterns = self.phoneme_encoder.encode_text(token)
+                if phoneme_patterns:
+                    return 'phoneme', phoneme_patterns
+                return 'character', self.letter_encoder.encode_text(token)
+            except Exception:
+                return 'character', self.letter_encoder.encode_text(token)
+        
+        # Rare/unknown word - use character mode
+        return 'character', self.letter_encoder.encode_text(token)
+    
+    def _encode_word_contraction_token(self, kind: TokenKind, token: str) -> Tuple[str, List[Pattern]]:
+        """Encode one non-whitespace token with the word-contraction strategy, returning (mode, patterns)."""
+        if self._word_encoder is None:
+            self._word_encoder = WordEncoder()
+        word_encoder = self._word_encoder
+        patterns = word_encoder.encode_token(kind, token)
+        if kind is TokenKind.WORD and word_encoder.encode_word(token.strip('.,!?;:')) is not None:
+            return 'contraction', patterns
+        return 'character', patterns
     
     def _is_word(self, text: str) -> bool:
         """
@@ -162,26 +236,7 @@ class HybridEncoder:
         Returns:
             True if text appears to be a word
         """
-        # Remove punctuation
-        cleaned = text.strip('.,!?;:')
-        
-        # Check if all alphabetic (allow apostrophes)
-        if not cleaned.replace("'", "").replace("-", "").isalpha():
-            return False
-        
-        # Check if it's a URL/code pattern
-        if any(char in cleaned for char in ['/', ':', '@', '#', '$', '\\']):
-            return False
-        
-        # Check if it's a number
-        if cleaned.isdigit():
-            return False
-        
-        # Check if it's mostly numbers (e.g., "3D", "2nd")
-        if len(cleaned) > 1 and sum(c.isdigit() for c in cleaned) > len(cleaned) / 2:
-            return False
-        
-        return True
+        return classify_token(text) is TokenKind.WORD
     
     def set_strategy(self, strategy: str):
         """Change encoding strategy."""
@@ -0,0 +1,304 @@
+"""
+Memory-mapped pronunciation lexicon for Teletypathy.
+
+Stores a word -> phoneme dictionary in a compact binary file that is opened
+with mmap and searched in place, so a 100k-word lexicon costs no parse time
+and almost no resident memory until words are actually looked up.
+
+File format (little-endian):
+
+    Header (16 bytes):
+      [Magic: 4 bytes] b'TTLX'
+      [Format version: 2 bytes]
+      [Reserved: 2 bytes]
+      [Entry count: 4 bytes]
+      [Index offset: 4 bytes]
+    Index:
+      [Entry offset: 4 bytes] x entry count, sorted by UTF-8 key bytes
+    Entries:
+      [Key length: 1 byte] [Value length: 1 byte] [Key: UTF-8] [Value: UTF-8]
+
+Values are phoneme symbols (IPA, as used by PhonemeEncoder) separated by
+single spaces.
+
+Build a lexicon from a plain-text word list with compile_lexicon(), or:
+
+    python -m src.core.encoding.lexicon words.txt lexicon.bin
+"""
+
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+MAGIC = b'TTLX'
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct('<4sHHII')
+_OFFSET = struct.Struct('<I')
+
+
+# ARPAbet (CMUdict) to IPA, restricted to PhonemeEncoder's inventory
+ARPABET_TO_IPA = {
+    'AA': ('ɑ',), 'AE': ('æ',), 'AH': ('ʌ',), 'AO': ('ɔ',), 'AW': ('aʊ',),
+    'AY': ('aɪ',), 'B': ('b',), 'CH': ('tʃ',), 'D': ('d',), 'DH': ('ð',),
+    'EH': ('ɛ',), 'ER': ('ə', 'r'), 'EY': ('eɪ',), 'F': ('f',), 'G': ('g',),
+    'HH': ('h',), 'IH': ('ɪ',), 'IY': ('i',), 'JH': ('dʒ',), 'K': ('k',),
+    'L': ('l',), 'M': ('m',), 'N': ('n',), 'NG': ('ŋ',), 'OW': ('oʊ',),
+    'OY': ('ɔɪ',), 'P': ('p',), 'R': ('r',), 'S': ('s',), 'SH': ('ʃ',),
+    'T': ('t',), 'TH': ('θ',), 'UH': ('ʊ',), 'UW': ('u',), 'V': ('v',),
+    'W': ('w',), 'Y': ('j',), 'Z': ('z',), 'ZH': ('ʒ',),
+}
+
+# Unstressed AH is a schwa
+_ARPABET_UNSTRESSED = {'AH': ('ə',)}
+
+
+class Lexicon:
+    """
+    Read-only, memory-mapped pronunciation lexicon.
+
+    The file is mapped on first lookup; lookups binary-search the index in
+    place without loading entries into Python objects.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize lexicon.
+
+        Args:
+            path: Path to a lexicon file built by compile_lexicon
+        """
+        self.path = os.path.abspath(path)
+        self._file = None
+        self._map: Optional[mmap.mmap] = None
+        self._count = 0
+        self._index_offset = 0
+
+    def _open(self) -> mmap.mmap:
+        """Map the lexicon file and validate its header."""
+        if self._map is not None:
+            return self._map
+
+        f = open(self.path, 'rb')
+        try:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            f.close()
+            raise ValueError(f"Lexicon file is empty: {self.path}")
+        try:
+            if len(data) < _HEADER.size:
+                raise ValueError(f"Lexicon file is truncated: {self.path}")
+            magic, version, _, count, index_offset = _HEADER.unpack_from(data, 0)
+            if magic != MAGIC:
+                raise ValueError(f"Not a lexicon file: {self.path}")
+            if version != FORMAT_VERSION:
+                raise ValueError(f"Unsupported lexicon format version {version}")
+            if index_offset + _OFFSET.size * count > len(data):
+                raise ValueError(f"Lexicon index is truncated: {self.path}")
+        except ValueError:
+            data.close()
+            f.close()
+            raise
+
+        self._file = f
+        self._map = data
+        self._count = count
+        self._index_offset = index_offset
+        return data
+
+    def close(self):
+        """Unmap the lexicon file."""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self) -> int:
+        self._open()
+        return self._count
+
+    def __contains__(self, word: str) -> bool:
+        return self.get(word) is not None
+
+    def _entry_at(self, data: mmap.mmap, index: int) -> Tuple[int, int, int]:
+        """Get (key_start, key_end, value_end) for the index-th entry."""
+        offset = _OFFSET.unpack_from(data, self._index_offset + 4 * index)[0]
+        key_start = offset + 2
+        key_end = key_start + data[offset]
+        return key_start, key_end, key_end + data[offset + 1]
+
+    def get(self, word: str) -> Optional[Tuple[str, ...]]:
+        """
+        Look up a word's pronunciation.
+
+        Args:
+            word: Word (lowercase)
+
+        Returns:
+            Tuple of phoneme symbols, or None if the word is not in the lexicon
+        """
+        try:
+            key = word.encode('utf-8')
+        except UnicodeEncodeError:
+            return None
+        data = self._open()
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            key_start, key_end, value_end = self._entry_at(data, mid)
+            candidate = data[key_start:key_end]
+            if candidate < key:
+                lo = mid + 1
+            elif candidate > key:
+                hi = mid
+            else:
+                value = data[key_end:value_end].decode('utf-8')
+                return tuple(value.split(' ')) if value else ()
+        return None
+
+    def items(self) -> Iterator[Tuple[str, Tuple[str, ...]]]:
+        """Iterate over (word, phonemes) in key order."""
+        data = self._open()
+        for index in range(self._count):
+            key_start, key_end, value_end = self._entry_at(data, index)
+            value = data[key_end:value_end].decode('utf-8')
+            yield data[key_start:key_end].decode('utf-8'), tuple(value.split(' ')) if value else ()
+
+
+def parse_pronunciation(fields: List[str]) -> Tuple[str, ...]:
+    """
+    Convert pronunciation fields into IPA phoneme symbols.
+
+    ARPAbet symbols (e.g. 'HH', 'AH0') are converted with ARPABET_TO_IPA;
+    anything else is taken to be IPA already.
+
+    Args:
+        fields: Phoneme tokens from one dictionary line
+
+    Returns:
+        Tuple of IPA phoneme symbols
+    """
+    phonemes = []
+    for field in fields:
+        base = field.rstrip('012')
+        if base in ARPABET_TO_IPA:
+            if field.endswith('0') and base in _ARPABET_UNSTRESSED:
+                phonemes.extend(_ARPABET_UNSTRESSED[base])
+            else:
+                phonemes.extend(ARPABET_TO_IPA[base])
+        else:
+            phonemes.append(field)
+    return tuple(phonemes)
+
+
+def read_word_list(lines: Iterable[str]) -> Dict[str, Tuple[str, ...]]:
+    """
+    Parse a plain-text pronunciation list.
+
+    Each line is a word followed by its phonemes, whitespace separated
+    (e.g. 'hello h ə l oʊ' or CMUdict's 'HELLO  HH AH0 L OW1'). Comment
+    lines (';;;' or '#') are skipped, alternate pronunciations such as
+    'WORD(2)' are ignored, and the first pronunciation of a word wins.
+
+    Args:
+        lines: Lines of the word list
+
+    Returns:
+        Mapping of lowercase word to phoneme tuple
+    """
+    entries: Dict[str, Tuple[str, ...]] = {}
+    for line in lines:
+        fields = line.split()
+        if len(fields) < 2 or fields[0].startswith((';;;', '#')):
+            continue
+        word = fields[0].lower()
+        if word.endswith(')') and '(' in word:
+            continue
+        if word not in entries:
+            entries[word] = parse_pronunciation(fields[1:])
+    return entries
+
+
+def write_lexicon(entries: Dict[str, Tuple[str, ...]], dest: str) -> int:
+    """
+    Write a lexicon file.
+
+    Entries whose key or value exceeds 255 UTF-8 bytes are skipped.
+
+    Args:
+        entries: Mapping of word to phoneme tuple
+        dest: Output path
+
+    Returns:
+        Number of entries written
+    """
+    records = []
+    for word, phonemes in entries.items():
+        key = word.encode('utf-8')
+        value = ' '.join(phonemes).encode('utf-8')
+        if 0 < len(key) <= 255 and len(value) <= 255:
+            records.append((key, value))
+    records.sort()
+
+    index_offset = _HEADER.size
+    offset = index_offset + _OFFSET.size * len(records)
+    index = bytearray()
+    body = bytearray()
+    for key, value in records:
+        index += _OFFSET.pack(offset + len(body))
+        body += bytes((len(key), len(value)))
+        body += key
+        body += value
+
+    with open(dest, 'wb') as f:
+        f.write(_HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(records), index_offset))
+        f.write(index)
+        f.write(body)
+    return len(records)
+
+
+def compile_lexicon(source: str, dest: str) -> int:
+    """
+    Convert a plain-text word/phoneme list into a binary lexicon file.
+
+    Args:
+        source: Path to the word list (see read_word_list for the format)
+        dest: Output path for the binary lexicon
+
+    Returns:
+        Number of entries written
+    """
+    with open(source, encoding='utf-8', errors='replace') as f:
+        entries = read_word_list(f)
+    return write_lexicon(entries, dest)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point: compile a word list into a lexicon file."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Compile a word/phoneme list (IPA or CMUdict ARPAbet) "
+                    "into a memory-mapped Teletypathy lexicon.")
+    parser.add_argument('source', help="Plain-text word list")
+    parser.add_argument('dest', help="Output lexicon file")
+    args = parser.parse_args(argv)
+
+    count = compile_lexicon(args.source, args.dest)
+    print(f"Wrote {count} entries to {args.dest}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,369 @@
+"""
+Multi-ring parallel phoneme encoding for Teletypathy.
+
+Instead of playing a word's phonemes one after another, each phoneme is
+played on its own actuator ring and all rings fire together, so a word of
+up to num_rings phonemes takes a single frame. See
+multi_ring_parallel_phoneme_analysis.md (8 rings: ~56% faster than
+sequential phonemes).
+
+Actuators are numbered ring by ring: actuator = ring * actuators_per_ring
++ local actuator, with ring 0 at the wrist.
+"""
+
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from .pattern import ActuatorEvent, Pattern, PatternEncoder
+from .phoneme import PhonemeEncoder
+from .stream import iter_split_whitespace, split_whitespace
+
+
+OVERFLOW_STRATEGIES = ('sequential', 'split', 'truncate', 'hybrid')
+RING_ENCODINGS = ('code', 'pattern')
+
+# Vowel nuclei, for syllable splitting
+_VOWELS = frozenset(('ə', 'ɪ', 'ɛ', 'æ', 'ʌ', 'ɑ', 'ɔ', 'ʊ', 'u', 'i', 'o',
+                     'aɪ', 'aʊ', 'eɪ', 'oʊ', 'ɔɪ'))
+
+
+class RingFrame(NamedTuple):
+    """One simultaneous activation of up to num_rings rings."""
+    start_ms: int                 # Start time, relative to the start of the text
+    duration_ms: int              # Frame duration
+    symbols: Tuple[str, ...]      # Symbol on each ring, ring 0 first (phonemes, or letters)
+    pattern: Pattern              # Combined events of all rings, relative to start_ms
+
+
+class WordFrames(NamedTuple):
+    """Frames and timing for one word."""
+    word: str
+    phonemes: Tuple[str, ...]
+    frames: Tuple[RingFrame, ...]
+    start_ms: int
+    duration_ms: int              # From the first frame's start to the last frame's end
+    overflow: bool                # More phonemes than rings
+    dropped: int                  # Phonemes dropped by truncation
+
+
+def split_syllables(phonemes: Sequence[str]) -> List[Tuple[str, ...]]:
+    """
+    Split a phoneme sequence into syllables.
+
+    Each vowel is a syllable nucleus. Of the consonants between two vowels,
+    the last one starts the next syllable and the rest close the previous
+    one; leading and trailing consonants join the first and last syllable.
+
+    Args:
+        phonemes: Phoneme symbols
+
+    Returns:
+        List of syllables (tuples of phonemes)
+    """
+    nuclei = [i for i, phoneme in enumerate(phonemes) if phoneme in _VOWELS]
+    if len(nuclei) < 2:
+        return [tuple(phonemes)] if phonemes else []
+    syllables = []
+    start = 0
+    for previous, following in zip(nuclei, nuclei[1:]):
+        boundary = following - 1 if following - previous > 1 else following
+        syllables.append(tuple(phonemes[start:boundary]))
+        start = boundary
+    syllables.append(tuple(phonemes[start:]))
+    return syllables
+
+
+class MultiRingPhonemeEncoder:
+    """
+    Packs each word's phonemes into parallel frames across actuator rings.
+
+    Overflow strategies for words with more phonemes than rings:
+    - 'sequential': First num_rings phonemes in parallel, the rest one
+      frame each on ring 0 (no information loss)
+    - 'split': Syllables packed whole into as few frames as possible
+    - 'truncate': Only the first num_rings phonemes are played
+    - 'hybrid': Short words in parallel, long words spelled with letter
+      patterns on ring 0
+
+    Ring encodings:
+    - 'code': Each ring plays a chord for the phoneme's index; the ring's
+      last actuator is the phoneme-mode indicator (8-actuator rings: 7 data
+      bits, 128 codes)
+    - 'pattern': Each ring plays the phoneme's PhonemeEncoder pattern,
+      with its actuators mapped onto the ring
+    """
+
+    def __init__(self, num_rings: int = 8, actuators_per_ring: int = 8,
+                 overflow: str = 'sequential', ring_encoding: str = 'code',
+                 frame_duration_ms: int = 80, frame_gap_ms: int = 0,
+                 word_gap_ms: int = 0,
+                 phoneme_encoder: Optional[PhonemeEncoder] = None):
+        """
+        Initialize multi-ring encoder.
+
+        Args:
+            num_rings: Number of actuator rings (phonemes per frame)
+            actuators_per_ring: Actuators on each ring
+            overflow: Overflow strategy (see class docstring)
+            ring_encoding: 'code' or 'pattern' (see class docstring)
+            frame_duration_ms: Frame duration for the 'code' ring encoding
+            frame_gap_ms: Pause between frames of one word
+            word_gap_ms: Pause between words
+            phoneme_encoder: Encoder providing G2P and phoneme patterns
+                (defaults to a new PhonemeEncoder)
+        """
+        if num_rings < 1 or actuators_per_ring < 2:
+            raise ValueError("Need at least 1 ring of at least 2 actuators")
+        if overflow not in OVERFLOW_STRATEGIES:
+            raise ValueError(f"Unknown overflow strategy: {overflow}")
+        if ring_encoding not in RING_ENCODINGS:
+            raise ValueError(f"Unknown ring encoding: {ring_encoding}")
+
+        self.num_rings = num_rings
+        self.actuators_per_ring = actuators_per_ring
+        self.overflow = overflow
+        self.ring_encoding = ring_encoding
+        self.frame_duration_ms = frame_duration_ms
+        self.frame_gap_ms = frame_gap_ms
+        self.word_gap_ms = word_gap_ms
+        self.phoneme_encoder = phoneme_encoder if phoneme_encoder is not None else PhonemeEncoder()
+        self.letter_encoder = PatternEncoder()
+
+        # Phoneme codes in phoneme-map order
+        self.phoneme_codes = {
+            phoneme: code for code, phoneme in enumerate(self.phoneme_encoder.phoneme_map)
+        }
+        if ring_encoding == 'code' and len(self.phoneme_codes) > 1 << (actuators_per_ring - 1):
+            raise ValueError(
+                f"{len(self.phoneme_codes)} phonemes do not fit in "
+                f"{actuators_per_ring - 1} data bits; use ring_encoding='pattern'")
+        # Phoneme and letter patterns address actuators 0-7; fewer would fold onto each other
+        if ring_encoding == 'pattern' and actuators_per_ring < 8:
+            raise ValueError(
+                f"ring_encoding='pattern' needs 8 actuators per ring, got {actuators_per_ring}")
+        if overflow == 'hybrid' and actuators_per_ring < 8:
+            raise ValueError(
+                f"overflow='hybrid' needs 8 actuators per ring, got {actuators_per_ring}")
+        # Ring-local events per symbol, offsets relative to the frame start
+        self._ring_events = {}
+
+    @property
+    def total_actuators(self) -> int:
+        """Total number of actuators across all rings."""
+        return self.num_rings * self.actuators_per_ring
+
+    def encode_text(self, text: str) -> List[Pattern]:
+        """
+        Encode text into one pattern per frame.
+
+        Args:
+            text: Text string to encode
+
+        Returns:
+            List of Pattern objects (use encode_words for timings)
+        """
+        return [frame.pattern for word in self.encode_words(text) for frame in word.frames]
+
+    def iter_encode(self, chunks: Iterable[str]) -> Iterator[Pattern]:
+        """
+        Encode a stream of text chunks, yielding one pattern per frame.
+
+        Args:
+            chunks: Iterable of text chunks
+
+        Yields:
+            Pattern objects
+        """
+        for word in self.iter_encode_words(chunks):
+            for frame in word.frames:
+                yield frame.pattern
+
+    def encode_words(self, text: str) -> List[WordFrames]:
+        """
+        Encode text into per-word frames with timings.
+
+        Args:
+            text: Text string to encode
+
+        Returns:
+            List of WordFrames, one per encodable word
+        """
+        return list(self._iter_words(split_whitespace(text)))
+
+    def iter_encode_words(self, chunks: Iterable[str]) -> Iterator[WordFrames]:
+        """
+        Streaming version of encode_words.
+
+        Args:
+            chunks: Iterable of text chunks
+
+        Yields:
+            WordFrames, one per encodable word
+        """
+        return self._iter_words(iter_split_whitespace(chunks))
+
+    def encode_word(self, word: str, start_ms: int = 0) -> Optional[WordFrames]:
+        """
+        Encode a single word into parallel frames.
+
+        Args:
+            word: Word (no whitespace)
+            start_ms: Start time of the word's first frame
+
+        Returns:
+            WordFrames, or None if the word has nothing to play
+        """
+        phonemes = self.phoneme_encoder.lookup_word(word.lower())[0]
+        rings = self.num_rings
+        overflow = len(phonemes) > rings
+        dropped = 0
+
+        spelled = False
+        if not overflow and phonemes:
+            groups = [phonemes]
+        elif self.overflow == 'hybrid':
+            # Long or unpronounceable words are spelled
+            spelled = True
+            groups = [(char,) for char in word.lower()
+                      if self.letter_encoder.encode_character(char) is not None]
+        elif not phonemes:
+            groups = []
+        elif self.overflow == 'sequential':
+            groups = [phonemes[:rings]] + [(phoneme,) for phoneme in phonemes[rings:]]
+        elif self.overflow == 'split':
+            groups = self._pack_syllables(phonemes)
+        else:  # truncate
+            groups = [phonemes[:rings]]
+            dropped = len(phonemes) - rings
+
+        frames = []
+        time = start_ms
+        for group in groups:
+            frame = self._build_frame(group, time, spelled)
+            frames.append(frame)
+            time = frame.start_ms + frame.duration_ms + self.frame_gap_ms
+        if not frames:
+            return None
+
+        end = frames[-1].start_ms + frames[-1].duration_ms
+        return WordFrames(word, phonemes, tuple(frames), start_ms, end - start_ms, overflow, dropped)
+
+    def summarize(self, words: Sequence[WordFrames]) -> dict:
+        """
+        Summarize frame timings against sequential phoneme playback.
+
+        The baseline plays every phoneme in its own frame.
+
+        Args:
+            words: Result of encode_words
+
+        Returns:
+            Dictionary of word, frame and coverage counts and durations (ms)
+        """
+        frame_count = sum(len(word.frames) for word in words)
+        overflow_words = sum(1 for word in words if word.overflow)
+        phoneme_count = sum(len(word.phonemes) for word in words)
+        if words:
+            duration = words[-1].start_ms + words[-1].duration_ms - words[0].start_ms
+        else:
+            duration = 0
+        if self.ring_encoding == 'code':
+            sequential = phoneme_count * self.frame_duration_ms
+        else:
+            sequential = sum(self.phoneme_encoder.phoneme_table[phoneme].total_duration_ms
+                             for word in words for phoneme in word.phonemes)
+        sequential += sum(max(len(word.phonemes) - 1, 0) for word in words) * self.frame_gap_ms
+        sequential += max(len(words) - 1, 0) * self.word_gap_ms
+        return {
+            'words': len(words),
+            'frames': frame_count,
+            'phonemes': phoneme_count,
+            'overflow_words': overflow_words,
+            'coverage': (len(words) - overflow_words) / len(words) if words else 1.0,
+            'duration_ms': duration,
+            'sequential_ms': sequential,
+            'speedup': sequential / duration if duration else 0.0,
+        }
+
+    def _iter_words(self, tokens: Iterable[str]) -> Iterator[WordFrames]:
+        """Encode words from alternating word/whitespace tokens, timing them back to back."""
+        time = 0
+        for token in tokens:
+            if not token or token[0].isspace():
+                continue
+            word = self.encode_word(token, time)
+            if word is not None:
+                time = word.start_ms + word.duration_ms + self.word_gap_ms
+                yield word
+
+    def _pack_syllables(self, phonemes: Sequence[str]) -> List[Tuple[str, ...]]:
+        """Pack whole syllables into frames of at most num_rings phonemes."""
+        rings = self.num_rings
+        groups: List[Tuple[str, ...]] = []
+        current: Tuple[str, ...] = ()
+        for syllable in split_syllables(phonemes):
+            if len(current) + len(syllable) <= rings:
+                current += syllable
+                continue
+            if current:
+                groups.append(current)
+            # Syllables longer than a frame are cut into ring-sized pieces
+            while len(syllable) > rings:
+                groups.append(syllable[:rings])
+                syllable = syllable[rings:]
+            current = syllable
+        if current:
+            groups.append(current)
+        return groups
+
+    def _build_frame(self, symbols: Tuple[str, ...], start_ms: int,
+                     spelled: bool = False) -> RingFrame:
+        """Combine the ring patterns of symbols (ring 0 first) into one frame."""
+        events = []
+        duration = 0
+        for ring, symbol in enumerate(symbols):
+            ring_events, ring_duration = self._get_ring_events(symbol, spelled)
+            base = ring * self.actuators_per_ring
+            events.extend(
+                ActuatorEvent(base + actuator, offset, event_duration, intensity)
+                for actuator, offset, event_duration, intensity in ring_events
+            )
+            duration = max(duration, ring_duration)
+        return RingFrame(start_ms, duration, symbols, Pattern(events))
+
+    def _get_ring_events(self, symbol: str, spelled: bool = False) -> Tuple[tuple, int]:
+        """
+        Get ring-local (actuator, offset, duration, intensity) events for a symbol.
+
+        Args:
+            symbol: Phoneme, or letter if spelled is True
+            spelled: Whether symbol is a letter rather than a phoneme
+
+        Returns:
+            (events, ring duration in ms)
+        """
+        key = (spelled, symbol)
+        entry = self._ring_events.get(key)
+        if entry is not None:
+            return entry
+
+        apr = self.actuators_per_ring
+        code = None if spelled else self.phoneme_codes[symbol]
+        if code is not None and self.ring_encoding == 'code':
+            duration = self.frame_duration_ms
+            actuators = [bit for bit in range(apr - 1) if code & (1 << bit)]
+            actuators.append(apr - 1)  # phoneme-mode indicator
+            events = tuple((actuator, 0, duration, 255) for actuator in actuators)
+        else:
+            if code is not None:
+                pattern = self.phoneme_encoder.encode_phoneme(symbol)
+            else:
+                pattern = self.letter_encoder.encode_character(symbol)
+            duration = pattern.total_duration_ms
+            events = tuple(
+                (event.actuator_id % apr, event.time_offset_ms, event.duration_ms, event.intensity)
+                for event in pattern.events
+            )
+
+        entry = (events, duration)
+        self._ring_events[key] = entry
+        return entry
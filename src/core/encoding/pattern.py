@@ -4,13 +4,22 @@ Pattern encoding library for Teletypathy.
 Converts characters to tactile patterns and manages pattern definitions.
 """
 
-from typing import List, Tuple, Optional
-from dataclasses import dataclass
+from operator import attrgetter
+from types import MappingProxyType
+from typing import Dict, Iterable, Iterator, List, Mapping, Tuple, Optional
 from enum import IntEnum
 
 
 class ActuatorEvent:
-    """Represents a single actuator activation event."""
+    """
+    Represents a single actuator activation event.
+    
+    Events are immutable, slot-based values: they compare and hash by their
+    fields, carry no per-instance ``__dict__``, and can be shared safely
+    between encoders and callers.
+    """
+    
+    __slots__ = ('actuator_id', 'time_offset_ms', 'duration_ms', 'intensity')
     
     def __init__(self, actuator_id: int, time_offset_ms: int, duration_ms: int, intensity: int = 200):
         """
@@ -22,41 +31,148 @@ class ActuatorEvent:
             duration_ms: Duration of activation (ms)
             intensity: Vibration intensity (0-255)
         """
-        self.actuator_id = actuator_id
-        self.time_offset_ms = time_offset_ms
-        self.duration_ms = duration_ms
-        self.intensity = intensity
+        _set = object.__setattr__
+        _set(self, 'actuator_id', actuator_id)
+        _set(self, 'time_offset_ms', time_offset_ms)
+        _set(self, 'duration_ms', duration_ms)
+        _set(self, 'intensity', intensity)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError(f"ActuatorEvent is immutable (cannot set '{name}')")
+    
+    def __delattr__(self, name):
+        raise AttributeError(f"ActuatorEvent is immutable (cannot delete '{name}')")
+    
+    def as_tuple(self) -> Tuple[int, int, int, int]:
+        """Get event fields as (actuator_id, time_offset_ms, duration_ms, intensity)."""
+        return (self.actuator_id, self.time_offset_ms, self.duration_ms, self.intensity)
+    
+    def __eq__(self, other):
+        if other.__class__ is not ActuatorEvent:
+            return NotImplemented
+        return (self.actuator_id == other.actuator_id
+                and self.time_offset_ms == other.time_offset_ms
+                and self.duration_ms == other.duration_ms
+                and self.intensity == other.intensity)
+    
+    def __hash__(self):
+        return hash(self.as_tuple())
+    
+    def __reduce__(self):
+        return (ActuatorEvent, self.as_tuple())
     
     def __repr__(self):
         return f"ActuatorEvent(actuator={self.actuator_id}, time={self.time_offset_ms}ms, duration={self.duration_ms}ms, intensity={self.intensity})"
 
 
-@dataclass
+# Canonical event order: by time, then by the remaining fields, so that
+# simultaneous events (chords) compare equal in any input order
+_event_order = attrgetter('time_offset_ms', 'actuator_id', 'duration_ms', 'intensity')
+
+
 class Pattern:
-    """Represents a tactile pattern."""
+    """
+    Represents a tactile pattern.
     
-    events: List[ActuatorEvent]
-    total_duration_ms: int
+    Patterns are immutable, slot-based values: events are stored as a tuple
+    sorted by time offset (then actuator, duration and intensity), and two
+    patterns are equal (and hash equal) when their events are equal.
+    Patterns can be used as dict/set keys and shared between encoders.
+    """
     
-    def __init__(self, events: List[ActuatorEvent]):
+    __slots__ = ('events', 'total_duration_ms', '_hash')
+    
+    def __init__(self, events: Iterable[ActuatorEvent]):
         """Initialize pattern with events."""
-        self.events = sorted(events, key=lambda e: e.time_offset_ms)
-        self.total_duration_ms = max(
-            (e.time_offset_ms + e.duration_ms for e in self.events),
+        events = tuple(sorted(events, key=_event_order))
+        _set = object.__setattr__
+        _set(self, 'events', events)
+        _set(self, 'total_duration_ms', max(
+            (e.time_offset_ms + e.duration_ms for e in events),
             default=0
-        )
+        ))
+        _set(self, '_hash', None)
+    
+    def __setattr__(self, name, value):
+        raise AttributeError(f"Pattern is immutable (cannot set '{name}')")
+    
+    def __delattr__(self, name):
+        raise AttributeError(f"Pattern is immutable (cannot delete '{name}')")
     
     def get_duration(self) -> int:
         """Get total pattern duration in milliseconds."""
         return self.total_duration_ms
+    
+    def __eq__(self, other):
+        if other.__class__ is not Pattern:
+            return NotImplemented
+        return self is other or self.events == other.events
+    
+    def __hash__(self):
+        # Cached: shared patterns are hashed repeatedly when used as keys
+        value = self._hash
+        if value is None:
+            value = hash(self.events)
+            object.__setattr__(self, '_hash', value)
+        return value
+    
+    def __reduce__(self):
+        return (Pattern, (self.events,))
+    
+    def __repr__(self):
+        return f"Pattern(events={self.events!r}, total_duration_ms={self.total_duration_ms})"
+
+
+def create_pattern(pattern_def: dict) -> Pattern:
+    """Create Pattern object from pattern definition."""
+    events = []
+    for event_def in pattern_def.get('events', []):
+        event = ActuatorEvent(
+            actuator_id=event_def['actuator'],
+            time_offset_ms=event_def['time_offset'],
+            duration_ms=event_def['duration'],
+            intensity=event_def.get('intensity', 200)
+        )
+        events.append(event)
+    return Pattern(events)
+
+
+def compile_pattern_table(pattern_map: Dict[str, dict]) -> Mapping[str, Pattern]:
+    """
+    Compile a pattern definition map into a read-only table of shared patterns.
+    
+    Keys that share the same definition object (e.g. upper/lowercase letters)
+    also share the same compiled Pattern instance.
+    
+    Args:
+        pattern_map: Mapping of symbol to pattern definition dict
+        
+    Returns:
+        Read-only mapping of symbol to immutable Pattern
+    """
+    compiled = {}
+    by_definition = {}
+    for symbol, pattern_def in pattern_map.items():
+        pattern = by_definition.get(id(pattern_def))
+        if pattern is None:
+            pattern = create_pattern(pattern_def)
+            by_definition[id(pattern_def)] = pattern
+        compiled[symbol] = pattern
+    return MappingProxyType(compiled)
 
 
 class PatternEncoder:
-    """Encodes characters into tactile patterns."""
+    """
+    Encodes characters into tactile patterns.
+    
+    The pattern map is compiled once per encoder class into immutable,
+    shared Pattern instances, so encoding is a single table lookup.
+    """
     
     def __init__(self):
         """Initialize pattern encoder with character mappings."""
         self.pattern_map = self._build_pattern_map()
+        self.pattern_table = self._get_pattern_table()
     
     def encode_character(self, char: str) -> Optional[Pattern]:
         """
@@ -68,14 +184,8 @@ class PatternEncoder:
         Returns:
             Pattern object or None if character not supported
         """
-        if len(char) != 1:
-            return None
-        
-        pattern_def = self.pattern_map.get(char)
-        if pattern_def is None:
-            return None
-        
-        return self._create_pattern(pattern_def)
+        # Table keys are single characters, so longer strings miss naturally
+        return self.pattern_table.get(char)
     
     def encode_text(self, text: str) -> List[Pattern]:
         """
@@ -87,26 +197,41 @@ class PatternEncoder:
         Returns:
             List of Pattern objects
         """
-        patterns = []
-        for char in text:
-            pattern = self.encode_character(char)
-            if pattern:
-                patterns.append(pattern)
-            # Space is handled as pause (no pattern, but spacing)
-        return patterns
+        # Space is handled as pause (empty pattern, spacing applied later)
+        table = self.pattern_table
+        return [table[char] for char in text if char in table]
+    
+    def iter_encode(self, chunks: Iterable[str]) -> Iterator[Pattern]:
+        """
+        Encode a stream of text chunks, yielding patterns incrementally.
+        
+        Produces the same patterns as encode_text(''.join(chunks)).
+        
+        Args:
+            chunks: Iterable of text chunks
+            
+        Yields:
+            Pattern objects
+        """
+        table = self.pattern_table
+        for chunk in chunks:
+            for char in chunk:
+                pattern = table.get(char)
+                if pattern is not None:
+                    yield pattern
     
     def _create_pattern(self, pattern_def: dict) -> Pattern:
         """Create Pattern object from pattern definition."""
-        events = []
-        for event_def in pattern_def.get('events', []):
-            event = ActuatorEvent(
-                actuator_id=event_def['actuator'],
-                time_offset_ms=event_def['time_offset'],
-                duration_ms=event_def['duration'],
-                intensity=event_def.get('intensity', 200)
-            )
-            events.append(event)
-        return Pattern(events)
+        return create_pattern(pattern_def)
+    
+    def _get_pattern_table(self) -> Mapping[str, Pattern]:
+        """Get the compiled pattern table, shared by all instances of this class."""
+        cls = type(self)
+        table = cls.__dict__.get('_shared_pattern_table')
+        if table is None:
+            table = compile_pattern_table(self.pattern_map)
+            cls._shared_pattern_table = table
+        return table
     
     def _build_pattern_map(self) -> dict:
         """Build character to pattern mapping dictionary."""
@@ -5,17 +5,54 @@ Converts text to phonemes and encodes phonemes into tactile patterns,
 based on TAPS (TActile Phonemic Sleeve) research methodology.
 """
 
-from typing import List, Optional, Dict
-from .pattern import Pattern, ActuatorEvent
+import string
+from typing import Iterable, Iterator, List, Mapping, Optional, Dict, Tuple, Union
+from types import MappingProxyType
+from .pattern import Pattern, compile_pattern_table, create_pattern
+from .trie import CompiledTrie
+from .cache import WordCache, get_shared_word_cache
+from .lexicon import Lexicon
+from .stream import iter_split_whitespace, split_whitespace
+
+
+# Space: no pattern (pause handled separately)
+SPACE_PATTERN = Pattern([])
+
+# Characters stripped from a word before lexicon lookup
+_LEXICON_STRIP = string.punctuation + string.whitespace + '“”‘’«»…—–'
 
 
 class PhonemeEncoder:
-    """Encodes text into phonemes and converts phonemes to tactile patterns."""
+    """
+    Encodes text into phonemes and converts phonemes to tactile patterns.
+    
+    The phoneme map is compiled once per encoder class into immutable,
+    shared Pattern instances, so encoding a phoneme is a single table lookup.
+    """
     
-    def __init__(self):
-        """Initialize phoneme encoder with phoneme-to-pattern mappings."""
+    def __init__(self, word_cache: Optional[WordCache] = None,
+                 lexicon: Optional[Union[Lexicon, str]] = None):
+        """
+        Initialize phoneme encoder with phoneme-to-pattern mappings.
+        
+        Args:
+            word_cache: Cache of per-word G2P and pattern results
+                (defaults to the process-wide shared cache)
+            lexicon: Optional pronunciation lexicon (Lexicon or path to a
+                lexicon file). Words found in it use its pronunciation;
+                out-of-vocabulary words fall back to the G2P rules.
+        """
         self.phoneme_map = self._build_phoneme_map()
         self.g2p_map = self._build_g2p_map()  # Basic grapheme-to-phoneme rules
+        self.phoneme_table = self._get_phoneme_table()
+        self.g2p_trie = self._get_g2p_trie()
+        self.lexicon = Lexicon(lexicon) if isinstance(lexicon, str) else lexicon
+        self.word_cache = word_cache if word_cache is not None else get_shared_word_cache()
+        # Separates entries of encoders with different tables in a shared cache
+        if self.lexicon is None:
+            self._cache_namespace = type(self)
+        else:
+            self._cache_namespace = (type(self), self.lexicon.path)
     
     def encode_text(self, text: str) -> List[Pattern]:
         """
@@ -27,18 +64,28 @@ class PhonemeEncoder:
         Returns:
             List of Pattern objects representing phonemes
         """
-        # Convert text to phonemes
-        phonemes = self.text_to_phonemes(text)
-        
-        # Convert phonemes to patterns
         patterns = []
-        for phoneme in phonemes:
-            pattern = self.encode_phoneme(phoneme)
-            if pattern:
-                patterns.append(pattern)
-        
+        for run in self._iter_words(split_whitespace(text), 1, SPACE_PATTERN):
+            patterns.extend(run)
         return patterns
     
+    def iter_encode(self, chunks: Iterable[str]) -> Iterator[Pattern]:
+        """
+        Encode a stream of text chunks, yielding patterns incrementally.
+        
+        Produces the same patterns as encode_text(''.join(chunks)). Words
+        and digraphs that straddle chunk boundaries are reassembled; only
+        the word in progress is held back.
+        
+        Args:
+            chunks: Iterable of text chunks
+            
+        Yields:
+            Pattern objects representing phonemes
+        """
+        for run in self._iter_words(iter_split_whitespace(chunks), 1, SPACE_PATTERN):
+            yield from run
+    
     def text_to_phonemes(self, text: str) -> List[str]:
         """
         Convert text to phoneme sequence.
@@ -46,72 +93,110 @@ class PhonemeEncoder:
         Uses basic rule-based G2P conversion. For production, consider
         using a library like espeak-ng or phonemizer.
         
+        The G2P rules are compiled into a longest-match trie, so conversion
+        is a single left-to-right scan. Spaces are kept as ' ' (pauses);
+        unknown characters are skipped. Results are memoized per word.
+        
         Args:
             text: Text string
             
         Returns:
             List of phoneme symbols (IPA notation)
         """
-        text = text.lower().strip()
         phonemes = []
+        for run in self._iter_words(split_whitespace(text), 0, ' '):
+            phonemes.extend(run)
+        return phonemes
+    
+    def lookup_word(self, word: str) -> Tuple[Tuple[str, ...], Tuple[Pattern, ...]]:
+        """
+        Get the phonemes and patterns of a single word, using the word cache.
         
-        i = 0
-        while i < len(text):
-            char = text[i]
-            
-            # Skip spaces (handled as pauses)
-            if char == ' ':
-                phonemes.append(' ')
-                i += 1
-                continue
+        Args:
+            word: Normalized word (lowercase, no whitespace)
             
-            # Try multi-character graphemes first (trigrams, then bigrams)
-            matched = False
-            for length in [3, 2]:
-                if i + length <= len(text):
-                    ngram = text[i:i+length]
-                    if ngram in self.g2p_map:
-                        result = self.g2p_map[ngram]
-                        # Handle multi-phoneme results (e.g., 'x' -> ['k', 's'])
-                        if isinstance(result, list):
-                            # List of phonemes
-                            phonemes.extend([ph for ph in result if ph in self.phoneme_map])
-                        elif isinstance(result, str):
-                            if len(result) > 1 and result not in self.phoneme_map:
-                                # Split into individual phonemes
-                                for ph in result:
-                                    if ph in self.phoneme_map:
-                                        phonemes.append(ph)
-                            else:
-                                phonemes.append(result)
-                        i += length
-                        matched = True
-                        break
+        Returns:
+            (phonemes, patterns) tuples
+        """
+        key = (self._cache_namespace, word)
+        cache = self.word_cache
+        entry = cache.get(key)
+        if entry is None:
+            entry = self._encode_word(word)
+            cache.put(key, entry)
+        return entry
+    
+    def warm_cache(self, words: Iterable[str]):
+        """
+        Pre-populate the word cache from a frequency list.
+        
+        Args:
+            words: Words, most frequent first (e.g. COMMON_WORDS or the
+                result of load_frequency_list)
+        """
+        namespace = self._cache_namespace
+        self.word_cache.warm(
+            ((namespace, word), self._encode_word(word))
+            for word in (w.lower() for w in words)
+        )
+    
+    def _iter_words(self, tokens: Iterable[str], index: int, space) -> Iterator[tuple]:
+        """
+        Expand alternating word/whitespace tokens into runs of phonemes or patterns.
+        
+        Each ' ' inside the text becomes a pause; leading and trailing
+        whitespace is dropped (pauses are only emitted once the next word
+        arrives).
+        
+        Args:
+            tokens: Tokens from split_whitespace / iter_split_whitespace
+            index: 0 to yield phonemes, 1 to yield patterns
+            space: Item emitted for each pause
             
-            if not matched:
-                # Single character mapping
-                if char in self.g2p_map:
-                    result = self.g2p_map[char]
-                    # Handle multi-phoneme results
-                    if isinstance(result, list):
-                        # List of phonemes
-                        phonemes.extend([ph for ph in result if ph in self.phoneme_map])
-                    elif isinstance(result, str):
-                        if len(result) > 1 and result not in self.phoneme_map:
-                            # Split into individual phonemes
-                            for ph in result:
-                                if ph in self.phoneme_map:
-                                    phonemes.append(ph)
-                        else:
-                            phonemes.append(result)
-                else:
-                    # Fallback: skip unknown characters
-                    # In production, use proper G2P library
-                    pass
-                
+        Yields:
+            Tuples of phonemes or patterns (one per word or pause run)
+        """
+        lookup = self.lookup_word
+        started = False
+        pauses = 0
+        for token in tokens:
+            if not token:
+                continue
+            if token[0].isspace():
+                if started:
+                    pauses += token.count(' ')
+                continue
+            if pauses:
+                yield (space,) * pauses
+                pauses = 0
+            started = True
+            yield lookup(token.lower())[index]
+    
+    def _encode_word(self, word: str) -> Tuple[Tuple[str, ...], Tuple[Pattern, ...]]:
+        """Convert a normalized word (no spaces) into (phonemes, patterns)."""
+        table = self.phoneme_table
+        if self.lexicon is not None:
+            pronunciation = self.lexicon.get(word.strip(_LEXICON_STRIP))
+            if pronunciation is not None:
+                phonemes = tuple(ph for ph in pronunciation if ph in self.phoneme_map)
+                return phonemes, tuple(table[phoneme] for phoneme in phonemes)
+        
+        phonemes = []
+        match = self.g2p_trie.longest_match
+        
+        i = 0
+        length = len(word)
+        while i < length:
+            end, result = match(word, i, length)
+            if result is None:
+                # Fallback: skip unknown characters
+                # In production, use proper G2P library
                 i += 1
+            else:
+                phonemes.extend(result)
+                i = end
         
-        return phonemes
+        return tuple(phonemes), tuple(table[phoneme] for phoneme in phonemes)
     
     def encode_phoneme(self, phoneme: str) -> Optional[Pattern]:
         """
@@ -123,28 +208,48 @@ class PhonemeEncoder:
         Returns:
             Pattern object or None if phoneme not supported
         """
-        if phoneme == ' ':
-            # Space: no pattern (pause handled separately)
-            return Pattern([])
-        
-        pattern_def = self.phoneme_map.get(phoneme)
-        if pattern_def is None:
-            return None
-        
-        return self._create_pattern(pattern_def)
+        return self.phoneme_table.get(phoneme)
     
     def _create_pattern(self, pattern_def: dict) -> Pattern:
         """Create Pattern object from pattern definition."""
-        events = []
-        for event_def in pattern_def.get('events', []):
-            event = ActuatorEvent(
-                actuator_id=event_def['actuator'],
-                time_offset_ms=event_def['time_offset'],
-                duration_ms=event_def['duration'],
-                intensity=event_def.get('intensity', 200)
-            )
-            events.append(event)
-        return Pattern(events)
+        return create_pattern(pattern_def)
+    
+    def _get_phoneme_table(self) -> Mapping[str, Pattern]:
+        """Get the compiled phoneme table, shared by all instances of this class."""
+        cls = type(self)
+        table = cls.__dict__.get('_shared_phoneme_table')
+        if table is None:
+            compiled = dict(compile_pattern_table(self.phoneme_map))
+            compiled[' '] = SPACE_PATTERN
+            table = MappingProxyType(compiled)
+            cls._shared_phoneme_table = table
+        return table
+    
+    def _get_g2p_trie(self) -> CompiledTrie:
+        """Get the compiled G2P trie, shared by all instances of this class."""
+        cls = type(self)
+        trie = cls.__dict__.get('_shared_g2p_trie')
+        if trie is None:
+            trie = CompiledTrie({
+                grapheme: self._compile_g2p_result(result)
+                for grapheme, result in self.g2p_map.items()
+            })
+            cls._shared_g2p_trie = trie
+        return trie
+    
+    def _compile_g2p_result(self, result) -> Tuple[str, ...]:
+        """
+        Normalize a G2P rule result into a tuple of known phonemes.
+        
+        Lists are sequences of phonemes (e.g. 'qu' -> ['k', 'w']); strings are
+        a single phoneme, or are split into individual phonemes if the whole
+        string is not a known phoneme. Silent graphemes map to ().
+        """
+        if isinstance(result, str):
+            if result in self.phoneme_map:
+                return (result,)
+            result = list(result)
+        return tuple(ph for ph in result if ph in self.phoneme_map)
     
     def _build_phoneme_map(self) -> Dict[str, dict]:
         """Build phoneme to pattern mapping dictionary."""
@@ -0,0 +1,179 @@
+"""
+Overlap-aware pattern pipelining for Teletypathy.
+
+Played back to back, each pattern waits until every actuator of the
+previous one is done, although most of its actuators are usually idle.
+The pipelining scheduler starts each pattern as soon as the actuators it
+needs are free and a minimum onset separation since the previous pattern
+has passed, while never double-booking an actuator.
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .pattern import Pattern
+from .timeline import SpacingRules, Timeline, TimelineEvent, compile_timeline
+
+
+class ScheduleReport(NamedTuple):
+    """Pipelined vs. serialized playback of one pattern sequence."""
+    duration_ms: int           # Pipelined playback time
+    serialized_ms: int         # Back-to-back playback time (compile_timeline)
+    characters: int            # Characters (or symbols) the patterns encode
+    patterns: int              # Non-empty patterns scheduled
+
+    @property
+    def cps(self) -> float:
+        """Characters per second with pipelining."""
+        return self.characters * 1000 / self.duration_ms if self.duration_ms else 0.0
+
+    @property
+    def serialized_cps(self) -> float:
+        """Characters per second played back to back."""
+        return self.characters * 1000 / self.serialized_ms if self.serialized_ms else 0.0
+
+    @property
+    def speedup(self) -> float:
+        """Serialized duration divided by pipelined duration."""
+        return self.serialized_ms / self.duration_ms if self.duration_ms else 0.0
+
+
+class PipelineScheduler:
+    """
+    Schedules patterns so that they overlap wherever actuators allow.
+
+    Each pattern starts at the earliest time at which:
+    - at least min_onset_ms have passed since the previous pattern's onset,
+    - every actuator it uses has finished its previous activation plus
+      actuator_gap_ms (no actuator is ever double-booked),
+    - after a word or sentence boundary, the whole channel has been quiet
+      for the word or sentence gap of the spacing rules.
+
+    Patterns keep their order and their internal timing.
+    """
+
+    def __init__(self, min_onset_ms: int = 150, actuator_gap_ms: int = 50,
+                 rules: Optional[SpacingRules] = None):
+        """
+        Initialize scheduler.
+
+        Args:
+            min_onset_ms: Minimum time between the onsets of consecutive patterns
+            actuator_gap_ms: Minimum pause before an actuator is reused
+            rules: Spacing rules for word/sentence gaps and the serialized
+                baseline (defaults to SpacingRules())
+        """
+        self.min_onset_ms = min_onset_ms
+        self.actuator_gap_ms = actuator_gap_ms
+        self.rules = rules if rules is not None else SpacingRules()
+
+    def schedule(self, patterns: Iterable[Pattern], start_ms: int = 0) -> Timeline:
+        """
+        Schedule patterns with overlap.
+
+        Args:
+            patterns: Encoder output (any iterable of Pattern)
+            start_ms: Onset of the first pattern
+
+        Returns:
+            Timeline of the pipelined schedule
+        """
+        min_onset = self.min_onset_ms
+        actuator_gap = self.actuator_gap_ms
+        word_gap = self.rules.word_gap_ms
+        sentence_gap = self.rules.sentence_gap_ms
+        sentence_patterns = self.rules.sentence_patterns
+
+        free: Dict[int, int] = {}    # actuator -> earliest next onset
+        events: List[Tuple[int, int, int, int]] = []
+        pattern_starts: List[int] = []
+        onset = None
+        end = start_ms
+        boundary = False
+        sentence_end = False
+        for pattern in patterns:
+            if not pattern.events:
+                boundary = True
+                continue
+
+            if onset is None:
+                time = start_ms
+            else:
+                time = onset + min_onset
+                if boundary:
+                    time = max(time, end + word_gap)
+                if sentence_end:
+                    time = max(time, end + sentence_gap)
+            for event in pattern.events:
+                ready = free.get(event.actuator_id)
+                if ready is not None and ready - event.time_offset_ms > time:
+                    time = ready - event.time_offset_ms
+
+            for event in pattern.events:
+                event_start = time + event.time_offset_ms
+                event_end = event_start + event.duration_ms
+                events.append((event_start, event.actuator_id, event.duration_ms, event.intensity))
+                free[event.actuator_id] = max(free.get(event.actuator_id, 0),
+                                              event_end + actuator_gap)
+            pattern_starts.append(time)
+            onset = time
+            end = max(end, time + pattern.total_duration_ms)
+            boundary = False
+            sentence_end = pattern in sentence_patterns
+
+        return Timeline.from_events(events, pattern_starts, end)
+
+    def report(self, patterns: Iterable[Pattern], characters: Optional[int] = None) -> ScheduleReport:
+        """
+        Compare pipelined and serialized playback.
+
+        Args:
+            patterns: Encoder output
+            characters: Number of characters encoded (defaults to the
+                number of non-empty patterns)
+
+        Returns:
+            ScheduleReport
+        """
+        patterns = list(patterns)
+        pipelined = self.schedule(patterns)
+        serialized = compile_timeline(patterns, self.rules)
+        if characters is None:
+            characters = pipelined.pattern_count
+        return ScheduleReport(pipelined.end_ms, serialized.end_ms, characters,
+                              pipelined.pattern_count)
+
+    def report_text(self, encoder, text: str) -> ScheduleReport:
+        """
+        Encode text and compare pipelined and serialized playback.
+
+        Args:
+            encoder: Any encoder with encode_text()
+            text: Text to encode
+
+        Returns:
+            ScheduleReport with characters = len(text)
+        """
+        return self.report(encoder.encode_text(text), len(text))
+
+
+def actuator_conflicts(timeline: Timeline, min_gap_ms: int = 0) -> List[Tuple[TimelineEvent, TimelineEvent]]:
+    """
+    Find activations of the same actuator that overlap.
+
+    Args:
+        timeline: Schedule to check
+        min_gap_ms: Required pause between activations of one actuator
+
+    Returns:
+        (earlier, later) pairs of conflicting activations (empty if none)
+    """
+    last: Dict[int, TimelineEvent] = {}
+    conflicts = []
+    for event in timeline:
+        previous = last.get(event.actuator)
+        if previous is not None and event.time_ms < previous.time_ms + previous.duration_ms + min_gap_ms:
+            conflicts.append((previous, event))
+        if previous is None or (event.time_ms + event.duration_ms
+                                > previous.time_ms + previous.duration_ms):
+            last[event.actuator] = event
+    return conflicts
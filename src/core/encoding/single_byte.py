@@ -5,8 +5,38 @@ Encodes characters as 8-bit patterns using all 8 actuators simultaneously,
 optimized for low latency and passive/subconscious learning.
 """
 
-from typing import List, Optional
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
 from .pattern import Pattern, ActuatorEvent
+from .frequency import CodeTable
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is an optional dependency
+    np = None
+
+
+class BulkEncoding(NamedTuple):
+    """
+    Columnar result of SingleByteEncoder.encode_bulk.
+    
+    Row i describes the pattern for input symbol i; column j of the 2-D
+    arrays describes actuator j (zero where the actuator is inactive).
+    """
+    codes: 'np.ndarray'              # (n,) uint8 input byte per symbol (before any code table)
+    masks: 'np.ndarray'              # (n,) uint8 active-actuator bitmask
+    offsets: 'np.ndarray'            # (n, 8) uint16 time offsets (ms)
+    durations: 'np.ndarray'          # (n, 8) uint16 durations (ms)
+    intensities: 'np.ndarray'        # (n, 8) uint8 intensities
+    pattern_durations: 'np.ndarray'  # (n,) uint16 total pattern duration (ms)
+
+
+class _LookupTables(NamedTuple):
+    """256-entry lookup tables for one mode/layout, indexed by byte code."""
+    masks: 'np.ndarray'
+    offsets: 'np.ndarray'
+    durations: 'np.ndarray'
+    intensities: 'np.ndarray'
+    pattern_durations: 'np.ndarray'
 
 
 class SingleByteEncoder:
@@ -22,9 +52,17 @@ class SingleByteEncoder:
     Optimized for ring layout: 8 actuators in two rings (4+4).
     Lower 4 bits → Lower ring (actuators 0-3)
     Upper 4 bits → Upper ring (actuators 4-7)
+    
+    With a code table, each symbol is first mapped to its frequency-optimized
+    code, so common characters fire fewer actuators in every mode.
     """
     
-    def __init__(self, mode: str = 'ring_based', layout: str = 'ring'):
+    # Compiled tables are shared between encoders with the same configuration
+    _shared_pattern_tables: Dict[tuple, Tuple[Pattern, ...]] = {}
+    _shared_lookup_tables: Dict[tuple, _LookupTables] = {}
+    
+    def __init__(self, mode: str = 'ring_based', layout: str = 'ring',
+                 code_table: Optional[Union[CodeTable, str]] = None):
         """
         Initialize single-byte encoder.
         
@@ -38,10 +76,14 @@ class SingleByteEncoder:
             layout: Actuator layout
                 - 'ring': Ring layout (two rings of 4)
                 - 'linear': Linear array (8 in line)
+            code_table: Optional frequency-optimized code table (CodeTable
+                or path to a JSON file written by CodeTable.save)
         """
         self.mode = mode
         self.layout = layout
+        self.code_table = CodeTable.load(code_table) if isinstance(code_table, str) else code_table
         self.frequency_map = self._build_frequency_map()
+        self.pattern_table = self._get_pattern_table()
     
     def encode_character(self, char: str) -> Optional[Pattern]:
         """
@@ -56,8 +98,85 @@ class SingleByteEncoder:
         if len(char) != 1:
             return None
         
-        byte_value = ord(char)
+        # Every mode only looks at the low 8 bits of the character code
+        # (the table already applies the code table)
+        return self.pattern_table[ord(char) & 0xFF]
+    
+    def encode_text(self, text: str) -> List[Pattern]:
+        """
+        Encode text string into single-byte patterns.
+        
+        Args:
+            text: Text string to encode
+            
+        Returns:
+            List of Pattern objects
+        """
+        table = self.pattern_table
+        return [table[ord(char) & 0xFF] for char in text]
+    
+    def iter_encode(self, chunks: Iterable[str]) -> Iterator[Pattern]:
+        """
+        Encode a stream of text chunks, yielding patterns incrementally.
+        
+        Produces the same patterns as encode_text(''.join(chunks)).
+        
+        Args:
+            chunks: Iterable of text chunks
+            
+        Yields:
+            Pattern objects
+        """
+        table = self.pattern_table
+        for chunk in chunks:
+            for char in chunk:
+                yield table[ord(char) & 0xFF]
+    
+    def encode_bulk(self, data: Union[str, bytes, bytearray, memoryview]) -> BulkEncoding:
+        """
+        Encode a whole string or byte buffer in one vectorized pass.
+        
+        Uses a precomputed 256-entry lookup table for the encoder's mode and
+        layout, so the cost is a handful of array gathers regardless of mode.
+        Requires numpy.
+        
+        Args:
+            data: Text string, or byte buffer with one symbol per byte
+            
+        Returns:
+            BulkEncoding with one row per input symbol
+        """
+        if np is None:
+            raise ImportError("encode_bulk requires numpy (pip install numpy)")
         
+        codes = self._to_codes(data)
+        tables = self._get_lookup_tables()
+        # take() with a native index array is much faster than fancy indexing
+        index = codes.astype(np.intp)
+        return BulkEncoding(
+            codes=codes,
+            masks=tables.masks.take(index),
+            offsets=tables.offsets.take(index, axis=0),
+            durations=tables.durations.take(index, axis=0),
+            intensities=tables.intensities.take(index, axis=0),
+            pattern_durations=tables.pattern_durations.take(index),
+        )
+    
+    def patterns_from_codes(self, codes) -> List[Pattern]:
+        """
+        Get Pattern objects for a sequence of byte codes (e.g. BulkEncoding.codes).
+        
+        Args:
+            codes: Iterable of byte codes (0-255)
+            
+        Returns:
+            List of Pattern objects
+        """
+        table = self.pattern_table
+        return [table[code] for code in bytes(codes)]
+    
+    def _build_pattern(self, byte_value: int) -> Pattern:
+        """Build the pattern for a byte value using the current mode."""
         if self.mode == 'ring_based':
             return self._encode_ring_based(byte_value)
         elif self.mode == 'pure':
@@ -71,22 +190,56 @@ class SingleByteEncoder:
         else:
             return self._encode_ring_based(byte_value)  # Default for ring layout
     
-    def encode_text(self, text: str) -> List[Pattern]:
-        """
-        Encode text string into single-byte patterns.
-        
-        Args:
-            text: Text string to encode
-            
-        Returns:
-            List of Pattern objects
-        """
-        patterns = []
-        for char in text:
-            pattern = self.encode_character(char)
-            if pattern:
-                patterns.append(pattern)
-        return patterns
+    def _table_key(self) -> tuple:
+        """Key identifying the compiled tables for this encoder's configuration."""
+        if self.code_table is None or self.code_table.is_identity:
+            return (self.mode, self.layout)
+        return (self.mode, self.layout, self.code_table.codes)
+    
+    def _get_pattern_table(self) -> Tuple[Pattern, ...]:
+        """Get the 256-entry pattern table (indexed by input symbol) for this configuration."""
+        key = self._table_key()
+        table = self._shared_pattern_tables.get(key)
+        if table is None:
+            codes = self.code_table.codes if self.code_table is not None else range(256)
+            table = tuple(self._build_pattern(code) for code in codes)
+            self._shared_pattern_tables[key] = table
+        return table
+    
+    def _get_lookup_tables(self) -> _LookupTables:
+        """Get the 256-entry numpy lookup tables for the current mode and layout."""
+        key = self._table_key()
+        tables = self._shared_lookup_tables.get(key)
+        if tables is None:
+            masks = np.zeros(256, dtype=np.uint8)
+            offsets = np.zeros((256, 8), dtype=np.uint16)
+            durations = np.zeros((256, 8), dtype=np.uint16)
+            intensities = np.zeros((256, 8), dtype=np.uint8)
+            pattern_durations = np.zeros(256, dtype=np.uint16)
+            for code, pattern in enumerate(self.pattern_table):
+                for event in pattern.events:
+                    masks[code] |= 1 << event.actuator_id
+                    offsets[code, event.actuator_id] = event.time_offset_ms
+                    durations[code, event.actuator_id] = event.duration_ms
+                    intensities[code, event.actuator_id] = event.intensity
+                pattern_durations[code] = pattern.total_duration_ms
+            for array in (masks, offsets, durations, intensities, pattern_durations):
+                array.flags.writeable = False
+            tables = _LookupTables(masks, offsets, durations, intensities, pattern_durations)
+            self._shared_lookup_tables[key] = tables
+        return tables
+    
+    @staticmethod
+    def _to_codes(data: Union[str, bytes, bytearray, memoryview]) -> 'np.ndarray':
+        """Convert text or a byte buffer into a uint8 array of byte codes."""
+        if isinstance(data, str):
+            try:
+                data = data.encode('latin-1')
+            except UnicodeEncodeError:
+                # Wide characters: keep the low 8 bits, as encode_character does
+                wide = np.frombuffer(data.encode('utf-32-le'), dtype='<u4')
+                return (wide & 0xFF).astype(np.uint8)
+        return np.frombuffer(data, dtype=np.uint8)
     
     def _encode_ring_based(self, byte_value: int) -> Pattern:
         """
@@ -228,8 +381,15 @@ class SingleByteEncoder:
         
         Common characters get simpler bit patterns (fewer bits set).
         This makes them easier to perceive and learn passively.
+        
+        Returns:
+            Mapping of character to transmitted code for every symbol the
+            code table remaps (empty without a code table: direct mapping)
         """
-        # For now, use direct ASCII mapping
-        # Future: Optimize bit patterns for common characters
-        return {}
+        if self.code_table is None:
+            return {}
+        return {
+            chr(symbol): code
+            for symbol, code in enumerate(self.code_table.codes) if symbol != code
+        }
 
@@ -0,0 +1,62 @@
+"""
+Chunk-safe text splitting for streaming encoders.
+
+Encoders that work on words need to see whole words and whole whitespace
+runs, even when the text arrives in arbitrary chunks. These helpers split
+a stream of chunks exactly as the corresponding whole-text split would,
+holding back only the token that may continue in the next chunk.
+"""
+
+import re
+from typing import Iterable, Iterator, List
+
+
+_WHITESPACE_SPLIT = re.compile(r'(\s+)')
+_PIECES = re.compile(r'(\s+)|\S+')
+
+
+def split_whitespace(text: str) -> List[str]:
+    """
+    Split text into alternating words and whitespace runs.
+
+    Equivalent to re.split(r'(\\s+)', text): the result always starts and
+    ends with a (possibly empty) word.
+
+    Args:
+        text: Text string
+
+    Returns:
+        List of tokens [word, whitespace, word, ..., word]
+    """
+    return _WHITESPACE_SPLIT.split(text)
+
+
+def iter_split_whitespace(chunks: Iterable[str]) -> Iterator[str]:
+    """
+    Streaming version of split_whitespace.
+
+    Yields exactly the tokens split_whitespace(''.join(chunks)) would
+    return, but incrementally: a token is yielded as soon as the next
+    token starts, so words and whitespace runs that straddle chunk
+    boundaries are reassembled.
+
+    Args:
+        chunks: Iterable of text chunks
+
+    Yields:
+        Tokens [word, whitespace, word, ..., word]
+    """
+    pending = ''
+    pending_is_space = False
+    for chunk in chunks:
+        for match in _PIECES.finditer(chunk):
+            piece = match.group()
+            is_space = match.group(1) is not None
+            if is_space == pending_is_space:
+                pending += piece
+            else:
+                yield pending
+                pending, pending_is_space = piece, is_space
+    yield pending
+    if pending_is_space:
+        yield ''
@@ -0,0 +1,263 @@
+"""
+8-bit mode-indicator symbol stream for Teletypathy.
+
+Text is encoded as one byte per symbol (see
+8bit_phoneme_implementation_guide.md):
+
+    0-127    Character mode (actuator 7 OFF): 7-bit ASCII code
+    128-255  Phoneme mode (actuator 7 ON): 128 + phoneme ID
+
+Words are sent as phonemes and everything else (numbers, code, URLs,
+punctuation) as characters, as in HybridEncoder. The byte stream is the
+form to store, cache and transmit; Patterns are only rendered from it
+when needed, through a shared 256-entry table.
+"""
+
+from array import array
+from typing import Iterable, Iterator, List, Optional, Tuple, Union
+
+from .pattern import Pattern
+from .phoneme import PhonemeEncoder
+from .single_byte import SingleByteEncoder
+from .cache import WordCache
+from .frequency import COMMON_WORDS
+from .tokenizer import TokenKind, iter_tokenize, tokenize
+
+
+MODE_BIT = 0x80          # Actuator 7: phoneme mode
+PHONEME_BASE = MODE_BIT
+SPACE_CODE = 0x20
+
+# Phoneme IDs (code - PHONEME_BASE), most frequent consonants first
+PHONEME_SYMBOLS = (
+    # High-frequency consonants
+    'n', 't', 's', 'r', 'l',
+    # Medium-frequency consonants
+    'd', 'k', 'm', 'p', 'b', 'g',
+    # Fricatives
+    'f', 'v', 'z', 'θ', 'ð',
+    # Complex consonants
+    'ʃ', 'ʒ', 'tʃ', 'dʒ', 'ŋ', 'h', 'w', 'j',
+    # Vowels
+    'ə', 'ɪ', 'ɛ', 'æ', 'ʌ', 'ɑ', 'ɔ', 'ʊ', 'u', 'i', 'o',
+    # Diphthongs
+    'aɪ', 'aʊ', 'eɪ', 'oʊ', 'ɔɪ',
+)
+
+PHONEME_CODES = {phoneme: PHONEME_BASE + i for i, phoneme in enumerate(PHONEME_SYMBOLS)}
+
+# Sentence punctuation the tokenizer allows around words
+_EDGE_PUNCTUATION = '.,!?;:'
+
+SymbolCodes = Union[bytes, bytearray, memoryview, array]
+
+
+def is_phoneme_code(code: int) -> bool:
+    """Check whether a byte code is in the phoneme half of the code space."""
+    return bool(code & MODE_BIT)
+
+
+def code_to_symbol(code: int) -> Optional[str]:
+    """
+    Get the character or phoneme a byte code stands for.
+
+    Args:
+        code: Byte code (0-255)
+
+    Returns:
+        Character, phoneme symbol, or None for unassigned phoneme codes
+    """
+    if code & MODE_BIT:
+        index = code - PHONEME_BASE
+        return PHONEME_SYMBOLS[index] if index < len(PHONEME_SYMBOLS) else None
+    return chr(code)
+
+
+def decode_symbols(codes: SymbolCodes) -> List[Tuple[bool, str]]:
+    """
+    Decode a symbol stream into (is_phoneme, symbol) pairs.
+
+    Unassigned phoneme codes are skipped.
+
+    Args:
+        codes: Byte codes
+
+    Returns:
+        List of (is_phoneme, symbol) pairs
+    """
+    symbols = []
+    for code in bytes(codes):
+        symbol = code_to_symbol(code)
+        if symbol is not None:
+            symbols.append((bool(code & MODE_BIT), symbol))
+    return symbols
+
+
+class SymbolStreamEncoder:
+    """
+    Encodes text into a compact 8-bit symbol stream (one byte per symbol).
+
+    Tokens are classified in a single scan and their codes memoized per
+    (strategy, token), so a repeated word costs one cache lookup and one
+    bytes concatenation.
+    """
+
+    def __init__(self, strategy: str = 'adaptive', render_mode: str = 'pure',
+                 word_cache: Optional[WordCache] = None,
+                 token_cache: Optional[WordCache] = None):
+        """
+        Initialize symbol stream encoder.
+
+        Args:
+            strategy: Segmentation strategy
+                - 'adaptive': Phonemes for words, characters for the rest
+                  (recommended)
+                - 'character': Characters only
+                - 'word_level': Phonemes for common words, characters for rare
+            render_mode: SingleByteEncoder mode used to render codes as
+                patterns ('pure' is the guide's one-actuator-per-bit chord)
+            word_cache: Cache of per-word phoneme results
+                (defaults to the process-wide shared cache)
+            token_cache: Cache of per-token codes, keyed by strategy
+                (defaults to a cache private to this encoder)
+        """
+        self.strategy = strategy
+        self.phoneme_encoder = PhonemeEncoder(word_cache=word_cache)
+        self.renderer = SingleByteEncoder(render_mode)
+        self.token_cache = token_cache if token_cache is not None else WordCache(maxsize=4096)
+        self.common_words = set(COMMON_WORDS)
+
+    def encode_symbols(self, text: str) -> bytes:
+        """
+        Encode text into a symbol stream.
+
+        Args:
+            text: Text string to encode
+
+        Returns:
+            Byte codes, one per symbol
+        """
+        return b''.join(self._iter_token_codes(tokenize(text)))
+
+    def encode_symbol_array(self, text: str) -> array:
+        """
+        Encode text into a symbol stream as array('B').
+
+        Args:
+            text: Text string to encode
+
+        Returns:
+            array('B') of byte codes
+        """
+        return array('B', self.encode_symbols(text))
+
+    def iter_encode_symbols(self, chunks: Iterable[str]) -> Iterator[bytes]:
+        """
+        Encode a stream of text chunks, yielding the codes of each token.
+
+        The concatenated output equals encode_symbols(''.join(chunks)).
+
+        Args:
+            chunks: Iterable of text chunks
+
+        Yields:
+            Byte codes for one token
+        """
+        for codes in self._iter_token_codes(iter_tokenize(chunks)):
+            if codes:
+                yield codes
+
+    def encode_text(self, text: str) -> List[Pattern]:
+        """
+        Encode text and render the symbol stream as patterns.
+
+        Args:
+            text: Text string to encode
+
+        Returns:
+            List of Pattern objects
+        """
+        return self.render(self.encode_symbols(text))
+
+    def iter_encode(self, chunks: Iterable[str]) -> Iterator[Pattern]:
+        """
+        Encode a stream of text chunks, yielding rendered patterns.
+
+        Args:
+            chunks: Iterable of text chunks
+
+        Yields:
+            Pattern objects
+        """
+        table = self.renderer.pattern_table
+        for codes in self.iter_encode_symbols(chunks):
+            for code in codes:
+                yield table[code]
+
+    def render(self, codes: SymbolCodes) -> List[Pattern]:
+        """
+        Render byte codes as patterns.
+
+        Args:
+            codes: Byte codes (bytes, bytearray, memoryview or array('B'))
+
+        Returns:
+            List of Pattern objects
+        """
+        return self.renderer.patterns_from_codes(codes)
+
+    def iter_render(self, codes: SymbolCodes) -> Iterator[Pattern]:
+        """
+        Lazily render byte codes as patterns.
+
+        Args:
+            codes: Byte codes
+
+        Yields:
+            Pattern objects
+        """
+        table = self.renderer.pattern_table
+        for code in bytes(codes):
+            yield table[code]
+
+    def set_strategy(self, strategy: str):
+        """Change segmentation strategy."""
+        self.strategy = strategy
+
+    def _iter_token_codes(self, tokens: Iterable[Tuple[TokenKind, str]]) -> Iterator[bytes]:
+        """Encode classified tokens, yielding the codes of each token."""
+        strategy = self.strategy
+        cache = self.token_cache
+        space = bytes((SPACE_CODE,))
+        for kind, token in tokens:
+            if kind is TokenKind.WHITESPACE:
+                # Whitespace runs become a single space
+                yield space
+                continue
+            key = (strategy, token)
+            codes = cache.get(key)
+            if codes is None:
+                codes = self._encode_token(kind, token)
+                cache.put(key, codes)
+            yield codes
+
+    def _encode_token(self, kind: TokenKind, token: str) -> bytes:
+        """Encode one non-whitespace token."""
+        if kind is not TokenKind.WORD or self.strategy == 'character':
+            return self._character_codes(token)
+
+        core = token.strip(_EDGE_PUNCTUATION)
+        if self.strategy == 'word_level' and core.lower() not in self.common_words:
+            return self._character_codes(token)
+
+        phonemes = self.phoneme_encoder.lookup_word(core.lower())[0]
+        if not phonemes:
+            return self._character_codes(token)
+        start = token.index(core)
+        return (self._character_codes(token[:start])
+                + bytes(PHONEME_CODES[phoneme] for phoneme in phonemes)
+                + self._character_codes(token[start + len(core):]))
+
+    def _character_codes(self, text: str) -> bytes:
+        """Character-mode codes for text; non-ASCII characters are dropped."""
+        return text.encode('ascii', 'ignore')
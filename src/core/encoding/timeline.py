@@ -0,0 +1,301 @@
+"""
+Timeline compilation for Teletypathy patterns.
+
+Turns any encoder's pattern sequence into one flat, time-sorted actuator
+schedule of (absolute time, actuator, duration, intensity) entries, with
+configurable gaps between symbols, words and sentences. The schedule is
+stored in compact typed arrays, so executors, simulators and analysis
+tools can consume (and slice) one artifact instead of re-walking lists of
+Pattern objects.
+"""
+
+from array import array
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import FrozenSet, Iterable, Iterator, NamedTuple, Optional, Sequence
+
+from .pattern import Pattern, PatternEncoder
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is an optional dependency
+    np = None
+
+
+def _default_sentence_patterns() -> FrozenSet[Pattern]:
+    """Letter-mode patterns that end a sentence."""
+    return frozenset(PatternEncoder().encode_text('.!?'))
+
+
+@dataclass(frozen=True)
+class SpacingRules:
+    """
+    Gaps inserted between consecutive patterns.
+
+    An empty pattern (Pattern([]), as encoders emit for spaces) marks a
+    word boundary; a run of empty patterns is a single boundary. A pattern
+    in sentence_patterns ends a sentence. The largest applicable gap wins.
+    """
+    symbol_gap_ms: int = 150      # Inter-pattern spacing (design docs: 150ms minimum)
+    word_gap_ms: int = 350        # Gap at a word boundary
+    sentence_gap_ms: int = 700    # Gap after a sentence-ending pattern
+    sentence_patterns: FrozenSet[Pattern] = field(default_factory=_default_sentence_patterns)
+
+    @classmethod
+    def from_pattern_spacing(cls, spacing_ms: int, **kwargs) -> 'SpacingRules':
+        """
+        Create rules from a PATTERN_SPACING config value.
+
+        Word and sentence gaps keep the default proportions to the symbol
+        gap (roughly Morse's 3:7 letter:word spacing).
+
+        Args:
+            spacing_ms: Inter-pattern spacing (ms, 0-255)
+            **kwargs: Overrides for the other fields
+
+        Returns:
+            SpacingRules
+        """
+        if not 0 <= spacing_ms <= 255:
+            raise ValueError("PATTERN_SPACING must be 0-255 ms")
+        values = {
+            'symbol_gap_ms': spacing_ms,
+            'word_gap_ms': spacing_ms * 7 // 3,
+            'sentence_gap_ms': spacing_ms * 14 // 3,
+        }
+        values.update(kwargs)
+        return cls(**values)
+
+    @property
+    def pattern_spacing(self) -> int:
+        """Symbol gap as a PATTERN_SPACING config value (clamped to 0-255 ms)."""
+        return max(0, min(255, self.symbol_gap_ms))
+
+
+# Back-to-back playback with no added gaps
+NO_SPACING = SpacingRules(0, 0, 0, frozenset())
+
+
+class TimelineEvent(NamedTuple):
+    """One scheduled actuator activation."""
+    time_ms: int        # Absolute onset time
+    actuator: int
+    duration_ms: int
+    intensity: int
+
+
+class Timeline:
+    """
+    Flat, time-sorted actuator schedule backed by typed arrays.
+
+    Column i of times/actuators/durations/intensities is one activation.
+    pattern_starts holds the onset of every non-empty pattern, so the
+    number of symbols played is len(pattern_starts).
+    """
+
+    __slots__ = ('times', 'actuators', 'durations', 'intensities', 'pattern_starts', 'end_ms')
+
+    def __init__(self, times: array, actuators: array, durations: array,
+                 intensities: array, pattern_starts: Optional[array] = None,
+                 end_ms: Optional[int] = None):
+        """
+        Initialize timeline from columns sorted by time.
+
+        Args:
+            times: array('I') of onset times (ms)
+            actuators: array('H') of actuator IDs
+            durations: array('H') of durations (ms)
+            intensities: array('B') of intensities
+            pattern_starts: array('I') of pattern onset times (ms)
+            end_ms: End of playback (defaults to the last activation's end)
+        """
+        self.times = times
+        self.actuators = actuators
+        self.durations = durations
+        self.intensities = intensities
+        self.pattern_starts = pattern_starts if pattern_starts is not None else array('I')
+        if end_ms is None:
+            end_ms = max((t + d for t, d in zip(times, durations)), default=0)
+        self.end_ms = end_ms
+
+    @classmethod
+    def from_events(cls, events: Iterable[Sequence[int]],
+                    pattern_starts: Iterable[int] = (),
+                    end_ms: Optional[int] = None) -> 'Timeline':
+        """
+        Build a timeline from (time, actuator, duration, intensity) entries in any order.
+
+        Args:
+            events: Activation entries
+            pattern_starts: Pattern onset times
+            end_ms: End of playback (defaults to the last activation's end)
+
+        Returns:
+            Timeline sorted by time (ties keep input order)
+        """
+        ordered = sorted(events, key=lambda event: event[0])
+        return cls(
+            array('I', [event[0] for event in ordered]),
+            array('H', [event[1] for event in ordered]),
+            array('H', [event[2] for event in ordered]),
+            array('B', [event[3] for event in ordered]),
+            array('I', sorted(pattern_starts)),
+            end_ms,
+        )
+
+    @property
+    def duration_ms(self) -> int:
+        """Total playback time from t=0 (ms)."""
+        return self.end_ms
+
+    @property
+    def pattern_count(self) -> int:
+        """Number of (non-empty) patterns played."""
+        return len(self.pattern_starts)
+
+    @property
+    def actuator_on_ms(self) -> int:
+        """Sum of all activation durations (ms), a proxy for energy use."""
+        return sum(self.durations)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def __iter__(self) -> Iterator[TimelineEvent]:
+        return map(TimelineEvent, self.times, self.actuators, self.durations, self.intensities)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return self._take(index)
+        return TimelineEvent(self.times[index], self.actuators[index],
+                             self.durations[index], self.intensities[index])
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Timeline):
+            return NotImplemented
+        return (self.times == other.times and self.actuators == other.actuators
+                and self.durations == other.durations
+                and self.intensities == other.intensities
+                and self.pattern_starts == other.pattern_starts
+                and self.end_ms == other.end_ms)
+
+    def __repr__(self) -> str:
+        return (f"Timeline(events={len(self)}, patterns={self.pattern_count}, "
+                f"duration={self.end_ms}ms)")
+
+    def slice(self, start_ms: int, end_ms: Optional[int] = None) -> 'Timeline':
+        """
+        Get the activations whose onset lies in [start_ms, end_ms).
+
+        Times stay absolute, and activations keep their full duration even
+        if they run past end_ms. Uses binary search on the sorted onsets.
+
+        Args:
+            start_ms: Window start (inclusive)
+            end_ms: Window end (exclusive, defaults to the end of the timeline)
+
+        Returns:
+            Timeline for the window
+        """
+        times = self.times
+        lo = bisect_left(times, start_ms)
+        hi = len(times) if end_ms is None else bisect_left(times, end_ms, lo)
+        starts = self.pattern_starts
+        p_lo = bisect_left(starts, start_ms)
+        p_hi = len(starts) if end_ms is None else bisect_left(starts, end_ms, p_lo)
+        return self._take(slice(lo, hi), starts[p_lo:p_hi])
+
+    def to_numpy(self) -> dict:
+        """
+        Get zero-copy numpy views of the columns.
+
+        Requires numpy.
+
+        Returns:
+            Dictionary of column name -> ndarray
+        """
+        if np is None:
+            raise ImportError("to_numpy requires numpy (pip install numpy)")
+        return {
+            'times': np.frombuffer(self.times, dtype=np.dtype(self.times.typecode)),
+            'actuators': np.frombuffer(self.actuators, dtype=np.dtype(self.actuators.typecode)),
+            'durations': np.frombuffer(self.durations, dtype=np.dtype(self.durations.typecode)),
+            'intensities': np.frombuffer(self.intensities, dtype=np.dtype(self.intensities.typecode)),
+            'pattern_starts': np.frombuffer(self.pattern_starts,
+                                            dtype=np.dtype(self.pattern_starts.typecode)),
+        }
+
+    def _take(self, index: slice, pattern_starts: Optional[array] = None) -> 'Timeline':
+        """Get a timeline for a slice of the columns."""
+        times = self.times[index]
+        durations = self.durations[index]
+        if pattern_starts is None:
+            first = times[0] if times else 0
+            last = times[-1] if times else -1
+            starts = self.pattern_starts
+            pattern_starts = starts[bisect_left(starts, first):bisect_left(starts, last + 1)]
+        return Timeline(times, self.actuators[index], durations,
+                        self.intensities[index], pattern_starts)
+
+
+def compile_timeline(patterns: Iterable[Pattern],
+                     rules: Optional[SpacingRules] = None,
+                     start_ms: int = 0) -> Timeline:
+    """
+    Compile a pattern sequence into an absolute, gap-aware timeline.
+
+    Patterns are played one after another; the gap before each pattern is
+    decided by the spacing rules (symbol, word or sentence gap). Leading
+    and trailing word boundaries add no time.
+
+    Args:
+        patterns: Encoder output (any iterable of Pattern)
+        rules: Spacing rules (defaults to SpacingRules())
+        start_ms: Onset of the first pattern
+
+    Returns:
+        Timeline
+    """
+    if rules is None:
+        rules = SpacingRules()
+    times = array('I')
+    actuators = array('H')
+    durations = array('H')
+    intensities = array('B')
+    pattern_starts = array('I')
+
+    symbol_gap = rules.symbol_gap_ms
+    word_gap = rules.word_gap_ms
+    sentence_gap = rules.sentence_gap_ms
+    sentence_patterns = rules.sentence_patterns
+
+    time = start_ms
+    end = start_ms
+    started = False
+    boundary = False
+    sentence_end = False
+    for pattern in patterns:
+        events = pattern.events
+        if not events:
+            boundary = True
+            continue
+        if started:
+            gap = symbol_gap
+            if boundary:
+                gap = max(gap, word_gap)
+            if sentence_end:
+                gap = max(gap, sentence_gap)
+            time = end + gap
+        started = True
+        boundary = False
+        sentence_end = pattern in sentence_patterns
+
+        pattern_starts.append(time)
+        for event in events:
+            times.append(time + event.time_offset_ms)
+            actuators.append(event.actuator_id)
+            durations.append(event.duration_ms)
+            intensities.append(event.intensity)
+        end = time + pattern.total_duration_ms
+
+    return Timeline(times, actuators, durations, intensities, pattern_starts, end)
@@ -0,0 +1,97 @@
+"""
+Compiled single-pass tokenizer for mixed-content text.
+
+Splits text into whitespace-delimited tokens and classifies each one
+(word, number, URL/code, whitespace, punctuation) in the same regex scan,
+so encoders can choose an encoding mode per token without re-inspecting it.
+"""
+
+import re
+from enum import Enum
+from typing import Iterable, Iterator, Tuple
+
+
+class TokenKind(Enum):
+    """Token classes produced by the tokenizer."""
+    WORD = "word"                 # Alphabetic word (apostrophes/hyphens allowed)
+    NUMBER = "number"             # Number, e.g. 42, 3.14, 10:30, 50%
+    CODE = "code"                 # URLs, code, mixed alphanumerics (3D, 2nd)
+    WHITESPACE = "whitespace"     # Run of whitespace
+    PUNCTUATION = "punctuation"   # Punctuation only, e.g. '-', '...'
+
+
+# Trailing/leading sentence punctuation allowed around words and numbers
+_EDGE = r'[.,!?;:]*'
+
+# Alternatives are tried in order; every non-whitespace alternative must
+# end at a token boundary, so a token is classified as a whole.
+_TOKEN_RE = re.compile(r"""
+    (?P<whitespace>\s+)
+  | (?P<word>{edge}['\-]*[^\W\d_]+(?:['\-]+[^\W\d_]+)*['\-]*{edge})(?!\S)
+  | (?P<number>[+\-]?\d[\d.,:]*%?{edge})(?!\S)
+  | (?P<punctuation>[^\w\s]+)(?!\S)
+  | (?P<code>\S+)
+""".format(edge=_EDGE), re.VERBOSE)
+
+_KINDS = {kind.value: kind for kind in TokenKind}
+
+
+def tokenize(text: str) -> Iterator[Tuple[TokenKind, str]]:
+    """
+    Split text into classified tokens in a single scan.
+
+    Args:
+        text: Text string
+
+    Yields:
+        (kind, token) pairs covering the whole text, in order
+    """
+    kinds = _KINDS
+    for match in _TOKEN_RE.finditer(text):
+        yield kinds[match.lastgroup], match.group()
+
+
+def iter_tokenize(chunks: Iterable[str]) -> Iterator[Tuple[TokenKind, str]]:
+    """
+    Streaming version of tokenize.
+
+    Yields the same tokens as tokenize(''.join(chunks)). The last token of
+    each chunk is held back (and rescanned) until the next chunk shows
+    whether it continues.
+
+    Args:
+        chunks: Iterable of text chunks
+
+    Yields:
+        (kind, token) pairs
+    """
+    kinds = _KINDS
+    carry = ''
+    for chunk in chunks:
+        if not chunk:
+            continue
+        text = carry + chunk if carry else chunk
+        last = None
+        for match in _TOKEN_RE.finditer(text):
+            if last is not None:
+                yield kinds[last.lastgroup], last.group()
+            last = match
+        carry = text[last.start():] if last is not None else ''
+    if carry:
+        yield from tokenize(carry)
+
+
+def classify_token(token: str) -> TokenKind:
+    """
+    Classify a single token.
+
+    Args:
+        token: Token text (no internal whitespace)
+
+    Returns:
+        TokenKind of the token
+    """
+    match = _TOKEN_RE.match(token)
+    if match is None or match.end() != len(token):
+        return TokenKind.CODE
+    return _KINDS[match.lastgroup]
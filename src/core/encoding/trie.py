@@ -0,0 +1,139 @@
+"""
+Compiled prefix trie for longest-match tokenization.
+
+Used to scan text for graphemes, words and letter clusters in a single
+linear pass without allocating substrings.
+"""
+
+from typing import Any, Dict, Iterable, Iterator, Mapping, Optional, Tuple
+
+
+# Marker key for the value stored at a node (never a single character)
+_VALUE = None
+
+
+class CompiledTrie:
+    """
+    Longest-match trie over string keys.
+
+    Nodes are plain dicts mapping a character to its child node; the value
+    for a key ending at a node is stored under the ``None`` key.
+    """
+
+    __slots__ = ('_root', '_size', 'max_key_length')
+
+    def __init__(self, mapping: Optional[Mapping[str, Any]] = None):
+        """
+        Initialize trie.
+
+        Args:
+            mapping: Optional mapping of key string to value
+        """
+        self._root: Dict[Optional[str], Any] = {}
+        self._size = 0
+        self.max_key_length = 0
+        if mapping:
+            for key, value in mapping.items():
+                self.insert(key, value)
+
+    def insert(self, key: str, value: Any):
+        """
+        Insert a key (replacing any existing value).
+
+        Args:
+            key: Non-empty key string
+            value: Value returned when the key matches (must not be None)
+        """
+        if not key:
+            raise ValueError("Trie keys must be non-empty")
+        if value is None:
+            raise ValueError("Trie values must not be None")
+        node = self._root
+        for char in key:
+            node = node.setdefault(char, {})
+        if _VALUE not in node:
+            self._size += 1
+        node[_VALUE] = value
+        self.max_key_length = max(self.max_key_length, len(key))
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get the value for an exact key."""
+        node = self._root
+        for char in key:
+            node = node.get(char)
+            if node is None:
+                return default
+        return node.get(_VALUE, default)
+
+    def __contains__(self, key: str) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def longest_match(self, text: str, start: int = 0,
+                      end: Optional[int] = None) -> Tuple[int, Any]:
+        """
+        Find the longest key that matches text at a position.
+
+        Args:
+            text: Text to scan
+            start: Position to match at
+            end: Optional end of the region to scan (defaults to len(text))
+
+        Returns:
+            (match_end, value), or (start, None) if no key matches
+        """
+        if end is None:
+            end = len(text)
+        node = self._root
+        best_end, best_value = start, None
+        i = start
+        while i < end:
+            node = node.get(text[i])
+            if node is None:
+                break
+            i += 1
+            value = node.get(_VALUE)
+            if value is not None:
+                best_end, best_value = i, value
+        return best_end, best_value
+
+    def scan(self, text: str, start: int = 0,
+             end: Optional[int] = None) -> Iterator[Tuple[int, int, Any]]:
+        """
+        Tokenize text by repeated longest match.
+
+        Characters that start no key are yielded with a value of None.
+
+        Args:
+            text: Text to scan
+            start: Start position
+            end: Optional end position (defaults to len(text))
+
+        Yields:
+            (start, end, value) for each token
+        """
+        if end is None:
+            end = len(text)
+        match = self.longest_match
+        i = start
+        while i < end:
+            match_end, value = match(text, i, end)
+            if value is None:
+                yield i, i + 1, None
+                i += 1
+            else:
+                yield i, match_end, value
+                i = match_end
+
+    def items(self) -> Iterable[Tuple[str, Any]]:
+        """Iterate over (key, value) pairs."""
+        stack = [('', self._root)]
+        while stack:
+            prefix, node = stack.pop()
+            for char, child in node.items():
+                if char is _VALUE:
+                    yield prefix, child
+                else:
+                    stack.append((prefix + char, child))
@@ -4,11 +4,12 @@ Unified encoding interface supporting both letter-based and phoneme-based encodi
 Allows switching between encoding modes for different use cases.
 """
 
-from typing import List, Optional
+from typing import Iterable, Iterator, List, Optional
 from enum import Enum
 from .pattern import Pattern
 from .pattern import PatternEncoder as LetterEncoder
 from .phoneme import PhonemeEncoder
+from .cache import WordCache
 
 
 class EncodingMode(Enum):
@@ -26,16 +27,19 @@ class UnifiedEncoder:
     - Phoneme-based: TAPS (2020) - faster word recognition, 500 words learned
     """
     
-    def __init__(self, mode: EncodingMode = EncodingMode.LETTER):
+    def __init__(self, mode: EncodingMode = EncodingMode.LETTER,
+                 word_cache: Optional[WordCache] = None):
         """
         Initialize unified encoder.
         
         Args:
             mode: Encoding mode (LETTER or PHONEME)
+            word_cache: Cache of per-word phoneme results
+                (defaults to the process-wide shared cache)
         """
         self.mode = mode
         self.letter_encoder = LetterEncoder()
-        self.phoneme_encoder = PhonemeEncoder()
+        self.phoneme_encoder = PhonemeEncoder(word_cache=word_cache)
     
     def set_mode(self, mode: EncodingMode):
         """Change encoding mode."""
@@ -56,6 +60,24 @@ class UnifiedEncoder:
         else:  # PHONEME
             return self.phoneme_encoder.encode_text(text)
     
+    def iter_encode(self, chunks: Iterable[str]) -> Iterator[Pattern]:
+        """
+        Encode a stream of text chunks based on current mode.
+        
+        Produces the same patterns as encode_text(''.join(chunks)), yielding
+        them incrementally.
+        
+        Args:
+            chunks: Iterable of text chunks
+            
+        Yields:
+            Pattern objects
+        """
+        if self.mode == EncodingMode.LETTER:
+            return self.letter_encoder.iter_encode(chunks)
+        else:  # PHONEME
+            return self.phoneme_encoder.iter_encode(chunks)
+    
     def encode_character(self, char: str) -> Optional[Pattern]:
         """
         Encode a single character (letter mode only).
@@ -0,0 +1,320 @@
+"""
+Word-level contraction encoding for Teletypathy.
+
+Like Braille grade 2, frequent words and letter clusters get dedicated
+single patterns instead of being spelled out. See
+speed_optimization_analysis.md: with the top 100-1000 words contracted,
+reading is estimated to be 2-3x faster.
+"""
+
+from dataclasses import dataclass
+from itertools import combinations, permutations
+from types import MappingProxyType
+from typing import Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from .pattern import ActuatorEvent, Pattern, PatternEncoder
+from .phoneme import PhonemeEncoder
+from .cache import WordCache
+from .frequency import COMMON_WORDS
+from .tokenizer import TokenKind, iter_tokenize, tokenize
+from .trie import CompiledTrie
+
+
+# Most common English letter clusters, most frequent first
+COMMON_CLUSTERS = (
+    'tion', 'ing', 'ion', 'ent', 'and', 'the', 'ough', 'ight',
+    'th', 'he', 'in', 'er', 'an', 're', 'on', 'at', 'en', 'nd',
+    'ti', 'es', 'or', 'te', 'of', 'ed', 'is', 'it', 'al', 'ar',
+    'st', 'to', 'nt', 'ng', 'se', 'ha', 'as', 'ou', 'io', 'le',
+    've', 'co', 'me', 'de', 'hi', 'ri', 'ro', 'ic', 'ne', 'ea',
+)
+
+# Sentence punctuation the tokenizer allows around words
+_EDGE_PUNCTUATION = '.,!?;:'
+
+# Contraction pattern timing
+CLUSTER_DURATION_MS = 120
+WORD_CHORD_DURATION_MS = 100
+WORD_CHORD_GAP_MS = 20
+
+
+def generate_cluster_patterns(count: int) -> List[Pattern]:
+    """
+    Generate distinct cluster patterns: one 3-actuator chord each.
+
+    Letter patterns never fire three actuators at once, so cluster chords
+    are distinguishable from spelled-out letters.
+
+    Args:
+        count: Number of patterns (at most 56)
+
+    Returns:
+        List of Pattern objects
+    """
+    chords = list(combinations(range(8), 3))
+    if count > len(chords):
+        raise ValueError(f"At most {len(chords)} cluster patterns are available")
+    return [
+        Pattern(ActuatorEvent(actuator, 0, CLUSTER_DURATION_MS) for actuator in chord)
+        for chord in chords[:count]
+    ]
+
+
+def generate_word_patterns(count: int) -> List[Pattern]:
+    """
+    Generate distinct word patterns: two consecutive 2-actuator chords each.
+
+    Args:
+        count: Number of patterns (at most 756)
+
+    Returns:
+        List of Pattern objects
+    """
+    pairs = list(combinations(range(8), 2))
+    # Widely separated pairs first: they are easier to tell apart
+    pairs.sort(key=lambda pair: (-(pair[1] - pair[0]), pair))
+    second_offset = WORD_CHORD_DURATION_MS + WORD_CHORD_GAP_MS
+    patterns = []
+    for first, second in permutations(pairs, 2):
+        if len(patterns) >= count:
+            break
+        events = [ActuatorEvent(a, 0, WORD_CHORD_DURATION_MS) for a in first]
+        events += [ActuatorEvent(a, second_offset, WORD_CHORD_DURATION_MS) for a in second]
+        patterns.append(Pattern(events))
+    if len(patterns) < count:
+        raise ValueError(f"At most {len(patterns)} word patterns are available")
+    return patterns
+
+
+@dataclass
+class ContractionReport:
+    """Playback-time comparison of contracted vs. fallback encoding."""
+    baseline_ms: int          # Total duration with the fallback encoding
+    encoded_ms: int           # Total duration with contractions
+    pattern_count: int        # Patterns emitted with contractions
+    baseline_pattern_count: int
+    contracted_words: int     # Words played as a single word pattern
+    contracted_clusters: int  # Letter clusters played as a single pattern
+    total_words: int
+
+    @property
+    def saving_ms(self) -> int:
+        """Playback time saved (ms)."""
+        return self.baseline_ms - self.encoded_ms
+
+    @property
+    def saving_ratio(self) -> float:
+        """Fraction of baseline playback time saved."""
+        return self.saving_ms / self.baseline_ms if self.baseline_ms else 0.0
+
+    @property
+    def speedup(self) -> float:
+        """Baseline duration divided by contracted duration."""
+        return self.baseline_ms / self.encoded_ms if self.encoded_ms else 0.0
+
+
+class WordEncoder:
+    """
+    Word-level contraction encoder (Braille grade-2 style).
+
+    Frequent words map to dedicated two-chord patterns and frequent letter
+    clusters to three-actuator chords. Other words are spelled with the
+    longest matching clusters and letters (or encoded as phonemes), and
+    non-words (numbers, code, punctuation) use character mode.
+    """
+
+    def __init__(self, words: Optional[Sequence[str]] = None,
+                 clusters: Optional[Sequence[str]] = None,
+                 top_n: int = 100, fallback: str = 'character',
+                 token_cache: Optional[WordCache] = None):
+        """
+        Initialize word encoder.
+
+        Args:
+            words: Words to contract, most frequent first
+                (defaults to COMMON_WORDS)
+            clusters: Letter clusters to contract (defaults to COMMON_CLUSTERS;
+                pass () to disable)
+            top_n: Maximum number of words to contract
+            fallback: Encoding for words without a contraction
+                - 'character': Spell with clusters and letters
+                - 'phoneme': Phoneme patterns (letters if G2P yields nothing)
+            token_cache: Cache of per-token encoded patterns
+                (defaults to a cache private to this encoder)
+        """
+        self.fallback = fallback
+        self.letter_encoder = PatternEncoder()
+        self.phoneme_encoder = PhonemeEncoder() if fallback == 'phoneme' else None
+        self.token_cache = token_cache if token_cache is not None else WordCache(maxsize=4096)
+
+        words = list(dict.fromkeys(w.lower() for w in (COMMON_WORDS if words is None else words)))
+        words = words[:top_n]
+        clusters = list(dict.fromkeys(c.lower() for c in (COMMON_CLUSTERS if clusters is None else clusters)))
+
+        self.word_patterns: Mapping[str, Pattern] = MappingProxyType(
+            dict(zip(words, generate_word_patterns(len(words)))))
+        self.cluster_patterns: Mapping[str, Pattern] = MappingProxyType(
+            dict(zip(clusters, generate_cluster_patterns(len(clusters)))))
+
+        # Whole-word contractions
+        self.word_trie = CompiledTrie(self.word_patterns)
+        # Clusters plus single characters, for longest-match spelling
+        self.spelling_trie = CompiledTrie({
+            char: pattern for char, pattern in self.letter_encoder.pattern_table.items()
+            if char == char.lower()
+        })
+        for cluster, pattern in self.cluster_patterns.items():
+            self.spelling_trie.insert(cluster, pattern)
+
+        space_pattern = self.letter_encoder.encode_character(' ')
+        self._space_patterns = (space_pattern,) if space_pattern else ()
+
+    def encode_text(self, text: str) -> List[Pattern]:
+        """
+        Encode text with word and cluster contractions.
+
+        Args:
+            text: Text string to encode
+
+        Returns:
+            List of Pattern objects
+        """
+        patterns = []
+        for run in self._iter_token_patterns(tokenize(text)):
+            patterns.extend(run)
+        return patterns
+
+    def iter_encode(self, chunks: Iterable[str]) -> Iterator[Pattern]:
+        """
+        Encode a stream of text chunks, yielding patterns incrementally.
+
+        Produces the same patterns as encode_text(''.join(chunks)).
+
+        Args:
+            chunks: Iterable of text chunks
+
+        Yields:
+            Pattern objects
+        """
+        for run in self._iter_token_patterns(iter_tokenize(chunks)):
+            yield from run
+
+    def encode_word(self, word: str) -> Optional[Pattern]:
+        """
+        Get the contraction pattern for a word.
+
+        Args:
+            word: Word (case-insensitive)
+
+        Returns:
+            Pattern object or None if the word has no contraction
+        """
+        return self.word_trie.get(word.lower())
+
+    def encode_token(self, kind: TokenKind, token: str) -> Tuple[Pattern, ...]:
+        """
+        Encode one classified token, memoized per token.
+
+        Args:
+            kind: Token kind from the tokenizer
+            token: Token text
+
+        Returns:
+            Tuple of patterns
+        """
+        if kind is TokenKind.WHITESPACE:
+            return self._space_patterns
+        patterns = self.token_cache.get(token)
+        if patterns is None:
+            patterns = tuple(self._encode_token(kind, token))
+            self.token_cache.put(token, patterns)
+        return patterns
+
+    def report(self, text: str) -> ContractionReport:
+        """
+        Report the playback-time saving for a document.
+
+        The baseline is the fallback encoding of the whole document
+        (character or phoneme mode) without contractions.
+
+        Args:
+            text: Document text
+
+        Returns:
+            ContractionReport
+        """
+        encoded_ms = 0
+        pattern_count = 0
+        contracted_words = 0
+        contracted_clusters = 0
+        total_words = 0
+        word_patterns = set(self.word_patterns.values())
+        cluster_patterns = set(self.cluster_patterns.values())
+        for kind, token in tokenize(text):
+            if kind is TokenKind.WORD:
+                total_words += 1
+            for pattern in self.encode_token(kind, token):
+                encoded_ms += pattern.total_duration_ms
+                pattern_count += 1
+                if pattern in word_patterns:
+                    contracted_words += 1
+                elif pattern in cluster_patterns:
+                    contracted_clusters += 1
+
+        if self.phoneme_encoder is not None:
+            baseline = self._encode_uncontracted(text)
+        else:
+            baseline = self.letter_encoder.encode_text(text)
+        return ContractionReport(
+            baseline_ms=sum(p.total_duration_ms for p in baseline),
+            encoded_ms=encoded_ms,
+            pattern_count=pattern_count,
+            baseline_pattern_count=len(baseline),
+            contracted_words=contracted_words,
+            contracted_clusters=contracted_clusters,
+            total_words=total_words,
+        )
+
+    def _iter_token_patterns(self, tokens: Iterable[Tuple[TokenKind, str]]) -> Iterator[Tuple[Pattern, ...]]:
+        """Encode classified tokens, yielding a tuple of patterns per token."""
+        for kind, token in tokens:
+            yield self.encode_token(kind, token)
+
+    def _encode_token(self, kind: TokenKind, token: str) -> List[Pattern]:
+        """Encode one non-whitespace token."""
+        if kind is not TokenKind.WORD:
+            # Numbers, code and punctuation are always spelled out
+            return self.letter_encoder.encode_text(token)
+
+        core = token.strip(_EDGE_PUNCTUATION)
+        start = token.index(core)
+        leading, trailing = token[:start], token[start + len(core):]
+
+        pattern = self.word_trie.get(core.lower())
+        if pattern is not None:
+            return (self.letter_encoder.encode_text(leading) + [pattern]
+                    + self.letter_encoder.encode_text(trailing))
+
+        if self.phoneme_encoder is not None:
+            phoneme_patterns = self.phoneme_encoder.encode_text(token)
+            if phoneme_patterns:
+                return phoneme_patterns
+        return self._spell(token)
+
+    def _spell(self, text: str) -> List[Pattern]:
+        """Spell text with the longest matching clusters and letters."""
+        text = text.lower()
+        return [pattern for _, _, pattern in self.spelling_trie.scan(text) if pattern is not None]
+
+    def _encode_uncontracted(self, text: str) -> List[Pattern]:
+        """Encode text with the phoneme fallback only (report baseline)."""
+        patterns = []
+        for kind, token in tokenize(text):
+            if kind is TokenKind.WHITESPACE:
+                patterns.extend(self._space_patterns)
+            elif kind is TokenKind.WORD:
+                patterns.extend(self.phoneme_encoder.encode_text(token)
+                                or self.letter_encoder.encode_text(token))
+            else:
+                patterns.extend(self.letter_encoder.encode_text(token))
+        return patterns
@@ -0,0 +1,25 @@
+"""Latency instrumentation for Teletypathy."""
+
+from .latency import (
+    LatencyHistogram,
+    LatencyRecorder,
+    STAGE_BUDGETS_MS,
+    disable,
+    enable,
+    get_recorder,
+    instrument_transport,
+    instrumented,
+    is_enabled,
+)
+
+__all__ = [
+    'LatencyHistogram',
+    'LatencyRecorder',
+    'STAGE_BUDGETS_MS',
+    'disable',
+    'enable',
+    'get_recorder',
+    'instrument_transport',
+    'instrumented',
+    'is_enabled',
+]
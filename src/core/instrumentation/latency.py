@@ -0,0 +1,484 @@
+"""
+Per-stage latency instrumentation for the keystroke-to-actuator pipeline.
+
+docs/architecture/data_flow.md budgets every stage (encode <1 ms,
+serialize <0.5 ms, BLE ~5 ms, queue <0.5 ms, execute <2 ms). This module
+measures them: enable() wraps the encoders and Message.serialize,
+instrument_transport() wraps a transport object, and every call records
+its duration into a fixed-bucket histogram.
+
+Nothing is wrapped until enable() is called and disable() restores the
+original methods, so disabled instrumentation costs nothing.
+
+Usage:
+
+    from src.core import instrumentation
+
+    recorder = instrumentation.enable()
+    instrumentation.instrument_transport(ble_client, methods=('write_gatt_char',))
+    ...
+    print(recorder.to_json())
+    instrumentation.disable()
+"""
+
+import functools
+import inspect
+import json
+import math
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# Bucket upper bounds (ns): 1-2-5 series from 1 us to 10 s, plus overflow
+BUCKET_BOUNDS_NS = tuple(
+    mantissa * 10 ** exponent
+    for exponent in range(3, 10)
+    for mantissa in (1, 2, 5)
+) + (10 ** 10,)
+
+# Budgets per stage (ms), from docs/architecture/data_flow.md
+STAGE_BUDGETS_MS = {
+    'encode': 1.0,
+    'serialize': 0.5,
+    'transport': 5.0,
+    'deserialize': 0.5,
+    'queue': 0.5,
+    'execute': 2.0,
+}
+
+# Methods wrapped by enable(), per stage
+ENCODER_METHODS = ('encode_text', 'encode_character', 'encode_bulk', 'encode_symbols')
+TRANSPORT_METHODS = ('write', 'send')
+
+_MISSING = object()
+
+
+class LatencyHistogram:
+    """
+    Fixed-bucket latency histogram.
+
+    Bucket i counts durations in (bounds[i-1], bounds[i]]; the last bucket
+    counts everything above the largest bound. Recording is a bisect and a
+    few integer updates; percentiles are resolved to the bucket bound
+    (capped at the observed maximum).
+    """
+
+    __slots__ = ('bounds', 'counts', 'count', 'total_ns', 'min_ns', 'max_ns', 'budget_ns')
+
+    def __init__(self, bounds: Sequence[int] = BUCKET_BOUNDS_NS, budget_ms: Optional[float] = None):
+        """
+        Initialize histogram.
+
+        Args:
+            bounds: Ascending bucket upper bounds (ns)
+            budget_ms: Latency budget of the stage (ms), reported in snapshots
+        """
+        self.bounds = tuple(bounds)
+        self.counts = array('Q', bytes(8 * (len(self.bounds) + 1)))
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+        self.budget_ns = int(budget_ms * 1e6) if budget_ms is not None else None
+
+    def record(self, duration_ns: int):
+        """
+        Record one duration.
+
+        Args:
+            duration_ns: Duration (ns)
+        """
+        self.counts[bisect_left(self.bounds, duration_ns)] += 1
+        if not self.count or duration_ns < self.min_ns:
+            self.min_ns = duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+        self.count += 1
+        self.total_ns += duration_ns
+
+    def percentile(self, p: float) -> int:
+        """
+        Get a percentile, resolved to its bucket's upper bound.
+
+        Args:
+            p: Percentile (0-100)
+
+        Returns:
+            Duration (ns), 0 if nothing was recorded
+        """
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(self.count * p / 100))
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                bound = self.bounds[i] if i < len(self.bounds) else self.max_ns
+                return min(bound, self.max_ns)
+        return self.max_ns
+
+    def over_budget(self) -> int:
+        """Number of durations above the budget (bucket resolution; 0 without a budget)."""
+        if self.budget_ns is None:
+            return 0
+        first = bisect_left(self.bounds, self.budget_ns)
+        if first < len(self.bounds) and self.bounds[first] == self.budget_ns:
+            first += 1
+        return sum(self.counts[first:])
+
+    def clear(self):
+        """Drop all recorded durations."""
+        for i in range(len(self.counts)):
+            self.counts[i] = 0
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = 0
+        self.max_ns = 0
+
+    def merge(self, other: 'LatencyHistogram'):
+        """Add the counts of a histogram with the same bounds."""
+        if other.bounds != self.bounds:
+            raise ValueError("Histogram bounds differ")
+        if not other.count:
+            return
+        for i, bucket_count in enumerate(other.counts):
+            self.counts[i] += bucket_count
+        self.min_ns = other.min_ns if not self.count else min(self.min_ns, other.min_ns)
+        self.max_ns = max(self.max_ns, other.max_ns)
+        self.count += other.count
+        self.total_ns += other.total_ns
+
+    def to_dict(self) -> dict:
+        """
+        Get summary statistics (in ms) and bucket counts.
+
+        Returns:
+            Dictionary with count, mean/min/p50/p90/p99/max in ms, the
+            budget and the number of durations over it, and the non-empty
+            buckets as {upper bound in ms (or 'inf'): count}
+        """
+        result = {
+            'count': self.count,
+            'mean_ms': self.total_ns / self.count / 1e6 if self.count else 0.0,
+            'min_ms': self.min_ns / 1e6,
+            'p50_ms': self.percentile(50) / 1e6,
+            'p90_ms': self.percentile(90) / 1e6,
+            'p99_ms': self.percentile(99) / 1e6,
+            'max_ms': self.max_ns / 1e6,
+        }
+        if self.budget_ns is not None:
+            result['budget_ms'] = self.budget_ns / 1e6
+            result['over_budget'] = self.over_budget()
+        result['buckets'] = {
+            (str(self.bounds[i] / 1e6) if i < len(self.bounds) else 'inf'): bucket_count
+            for i, bucket_count in enumerate(self.counts)
+            if bucket_count
+        }
+        return result
+
+
+class LatencyRecorder:
+    """
+    Histograms keyed by probe name.
+
+    Probe names are '<stage>' or '<stage>.<detail>' (e.g.
+    'encode.PhonemeEncoder.encode_text'); the stage prefix selects the
+    budget from STAGE_BUDGETS_MS.
+    """
+
+    def __init__(self, bounds: Sequence[int] = BUCKET_BOUNDS_NS):
+        """
+        Initialize recorder.
+
+        Args:
+            bounds: Bucket upper bounds (ns) for new histograms
+        """
+        self.bounds = tuple(bounds)
+        self.histograms: Dict[str, LatencyHistogram] = {}
+
+    def histogram(self, name: str) -> LatencyHistogram:
+        """
+        Get (or create) the histogram of a probe.
+
+        Args:
+            name: Probe name
+
+        Returns:
+            LatencyHistogram
+        """
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            stage = name.split('.', 1)[0]
+            histogram = LatencyHistogram(self.bounds, STAGE_BUDGETS_MS.get(stage))
+            self.histograms[name] = histogram
+        return histogram
+
+    def record(self, name: str, duration_ns: int):
+        """
+        Record a duration measured elsewhere (e.g. device-reported queue or execute time).
+
+        Args:
+            name: Probe name
+            duration_ns: Duration (ns)
+        """
+        self.histogram(name).record(duration_ns)
+
+    @contextmanager
+    def measure(self, name: str) -> Iterator[None]:
+        """
+        Time a block of code.
+
+        Args:
+            name: Probe name
+        """
+        histogram = self.histogram(name)
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            histogram.record(time.perf_counter_ns() - start)
+
+    def stages(self) -> Dict[str, LatencyHistogram]:
+        """
+        Get histograms merged per stage (the probe name prefix).
+
+        Returns:
+            Dictionary of stage -> LatencyHistogram
+        """
+        merged: Dict[str, LatencyHistogram] = {}
+        for name, histogram in self.histograms.items():
+            stage = name.split('.', 1)[0]
+            if stage not in merged:
+                merged[stage] = LatencyHistogram(self.bounds, STAGE_BUDGETS_MS.get(stage))
+            merged[stage].merge(histogram)
+        return merged
+
+    def snapshot(self) -> dict:
+        """
+        Get statistics of every probe and every stage.
+
+        Returns:
+            {'probes': {name: stats}, 'stages': {stage: stats}}
+        """
+        return {
+            'probes': {name: h.to_dict() for name, h in sorted(self.histograms.items())},
+            'stages': {name: h.to_dict() for name, h in sorted(self.stages().items())},
+        }
+
+    def to_json(self, **kwargs) -> str:
+        """
+        Get the snapshot as JSON.
+
+        Args:
+            **kwargs: Passed to json.dumps (default indent=2)
+
+        Returns:
+            JSON string
+        """
+        kwargs.setdefault('indent', 2)
+        return json.dumps(self.snapshot(), **kwargs)
+
+    def save(self, path: str):
+        """
+        Write the snapshot to a JSON file.
+
+        Args:
+            path: Destination file
+        """
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_json())
+            f.write('\n')
+
+    def reset(self):
+        """Drop all recorded durations (installed probes keep recording)."""
+        for histogram in self.histograms.values():
+            histogram.clear()
+
+
+# Active recorder and installed wrappers: (owner, attribute, original or _MISSING)
+_recorder: Optional[LatencyRecorder] = None
+_installed: List[Tuple[object, str, object]] = []
+
+
+def _timed(func, histogram: LatencyHistogram, outermost: Optional[threading.local] = None):
+    """
+    Wrap a function (or coroutine function) to record its duration.
+
+    Probes sharing an outermost state record only the outermost of nested
+    calls on a thread (e.g. HybridEncoder.encode_text, not the
+    PatternEncoder.encode_character calls it makes).
+    """
+    perf_counter_ns = time.perf_counter_ns
+    record = histogram.record
+
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            start = perf_counter_ns()
+            try:
+                return await func(*args, **kwargs)
+            finally:
+                record(perf_counter_ns() - start)
+        return async_wrapper
+
+    if outermost is not None:
+        @functools.wraps(func)
+        def outermost_wrapper(*args, **kwargs):
+            if getattr(outermost, 'active', False):
+                return func(*args, **kwargs)
+            outermost.active = True
+            start = perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(perf_counter_ns() - start)
+                outermost.active = False
+        return outermost_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = perf_counter_ns()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record(perf_counter_ns() - start)
+    return wrapper
+
+
+def _install(owner, attribute: str, name: str, recorder: LatencyRecorder,
+             outermost: Optional[threading.local] = None):
+    """Replace owner.attribute with a timed wrapper (see _timed for outermost)."""
+    if isinstance(owner, type):
+        original = owner.__dict__.get(attribute, _MISSING)
+        func = getattr(owner, attribute)
+    else:
+        original = vars(owner).get(attribute, _MISSING) if hasattr(owner, '__dict__') else _MISSING
+        func = getattr(owner, attribute)
+    if isinstance(original, (staticmethod, classmethod)):
+        wrapped = type(original)(_timed(original.__func__, recorder.histogram(name), outermost))
+    else:
+        wrapped = _timed(func, recorder.histogram(name), outermost)
+    setattr(owner, attribute, wrapped)
+    _installed.append((owner, attribute, original))
+
+
+def _encoder_classes() -> list:
+    from ..encoding import (
+        HybridEncoder,
+        MultiRingPhonemeEncoder,
+        PatternEncoder,
+        PhonemeEncoder,
+        SingleByteEncoder,
+        SymbolStreamEncoder,
+        UnifiedEncoder,
+        WordEncoder,
+    )
+    return [PatternEncoder, PhonemeEncoder, UnifiedEncoder, HybridEncoder, SingleByteEncoder,
+            WordEncoder, SymbolStreamEncoder, MultiRingPhonemeEncoder]
+
+
+def is_enabled() -> bool:
+    """Check whether instrumentation is enabled."""
+    return _recorder is not None
+
+
+def get_recorder() -> Optional[LatencyRecorder]:
+    """Get the active recorder (None while disabled)."""
+    return _recorder
+
+
+def enable(recorder: Optional[LatencyRecorder] = None) -> LatencyRecorder:
+    """
+    Enable instrumentation.
+
+    Wraps the text-encoding methods of every encoder class (probes
+    'encode.<Class>.<method>'; encoder calls made by another encoder are
+    not recorded), Message.serialize ('serialize.Message')
+    and Message.deserialize ('deserialize.Message'). Streaming iter_*
+    methods are not timed: their cost is spread over the consumer's loop.
+
+    Args:
+        recorder: Recorder to use (defaults to a new one; ignored if
+            instrumentation is already enabled)
+
+    Returns:
+        The active LatencyRecorder
+    """
+    global _recorder
+    if _recorder is not None:
+        return _recorder
+    from ..protocol.message import Message
+
+    _recorder = recorder if recorder is not None else LatencyRecorder()
+    # Encoders call each other; only the outermost encode call is a sample
+    encoding = threading.local()
+    for cls in _encoder_classes():
+        for method in ENCODER_METHODS:
+            if method in cls.__dict__:
+                _install(cls, method, f"encode.{cls.__name__}.{method}", _recorder, encoding)
+    _install(Message, 'serialize', 'serialize.Message', _recorder)
+    _install(Message, 'deserialize', 'deserialize.Message', _recorder)
+    return _recorder
+
+
+def instrument_transport(transport, methods: Iterable[str] = TRANSPORT_METHODS,
+                         name: Optional[str] = None):
+    """
+    Time the send methods of a transport object (probes 'transport.<name>.<method>').
+
+    Only the given instance is wrapped; coroutine methods (e.g. bleak's
+    write_gatt_char) are timed until they complete. Does nothing while
+    instrumentation is disabled. disable() unwraps the transport.
+
+    Args:
+        transport: Transport object (serial port, BLE client, socket, ...)
+        methods: Names of the methods to time (missing ones are skipped)
+        name: Label in the probe names (defaults to the class name)
+    """
+    if _recorder is None:
+        return
+    label = name or type(transport).__name__
+    for method in methods:
+        if callable(getattr(transport, method, None)):
+            _install(transport, method, f"transport.{label}.{method}", _recorder)
+
+
+def disable() -> Optional[LatencyRecorder]:
+    """
+    Disable instrumentation and restore every wrapped method.
+
+    Returns:
+        The recorder that was active (with its data), or None
+    """
+    global _recorder
+    while _installed:
+        owner, attribute, original = _installed.pop()
+        if original is _MISSING:
+            delattr(owner, attribute)
+        else:
+            setattr(owner, attribute, original)
+    recorder, _recorder = _recorder, None
+    return recorder
+
+
+@contextmanager
+def instrumented(recorder: Optional[LatencyRecorder] = None) -> Iterator[LatencyRecorder]:
+    """
+    Enable instrumentation for the duration of a with block.
+
+    Args:
+        recorder: Recorder to use (defaults to a new one)
+
+    Yields:
+        The active LatencyRecorder (left enabled afterwards if it already was)
+    """
+    was_enabled = is_enabled()
+    active = enable(recorder)
+    try:
+        yield active
+    finally:
+        if not was_enabled:
+            disable()
@@ -9,8 +9,21 @@ from .message import (
     StatusResponseMessage,
     ErrorMessage,
     ConfigType,
-    ErrorCode
+    ErrorCode,
+    MessageSerializer,
+    PatternDefineMessage,
+    PatternPlayMessage,
+    PatternEvictMessage,
+    ExtendedType,
+    SymbolStreamMessage,
+    TableInfoMessage
 )
+from .decoder import MessageStreamDecoder
+from .codec import CODEC_VERSION, encode, decode
+from .framing import MtuFramer, FragmentReassembler, fragment
+from .reliable import SequencedMessage, AckMessage, ReliableSender, ReliableReceiver, LossyLink
+from .pattern_cache import PatternCacheMirror, CachedPatternSender, DevicePatternCache
+from .symbols import SymbolStreamSender, SymbolStreamExpander, get_symbol_table
 
 __all__ = [
     'Message',
@@ -21,7 +34,32 @@ __all__ = [
     'StatusResponseMessage',
     'ErrorMessage',
     'ConfigType',
-    'ErrorCode'
+    'ErrorCode',
+    'MessageSerializer',
+    'PatternDefineMessage',
+    'PatternPlayMessage',
+    'PatternEvictMessage',
+    'ExtendedType',
+    'SymbolStreamMessage',
+    'TableInfoMessage',
+    'MessageStreamDecoder',
+    'CODEC_VERSION',
+    'encode',
+    'decode',
+    'MtuFramer',
+    'FragmentReassembler',
+    'fragment',
+    'SequencedMessage',
+    'AckMessage',
+    'ReliableSender',
+    'ReliableReceiver',
+    'LossyLink',
+    'PatternCacheMirror',
+    'CachedPatternSender',
+    'DevicePatternCache',
+    'SymbolStreamSender',
+    'SymbolStreamExpander',
+    'get_symbol_table'
 ]
 
 
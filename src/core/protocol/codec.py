@@ -0,0 +1,523 @@
+"""
+Packed little-endian wire codec for Teletypathy messages (encoding version 1).
+
+The message classes in message.py build their payloads with native,
+aligned struct formats: a pattern event 'BHHB' takes 7 bytes with a pad
+byte (more on some platforms), and the byte order depends on the host.
+This codec implements the layout of docs/design/protocol_spec.md with
+explicit byte order and no padding:
+
+    Header:   [version << 4 | type: 1] [payload length: 1]
+    Event:    [actuator: 1] [time offset: 2, LE] [duration: 1] [intensity: 1]
+    Pattern:  [char: 1] [event count: 1] [events...]
+    Batch:    [pattern count: 1] [pattern...]
+    Config:   [config type: 1] [value: 1]
+    Status:   [battery: 1] [RSSI: 1, signed] [error code: 1] [queue length: 1]
+    Error:    [error code: 1] [ASCII message...]
+    Define:   [slot: 1] [pattern]
+    Play:     [slot: 1] [slot: 1]...
+    Evict:    [slot: 1]... (none: all slots)
+    Others:   no payload
+    Checksum: [sum of header and payload & 0xFF: 1]
+
+Encoding version 2 (compact) is version 1 with a step-based pattern
+format. Most patterns are chords: several actuators sharing one time
+offset and duration. A step stores such a group once:
+
+    Pattern:  [char: 1] [step count: 1] [steps...]
+    Step:     [actuator mask: 1] [varint: delta << 1 | has intensity]
+              [duration: 1] [intensity: 1, only if flagged]
+
+The delta is the time since the previous step (LEB128 varint, one byte
+below 64 ms), and the intensity defaults to 200. An 8-actuator chord
+takes 3 bytes instead of 8 events of 5 bytes. Actuators must be 0-7.
+
+Frames carry their encoding version in the high nibble of the first
+header byte (0 for the legacy layout), so all encodings can coexist on
+one link; decode() and MessageStreamDecoder accept any of them.
+"""
+
+import struct
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .message import (
+    CHECKSUM_SIZE,
+    FRAME_OVERHEAD,
+    HEADER_SIZE,
+    LEGACY_VERSION,
+    MAX_PAYLOAD_SIZE,
+    TYPE_MASK,
+    VERSION_SHIFT,
+    ConfigMessage,
+    ConfigType,
+    ErrorCode,
+    ErrorMessage,
+    Message,
+    MessageType,
+    PatternBatchMessage,
+    PatternDefineMessage,
+    PatternEvictMessage,
+    PatternMessage,
+    PatternPlayMessage,
+    StatusResponseMessage,
+)
+
+CODEC_VERSION = 1
+COMPACT_VERSION = 2
+
+DEFAULT_INTENSITY = 200     # Intensity of steps without an intensity byte
+MAX_ACTUATORS = 8           # Actuators addressable by a step mask
+
+# Precompiled packed formats (little-endian, no padding)
+_HEADER = struct.Struct('<BB')
+_BYTE = struct.Struct('<B')
+_EVENT = struct.Struct('<BHBB')
+_PATTERN_HEADER = struct.Struct('<BB')      # [char] [event count]
+_CONFIG = struct.Struct('<BB')
+_STATUS = struct.Struct('<BbBB')
+
+EVENT_SIZE = _EVENT.size                    # 5 bytes
+PATTERN_OVERHEAD = _PATTERN_HEADER.size     # 2 bytes per pattern
+
+# Pattern formats ([char] [count] [events...]) by event count
+_PATTERNS: Dict[int, struct.Struct] = {}
+
+
+def _pattern_struct(count: int) -> struct.Struct:
+    """Get the precompiled format for a pattern with count events."""
+    pattern = _PATTERNS.get(count)
+    if pattern is None:
+        pattern = struct.Struct('<BB' + 'BHBB' * count)
+        if count <= 0xFF:
+            _PATTERNS[count] = pattern
+    return pattern
+
+
+def pattern_size(event_count: int) -> int:
+    """
+    Get the packed size of one pattern (character, count and events).
+
+    Args:
+        event_count: Number of actuator events
+
+    Returns:
+        Size in bytes
+    """
+    return PATTERN_OVERHEAD + EVENT_SIZE * event_count
+
+
+def _pack_pattern(char: str, events: List[dict]) -> bytes:
+    """Pack one pattern."""
+    values = [ord(char) if len(char) == 1 else 0, len(events)]
+    for event in events:
+        values += (
+            event['actuator'],
+            event['time_offset'],
+            event['duration'],
+            event.get('intensity', 200)
+        )
+    try:
+        return _pattern_struct(len(events)).pack(*values)
+    except struct.error as e:
+        raise ValueError(f"Pattern for {char!r} does not fit the packed format: {e}") from None
+
+
+def _unpack_pattern(payload, offset: int) -> Tuple[str, List[dict], int]:
+    """Unpack one pattern at offset; returns (char, events, end offset)."""
+    char_byte, count = _PATTERN_HEADER.unpack_from(payload, offset)
+    start = offset + PATTERN_OVERHEAD
+    end = start + count * EVENT_SIZE
+    if end > len(payload):
+        raise ValueError("Truncated pattern")
+    events = [
+        {
+            'actuator': actuator,
+            'time_offset': time_offset,
+            'duration': duration,
+            'intensity': intensity
+        }
+        for actuator, time_offset, duration, intensity
+        in _EVENT.iter_unpack(payload[start:end])
+    ]
+    return chr(char_byte), events, end
+
+
+def _write_varint(out: bytearray, value: int):
+    """Append an unsigned LEB128 varint."""
+    while value > 0x7F:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(payload, offset: int) -> Tuple[int, int]:
+    """Read an unsigned LEB128 varint; returns (value, end offset)."""
+    value = 0
+    shift = 0
+    while True:
+        byte = payload[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def pack_steps(events: List[dict]) -> bytes:
+    """
+    Pack pattern events as chord steps ([step count] [steps...]).
+
+    Events with the same time offset, duration and intensity become one
+    step; steps are ordered by time offset.
+
+    Args:
+        events: List of actuator events
+
+    Returns:
+        Packed steps
+
+    Raises:
+        ValueError: If an actuator is outside 0-7 or a field does not fit
+    """
+    groups: Dict[Tuple[int, int, int], int] = {}
+    for event in events:
+        actuator = event['actuator']
+        if not 0 <= actuator < MAX_ACTUATORS:
+            raise ValueError(f"Actuator {actuator} cannot be addressed by a step mask")
+        key = (event['time_offset'], event['duration'], event.get('intensity', DEFAULT_INTENSITY))
+        groups[key] = groups.get(key, 0) | 1 << actuator
+    if len(groups) > 0xFF:
+        raise ValueError(f"Pattern has {len(groups)} steps (at most 255)")
+    out = bytearray((len(groups),))
+    previous = 0
+    for (time_offset, duration, intensity), mask in sorted(groups.items()):
+        if time_offset < 0 or not 0 <= duration <= 0xFF or not 0 <= intensity <= 0xFF:
+            raise ValueError(f"Step at {time_offset} ms does not fit the compact format")
+        out.append(mask)
+        flagged = intensity != DEFAULT_INTENSITY
+        _write_varint(out, (time_offset - previous) << 1 | flagged)
+        out.append(duration)
+        if flagged:
+            out.append(intensity)
+        previous = time_offset
+    return bytes(out)
+
+
+def unpack_steps(payload, offset: int = 0) -> Tuple[List[dict], int]:
+    """
+    Unpack chord steps into events.
+
+    Args:
+        payload: Buffer holding packed steps
+        offset: Position of the step count
+
+    Returns:
+        (events ordered by time offset and actuator, end offset)
+
+    Raises:
+        IndexError: If the steps are truncated
+    """
+    count = payload[offset]
+    offset += 1
+    events = []
+    time_offset = 0
+    for _ in range(count):
+        mask = payload[offset]
+        flagged, offset = _read_varint(payload, offset + 1)
+        time_offset += flagged >> 1
+        duration = payload[offset]
+        offset += 1
+        if flagged & 1:
+            intensity = payload[offset]
+            offset += 1
+        else:
+            intensity = DEFAULT_INTENSITY
+        for actuator in range(MAX_ACTUATORS):
+            if mask >> actuator & 1:
+                events.append({
+                    'actuator': actuator,
+                    'time_offset': time_offset,
+                    'duration': duration,
+                    'intensity': intensity
+                })
+    return events, offset
+
+
+def _pack_compact_pattern(char: str, events: List[dict]) -> bytes:
+    """Pack one pattern as chord steps."""
+    return _BYTE.pack(ord(char) if len(char) == 1 and ord(char) <= 0xFF else 0) + pack_steps(events)
+
+
+def _unpack_compact_pattern(payload, offset: int) -> Tuple[str, List[dict], int]:
+    """Unpack one step pattern at offset; returns (char, events, end offset)."""
+    events, end = unpack_steps(payload, offset + 1)
+    return chr(payload[offset]), events, end
+
+
+def _new(cls, msg_type: MessageType, payload) -> Message:
+    """Create a message of cls without building a legacy payload."""
+    message = cls.__new__(cls)
+    Message.__init__(message, msg_type, payload)
+    return message
+
+
+# Payload encoders: message -> packed payload
+
+def _encode_config(message: ConfigMessage) -> bytes:
+    return _CONFIG.pack(message.config_type, message.value)
+
+
+def _encode_status(message: StatusResponseMessage) -> bytes:
+    return _STATUS.pack(message.battery_level, message.connection_quality,
+                        message.error_code, message.queue_length)
+
+
+def _encode_error(message: ErrorMessage) -> bytes:
+    text = message.message.encode('ascii', errors='ignore')[:MAX_PAYLOAD_SIZE - 1]
+    return _BYTE.pack(message.error_code) + text
+
+
+def _encode_slots(message: Message) -> bytes:
+    return bytes(message.slots)
+
+
+def _encode_empty(message: Message) -> bytes:
+    return b''
+
+
+# Payload decoders: payload -> typed message (ValueError/struct.error if malformed)
+
+def _pattern_codecs(pack: Callable, unpack: Callable) -> Dict[MessageType, Tuple[Callable, Callable]]:
+    """Build the codecs of the pattern-carrying messages from a pattern format."""
+    def encode_pattern(message: PatternMessage) -> bytes:
+        return pack(message.char, message.pattern_events)
+
+    def encode_batch(message: PatternBatchMessage) -> bytes:
+        parts = [_BYTE.pack(len(message.patterns))]
+        parts.extend(pack(char, events) for char, events in message.patterns)
+        return b''.join(parts)
+
+    def encode_define(message: PatternDefineMessage) -> bytes:
+        return _BYTE.pack(message.slot) + pack(message.char, message.pattern_events)
+
+    def decode_pattern(payload) -> PatternMessage:
+        char, events, end = unpack(payload, 0)
+        if end != len(payload):
+            raise ValueError("Trailing bytes after pattern")
+        message = _new(PatternMessage, MessageType.PATTERN, payload)
+        message.char = char
+        message.pattern_events = events
+        return message
+
+    def decode_batch(payload) -> PatternBatchMessage:
+        patterns = []
+        offset = 1
+        for _ in range(payload[0]):
+            char, events, offset = unpack(payload, offset)
+            patterns.append((char, events))
+        if offset != len(payload):
+            raise ValueError("Trailing bytes after batch")
+        message = _new(PatternBatchMessage, MessageType.PATTERN_BATCH, payload)
+        message.patterns = patterns
+        return message
+
+    def decode_define(payload) -> PatternDefineMessage:
+        char, events, end = unpack(payload, 1)
+        if end != len(payload):
+            raise ValueError("Trailing bytes after pattern")
+        message = _new(PatternDefineMessage, MessageType.PATTERN_DEFINE, payload)
+        message.slot = payload[0]
+        message.char = char
+        message.pattern_events = events
+        return message
+
+    return {
+        MessageType.PATTERN: (encode_pattern, decode_pattern),
+        MessageType.PATTERN_BATCH: (encode_batch, decode_batch),
+        MessageType.PATTERN_DEFINE: (encode_define, decode_define),
+    }
+
+
+def _decode_config(payload) -> ConfigMessage:
+    if len(payload) != _CONFIG.size:
+        raise ValueError("Config payload must be 2 bytes")
+    config_type, value = _CONFIG.unpack(payload)
+    message = _new(ConfigMessage, MessageType.CONFIG, payload)
+    message.config_type = ConfigType(config_type)
+    message.value = value
+    return message
+
+
+def _decode_status(payload) -> StatusResponseMessage:
+    message = _new(StatusResponseMessage, MessageType.STATUS_RESPONSE, payload)
+    (message.battery_level, message.connection_quality,
+     message.error_code, message.queue_length) = _STATUS.unpack(payload)
+    return message
+
+
+def _decode_error(payload) -> ErrorMessage:
+    message = _new(ErrorMessage, MessageType.ERROR, payload)
+    message.error_code = ErrorCode(payload[0])
+    message.message = bytes(payload[1:]).decode('ascii', errors='ignore')
+    return message
+
+
+def _slots_decoder(cls) -> Callable:
+    def decode(payload) -> Message:
+        message = _new(cls, cls.MESSAGE_TYPE, payload)
+        message.slots = list(payload)
+        return message
+    return decode
+
+
+def _empty_decoder(msg_type: MessageType) -> Callable:
+    def decode(payload) -> Message:
+        if len(payload):
+            raise ValueError(f"{msg_type.name} has no payload")
+        return _new(Message, msg_type, payload)
+    return decode
+
+
+PAYLOAD_CODECS: Dict[MessageType, Tuple[Callable, Callable]] = {
+    **_pattern_codecs(_pack_pattern, _unpack_pattern),
+    MessageType.CONFIG: (_encode_config, _decode_config),
+    MessageType.STATUS_REQUEST: (_encode_empty, _empty_decoder(MessageType.STATUS_REQUEST)),
+    MessageType.STATUS_RESPONSE: (_encode_status, _decode_status),
+    MessageType.HEARTBEAT: (_encode_empty, _empty_decoder(MessageType.HEARTBEAT)),
+    MessageType.ERROR: (_encode_error, _decode_error),
+    MessageType.RESET: (_encode_empty, _empty_decoder(MessageType.RESET)),
+    MessageType.PATTERN_PLAY: (_encode_slots, _slots_decoder(PatternPlayMessage)),
+    MessageType.PATTERN_EVICT: (_encode_slots, _slots_decoder(PatternEvictMessage)),
+}
+
+
+# Payload codecs by encoding version
+COMPACT_PAYLOAD_CODECS: Dict[MessageType, Tuple[Callable, Callable]] = {
+    **PAYLOAD_CODECS,
+    **_pattern_codecs(_pack_compact_pattern, _unpack_compact_pattern),
+}
+
+VERSION_CODECS: Dict[int, Dict[MessageType, Tuple[Callable, Callable]]] = {
+    CODEC_VERSION: PAYLOAD_CODECS,
+    COMPACT_VERSION: COMPACT_PAYLOAD_CODECS,
+}
+
+
+def encode_payload(message: Message, version: int = CODEC_VERSION) -> bytes:
+    """
+    Encode the payload of a message in a packed layout.
+
+    Args:
+        message: Typed message (PatternMessage, ConfigMessage, ...)
+        version: Encoding version (1: packed, 2: compact)
+
+    Returns:
+        Packed payload
+
+    Raises:
+        ValueError: If the message type has no packed layout (transport
+            messages are sent as legacy frames) or a field does not fit
+    """
+    codec = VERSION_CODECS[version].get(message.msg_type)
+    if codec is None:
+        raise ValueError(f"{MessageType(message.msg_type).name} has no version {version} layout")
+    return codec[0](message)
+
+
+def decode_payload(msg_type: int, payload, version: int = CODEC_VERSION) -> Optional[Message]:
+    """
+    Decode a packed payload into a typed message.
+
+    Args:
+        msg_type: Message type (low nibble of the header)
+        payload: Packed payload (bytes or memoryview, kept as the message payload)
+        version: Encoding version (1: packed, 2: compact)
+
+    Returns:
+        Typed message with its version set, or None if the type is unknown
+        or the payload malformed
+    """
+    codec = VERSION_CODECS[version].get(msg_type)
+    if codec is None:
+        return None
+    try:
+        message = codec[1](payload)
+    except (ValueError, IndexError, struct.error):
+        return None
+    message.version = version
+    return message
+
+
+def header_and_payload(message: Message, version: Optional[int] = None) -> Tuple[int, bytes]:
+    """
+    Get header byte 0 and the payload of a message in an encoding.
+
+    Args:
+        message: Typed message
+        version: Encoding version (None: the message's own payload and
+            version, 1: packed, 2: compact; ignored for message types
+            without a packed layout)
+
+    Returns:
+        (header byte 0, payload)
+    """
+    if version in VERSION_CODECS and message.msg_type in VERSION_CODECS[version]:
+        return message.msg_type | version << VERSION_SHIFT, encode_payload(message, version)
+    # Transport and extended messages have a single, byte-explicit layout
+    return message.msg_type | message.version << VERSION_SHIFT, bytes(message.payload)
+
+
+def encode(message: Message, version: int = CODEC_VERSION) -> bytes:
+    """
+    Encode a message as a packed frame.
+
+    Args:
+        message: Typed message
+        version: Encoding version (1: packed, 2: compact)
+
+    Returns:
+        Frame bytes (header, payload, checksum)
+
+    Raises:
+        ValueError: If the message type has no packed layout or the
+            payload does not fit in one frame
+    """
+    payload = encode_payload(message, version)
+    length = len(payload)
+    if length > MAX_PAYLOAD_SIZE:
+        raise ValueError(f"Payload of {length} bytes exceeds {MAX_PAYLOAD_SIZE}")
+    header = _HEADER.pack(message.msg_type | version << VERSION_SHIFT, length)
+    return header + payload + _BYTE.pack((sum(header) + sum(payload)) & 0xFF)
+
+
+def decode(data) -> Optional[Message]:
+    """
+    Decode one complete frame of any encoding version.
+
+    Args:
+        data: Frame bytes
+
+    Returns:
+        Typed message, or None if the frame is incomplete, fails its
+        checksum or is malformed
+    """
+    if len(data) < FRAME_OVERHEAD:
+        return None
+    code, length = _HEADER.unpack_from(data)
+    end = HEADER_SIZE + length
+    if len(data) < end + CHECKSUM_SIZE or sum(data[:end]) & 0xFF != data[end]:
+        return None
+    payload = memoryview(data)[HEADER_SIZE:end]
+    version = code >> VERSION_SHIFT
+    if version in VERSION_CODECS:
+        return decode_payload(code & TYPE_MASK, payload, version)
+    if version == LEGACY_VERSION:
+        from .decoder import MESSAGE_BUILDERS
+        builder = MESSAGE_BUILDERS.get(code)
+        if builder is not None:
+            return builder(payload)
+        try:
+            return Message(MessageType(code), payload)
+        except ValueError:
+            return None
+    return None
@@ -0,0 +1,218 @@
+"""
+Incremental stream decoder for the Teletypathy wire protocol.
+
+BLE notifications and serial reads do not line up with messages: one
+chunk may hold several messages, the tail of one and the head of the
+next, or a single byte. MessageStreamDecoder accepts arbitrary chunks and
+yields typed messages as soon as they are complete.
+
+Payloads are memoryview slices of the chunks they arrived in (no copies),
+so chunks must not be modified after they are fed; only a message split
+across chunks is stitched together into new bytes. On a checksum failure
+or an unknown message type the decoder skips one byte and resynchronizes
+on the next valid frame instead of giving up on the stream. Legacy
+(version 0) and packed (version 1 and 2, see codec.py) frames are told
+apart by the version nibble of the header and may be interleaved freely.
+FRAGMENT frames (see framing.py) are reassembled and yield the original
+message once complete; SEQ_DATA frames (see reliable.py) yield a
+SequencedMessage wrapping the decoded message. While resynchronizing, a header whose length
+reaches past the buffered data is not waited for if a complete valid
+frame follows it, so a false header cannot hold back the messages behind
+it.
+"""
+
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+from . import codec
+from .framing import INCOMPLETE, FragmentReassembler
+from .reliable import AckMessage, SequencedMessage
+from .message import (
+    CHECKSUM_SIZE,
+    HEADER_SIZE,
+    FRAME_OVERHEAD,
+    VERSION_SHIFT,
+    ConfigMessage,
+    ErrorMessage,
+    Message,
+    build_extended,
+    MessageType,
+    PatternBatchMessage,
+    PatternDefineMessage,
+    PatternEvictMessage,
+    PatternMessage,
+    PatternPlayMessage,
+    StatusResponseMessage,
+)
+
+Chunk = Union[bytes, bytearray, memoryview]
+
+# Typed message builders; None means the payload is malformed
+MESSAGE_BUILDERS: Dict[int, Callable[[memoryview], Optional[Message]]] = {
+    MessageType.PATTERN: PatternMessage.from_payload,
+    MessageType.PATTERN_BATCH: PatternBatchMessage.from_payload,
+    MessageType.CONFIG: ConfigMessage.from_payload,
+    MessageType.STATUS_RESPONSE: StatusResponseMessage.from_payload,
+    MessageType.ERROR: ErrorMessage.from_payload,
+    MessageType.PATTERN_DEFINE: PatternDefineMessage.from_payload,
+    MessageType.PATTERN_PLAY: PatternPlayMessage.from_payload,
+    MessageType.PATTERN_EVICT: PatternEvictMessage.from_payload,
+    MessageType.ACK: AckMessage.from_payload,
+    MessageType.EXTENDED: build_extended,
+}
+
+
+class MessageStreamDecoder:
+    """
+    Decodes a byte stream into messages, chunk by chunk.
+
+    Counters:
+        messages: Messages decoded
+        checksum_errors: Candidate frames rejected by their checksum
+        bytes_skipped: Bytes dropped while resynchronizing
+        malformed: Frames with a valid checksum whose payload does not
+            match their message type (dropped as a whole)
+    """
+
+    def __init__(self):
+        """Initialize decoder."""
+        self._pending = b''
+        self._resyncing = False
+        self._builders = {
+            int(msg_type): MESSAGE_BUILDERS.get(msg_type, self._builder(msg_type))
+            for msg_type in MessageType
+        }
+        self._builders.update(
+            (msg_type | version << VERSION_SHIFT, self._packed_builder(msg_type, version))
+            for version, codecs in codec.VERSION_CODECS.items()
+            for msg_type in codecs
+        )
+        self.reassembler = FragmentReassembler(self._builders)
+        self._builders[MessageType.FRAGMENT] = self.reassembler.add
+        builders = self._builders
+        self._builders[MessageType.SEQ_DATA] = lambda payload: SequencedMessage.from_payload(payload, builders)
+        self.messages = 0
+        self.checksum_errors = 0
+        self.bytes_skipped = 0
+        self.malformed = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of buffered bytes of an incomplete message."""
+        return len(self._pending)
+
+    def feed(self, chunk: Chunk) -> List[Message]:
+        """
+        Decode a chunk.
+
+        Args:
+            chunk: Received bytes (must not be modified afterwards)
+
+        Returns:
+            Messages completed by this chunk, in stream order
+        """
+        messages: List[Message] = []
+        view = memoryview(chunk).cast('B')
+        if self._pending:
+            view = self._complete_pending(view, messages)
+        end = self._scan(view, messages)
+        if end < len(view):
+            self._pending = bytes(view[end:])
+        return messages
+
+    def iter_decode(self, chunks: Iterable[Chunk]) -> Iterator[Message]:
+        """
+        Decode a stream of chunks.
+
+        Args:
+            chunks: Received chunks
+
+        Yields:
+            Messages in stream order
+        """
+        for chunk in chunks:
+            yield from self.feed(chunk)
+
+    def reset(self):
+        """Drop any buffered partial message (e.g. after a reconnect)."""
+        self._pending = b''
+        self._resyncing = False
+        self.reassembler.reset()
+
+    def _complete_pending(self, view: memoryview, messages: List[Message]) -> memoryview:
+        """Finish the buffered partial message from the start of view; returns the rest of view."""
+        while self._pending and len(view):
+            pending = self._pending
+            if len(pending) < HEADER_SIZE:
+                needed = HEADER_SIZE - len(pending)
+            else:
+                needed = FRAME_OVERHEAD + pending[1] - len(pending)
+            taken = min(needed, len(view))
+            # Only the split message is copied, never the rest of the chunk
+            stitched = pending + bytes(view[:taken])
+            view = view[taken:]
+            self._pending = b''
+            end = self._scan(memoryview(stitched), messages)
+            self._pending = stitched[end:]
+        return view
+
+    def _scan(self, view: memoryview, messages: List[Message]) -> int:
+        """Decode complete frames in view; returns the offset of the unconsumed tail."""
+        builders = self._builders
+        size = len(view)
+        pos = 0
+        while pos < size:
+            builder = builders.get(view[pos])
+            if builder is None:
+                # Not a message type: resynchronize on the next byte
+                pos += 1
+                self.bytes_skipped += 1
+                self._resyncing = True
+                continue
+            if size - pos < HEADER_SIZE:
+                break
+            end = pos + FRAME_OVERHEAD + view[pos + 1]
+            if end > size:
+                if self._resyncing:
+                    following = self._find_frame(view, pos + 1)
+                    if following >= 0:
+                        self.bytes_skipped += following - pos
+                        pos = following
+                        continue
+                break
+            if sum(view[pos:end - CHECKSUM_SIZE]) & 0xFF != view[end - CHECKSUM_SIZE]:
+                self.checksum_errors += 1
+                self.bytes_skipped += 1
+                self._resyncing = True
+                pos += 1
+                continue
+            message = builder(view[pos + HEADER_SIZE:end - CHECKSUM_SIZE])
+            if message is None:
+                self.malformed += 1
+            elif message is not INCOMPLETE:
+                messages.append(message)
+                self.messages += 1
+            self._resyncing = False
+            pos = end
+        return pos
+
+    def _find_frame(self, view: memoryview, start: int) -> int:
+        """Get the offset of the first complete frame with a valid checksum from start on (-1 if none)."""
+        builders = self._builders
+        size = len(view)
+        for pos in range(start, size - FRAME_OVERHEAD + 1):
+            if view[pos] not in builders:
+                continue
+            end = pos + FRAME_OVERHEAD + view[pos + 1]
+            if end <= size and sum(view[pos:end - CHECKSUM_SIZE]) & 0xFF == view[end - CHECKSUM_SIZE]:
+                return pos
+        return -1
+
+    @staticmethod
+    def _builder(msg_type: MessageType) -> Callable[[memoryview], Message]:
+        """Builder for message types without a typed payload."""
+        return lambda payload: Message(msg_type, payload)
+
+    @staticmethod
+    def _packed_builder(msg_type: MessageType, version: int) -> Callable[[memoryview], Optional[Message]]:
+        """Builder for packed (version 1 and later) payloads."""
+        return lambda payload: codec.decode_payload(msg_type, payload, version)
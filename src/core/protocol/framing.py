@@ -0,0 +1,296 @@
+"""
+MTU-aware packet framing for the Teletypathy wire protocol.
+
+Each BLE write or notification costs a radio event, however few bytes it
+carries. MtuFramer coalesces outgoing frames into packets of up to the
+ATT payload size (MTU - 3 bytes) and splits messages that do not fit in
+one packet, or whose payload exceeds the 255-byte length field, into
+FRAGMENT messages:
+
+    Fragment payload: [transfer id: 1] [index: 1] [count: 1] [data...]
+    Data of all fragments joined: [header byte 0 of the message] [payload...]
+
+A packet is sent once it is full or once its oldest frame has waited
+deadline_ms, so a single keystroke is never held back longer than that.
+The framer has no timer of its own: call poll() at next_deadline (or on
+every tick of the sender loop). FragmentReassembler rebuilds fragmented
+messages on the receiving side; MessageStreamDecoder uses it for
+FRAGMENT frames.
+"""
+
+import struct
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from . import codec
+from .message import (
+    FRAME_OVERHEAD,
+    MAX_PAYLOAD_SIZE,
+    TYPE_MASK,
+    Message,
+    MessageType,
+    _frame_struct,
+)
+
+DEFAULT_MTU = 247           # BLE ATT MTU (docs/hardware/specs.md)
+ATT_HEADER_SIZE = 3         # ATT opcode and handle in every write/notification
+
+_FRAGMENT_HEADER = struct.Struct('BBB')   # [transfer id] [index] [count]
+MAX_FRAGMENTS = 0xFF
+
+# Returned by FragmentReassembler.add until the last fragment arrives
+INCOMPLETE = object()
+
+
+def _frame(code: int, payload: bytes) -> bytes:
+    """Build a frame from header byte 0 and a payload."""
+    length = len(payload)
+    checksum = (code + length + sum(payload)) & 0xFF
+    return _frame_struct(length).pack(code, length, payload, checksum)
+
+
+def fragment(message: Message, max_frame: int = DEFAULT_MTU - ATT_HEADER_SIZE,
+             transfer_id: int = 0, version: Optional[int] = None) -> List[bytes]:
+    """
+    Split a message into FRAGMENT frames.
+
+    Args:
+        message: Message of any size
+        max_frame: Maximum frame size in bytes (at least 5)
+        transfer_id: Identifier shared by the fragments (0-255)
+        version: Payload encoding (None: the message's own, 1: packed, 2: compact)
+
+    Returns:
+        Frames to send in order
+
+    Raises:
+        ValueError: If the message needs more than 255 fragments
+    """
+    code, payload = codec.header_and_payload(message, version)
+    return _fragment_frames(code, payload, max_frame, transfer_id)
+
+
+def _fragment_frames(code: int, payload: bytes, max_frame: int, transfer_id: int) -> List[bytes]:
+    """Split header byte 0 and a payload into FRAGMENT frames."""
+    data = bytes([code]) + payload
+    size = min(MAX_PAYLOAD_SIZE, max_frame - FRAME_OVERHEAD) - _FRAGMENT_HEADER.size
+    if size < 1:
+        raise ValueError(f"Frames of {max_frame} bytes cannot carry fragments")
+    count = -(-len(data) // size)
+    if count > MAX_FRAGMENTS:
+        raise ValueError(f"Message of {len(data)} bytes needs more than {MAX_FRAGMENTS} fragments")
+    return [
+        _frame(MessageType.FRAGMENT,
+               _FRAGMENT_HEADER.pack(transfer_id, index, count) + data[index * size:(index + 1) * size])
+        for index in range(count)
+    ]
+
+
+class MtuFramer:
+    """
+    Coalesces messages into MTU-sized packets with a flush deadline.
+
+    Counters:
+        packets: Packets produced
+        frames: Frames produced (fragments included)
+        fragmented: Messages sent as fragments
+    """
+
+    def __init__(self, mtu: int = DEFAULT_MTU, deadline_ms: float = 10.0,
+                 version: Optional[int] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize framer.
+
+        Args:
+            mtu: Negotiated ATT MTU (packets carry up to mtu - 3 bytes)
+            deadline_ms: Longest time a frame may wait for the packet to
+                fill up (0 sends every message immediately)
+            version: Payload encoding (None: each message's own, 1: packed,
+                2: compact)
+            clock: Time source in seconds
+        """
+        self.packet_size = mtu - ATT_HEADER_SIZE
+        if self.packet_size < FRAME_OVERHEAD + _FRAGMENT_HEADER.size + 1:
+            raise ValueError(f"MTU of {mtu} bytes is too small")
+        self.deadline = deadline_ms / 1000.0
+        self.version = version
+        self.clock = clock
+        self._packet = bytearray()
+        self._since = 0.0
+        self._transfer_id = 0
+        self.packets = 0
+        self.frames = 0
+        self.fragmented = 0
+
+    @property
+    def pending(self) -> int:
+        """Number of bytes waiting in the current packet."""
+        return len(self._packet)
+
+    @property
+    def next_deadline(self) -> Optional[float]:
+        """Clock time by which the current packet must be sent (None if empty)."""
+        return self._since + self.deadline if self._packet else None
+
+    def add(self, message: Message, now: Optional[float] = None) -> List[bytes]:
+        """
+        Queue a message.
+
+        Args:
+            message: Message to send
+            now: Current clock time (read from the clock if None)
+
+        Returns:
+            Packets ready to send, in order
+        """
+        return self.add_many((message,), now)
+
+    def add_many(self, messages: Iterable[Message], now: Optional[float] = None) -> List[bytes]:
+        """
+        Queue several messages at once.
+
+        Args:
+            messages: Messages to send
+            now: Current clock time (read from the clock if None)
+
+        Returns:
+            Packets ready to send, in order
+        """
+        if now is None:
+            now = self.clock()
+        packets: List[bytes] = []
+        for message in messages:
+            for frame in self._frames(message):
+                self._append(frame, now, packets)
+        if self._packet and now - self._since >= self.deadline:
+            packets.append(self._take())
+        return packets
+
+    def poll(self, now: Optional[float] = None) -> List[bytes]:
+        """
+        Send the current packet if its deadline has passed.
+
+        Args:
+            now: Current clock time (read from the clock if None)
+
+        Returns:
+            Packets ready to send (empty or one)
+        """
+        if not self._packet:
+            return []
+        if now is None:
+            now = self.clock()
+        if now - self._since >= self.deadline:
+            return [self._take()]
+        return []
+
+    def flush(self) -> List[bytes]:
+        """
+        Send the current packet regardless of its deadline.
+
+        Returns:
+            Packets ready to send (empty or one)
+        """
+        return [self._take()] if self._packet else []
+
+    def _frames(self, message: Message) -> List[bytes]:
+        """Encode a message as one frame, or as fragments if it does not fit."""
+        code, payload = codec.header_and_payload(message, self.version)
+        if len(payload) <= MAX_PAYLOAD_SIZE and FRAME_OVERHEAD + len(payload) <= self.packet_size:
+            return [_frame(code, payload)]
+        frames = _fragment_frames(code, payload, self.packet_size, self._transfer_id)
+        self._transfer_id = (self._transfer_id + 1) & 0xFF
+        self.fragmented += 1
+        return frames
+
+    def _append(self, frame: bytes, now: float, packets: List[bytes]):
+        """Add a frame to the current packet, sending packets that are full."""
+        if len(self._packet) + len(frame) > self.packet_size:
+            packets.append(self._take())
+        if not self._packet:
+            self._since = now
+        self._packet += frame
+        self.frames += 1
+        if len(self._packet) + FRAME_OVERHEAD > self.packet_size:
+            # Not even an empty frame fits any more
+            packets.append(self._take())
+
+    def _take(self) -> bytes:
+        """Take the current packet."""
+        packet = bytes(self._packet)
+        self._packet.clear()
+        self.packets += 1
+        return packet
+
+
+class FragmentReassembler:
+    """
+    Rebuilds messages from FRAGMENT payloads.
+
+    Fragments of one transfer must arrive in order (the link is ordered);
+    a transfer interrupted by a lost fragment is dropped.
+
+    Counters:
+        completed: Messages reassembled
+        dropped: Transfers abandoned incomplete
+    """
+
+    def __init__(self, builders: Dict[int, Callable]):
+        """
+        Initialize reassembler.
+
+        Args:
+            builders: Message builders by header byte 0 (as used by
+                MessageStreamDecoder)
+        """
+        self._builders = builders
+        self._transfers: Dict[int, Tuple[int, List[bytes]]] = {}
+        self.completed = 0
+        self.dropped = 0
+
+    def add(self, payload) -> Optional[object]:
+        """
+        Add one fragment.
+
+        Args:
+            payload: FRAGMENT message payload
+
+        Returns:
+            The reassembled message after the last fragment, INCOMPLETE
+            before it, or None if the fragment or the message is malformed
+        """
+        if len(payload) <= _FRAGMENT_HEADER.size:
+            return None
+        transfer_id, index, count = _FRAGMENT_HEADER.unpack_from(payload)
+        if index >= count:
+            return None
+        transfers = self._transfers
+        if index == 0:
+            if transfer_id in transfers:
+                self.dropped += 1
+            parts: List[bytes] = []
+            transfers[transfer_id] = (count, parts)
+        else:
+            transfer = transfers.get(transfer_id)
+            if transfer is None or transfer[0] != count or len(transfer[1]) != index:
+                if transfers.pop(transfer_id, None) is not None:
+                    self.dropped += 1
+                return None
+            parts = transfer[1]
+        parts.append(bytes(payload[_FRAGMENT_HEADER.size:]))
+        if len(parts) < count:
+            return INCOMPLETE
+        del transfers[transfer_id]
+        data = b''.join(parts)
+        if data[0] & TYPE_MASK == MessageType.FRAGMENT:
+            return None
+        builder = self._builders.get(data[0])
+        message = builder(memoryview(data)[1:]) if builder is not None else None
+        if message is not None:
+            self.completed += 1
+        return message
+
+    def reset(self):
+        """Drop all incomplete transfers."""
+        self._transfers.clear()
@@ -4,11 +4,59 @@ Communication protocol implementation for Teletypathy.
 Handles message serialization/deserialization and protocol communication.
 """
 
-from typing import List, Optional
+from typing import Iterable, List, Optional, Union
 from enum import IntEnum
 import struct
 
 
+# Precompiled wire formats
+_BYTE = struct.Struct('B')
+_BATCH_ENTRY = struct.Struct('=BH')     # [char: 1] [pattern length: 2]
+# One pattern event as packed natively with 'BHHB' (pad byte after the actuator)
+_EVENT_FORMAT = 'BxHHB'
+_EVENT = struct.Struct('=' + _EVENT_FORMAT)
+
+HEADER_SIZE = 2
+CHECKSUM_SIZE = 1
+FRAME_OVERHEAD = HEADER_SIZE + CHECKSUM_SIZE
+MAX_PAYLOAD_SIZE = 0xFF     # 1-byte length; larger messages are fragmented (see framing.py)
+
+# Header byte 0: message type in bits 0-3, encoding version in bits 4-7
+TYPE_MASK = 0x0F
+VERSION_SHIFT = 4
+LEGACY_VERSION = 0      # Native-aligned payloads built by the message classes below
+
+# Whole-frame formats ([type] [length] [payload] [checksum]) by payload length
+_FRAMES = {}
+
+
+def _frame_struct(length: int) -> struct.Struct:
+    """Get the precompiled frame format for a payload length."""
+    frame = _FRAMES.get(length)
+    if frame is None:
+        if length > MAX_PAYLOAD_SIZE:
+            raise ValueError(
+                f"Payload of {length} bytes exceeds {MAX_PAYLOAD_SIZE}; "
+                "split it or send it with framing.fragment()"
+            )
+        frame = _FRAMES[length] = struct.Struct(f'BB{length}sB')
+    return frame
+
+
+# Pattern formats ([count] [events...]) by event count
+_PATTERNS = {}
+
+
+def _pattern_struct(count: int) -> struct.Struct:
+    """Get the precompiled format for a pattern with count events."""
+    pattern = _PATTERNS.get(count)
+    if pattern is None:
+        pattern = struct.Struct('=B' + _EVENT_FORMAT * count)
+        if count <= 0xFF:
+            _PATTERNS[count] = pattern
+    return pattern
+
+
 class MessageType(IntEnum):
     """Message types for protocol."""
     PATTERN = 0x01
@@ -19,6 +67,19 @@ class MessageType(IntEnum):
     HEARTBEAT = 0x06
     ERROR = 0x07
     RESET = 0x08
+    PATTERN_DEFINE = 0x09   # Store a pattern in a device cache slot
+    PATTERN_PLAY = 0x0A     # Play cached patterns by slot
+    PATTERN_EVICT = 0x0B    # Free device cache slots
+    FRAGMENT = 0x0C         # Part of a message too large for one frame
+    SEQ_DATA = 0x0D         # Sequence-numbered message (acknowledged delivery)
+    ACK = 0x0E              # Cumulative and selective acknowledgement
+    EXTENDED = 0x0F         # Extended type in the first payload byte (see ExtendedType)
+
+
+class ExtendedType(IntEnum):
+    """Extended message types (first payload byte of EXTENDED messages)."""
+    SYMBOL_STREAM = 0x01    # Symbol codes for the device to expand with its own table
+    TABLE_INFO = 0x02       # Symbol table query/answer (table ID and digest)
 
 
 class ConfigType(IntEnum):
@@ -36,21 +97,57 @@ class ErrorCode(IntEnum):
     INVALID_PATTERN = 0x04
     DEVICE_BUSY = 0x05
     LOW_BATTERY = 0x06
+    UNKNOWN_SLOT = 0x07
+    UNKNOWN_TABLE = 0x08
 
 
 class Message:
     """Base message class."""
     
+    # Payload encoding version (header bits 4-7); see codec.py for version 1
+    version = LEGACY_VERSION
+    
     def __init__(self, msg_type: MessageType, payload: bytes = b''):
         """Initialize message."""
         self.msg_type = msg_type
         self.payload = payload
     
+    @property
+    def serialized_size(self) -> int:
+        """Size of the serialized message in bytes."""
+        return len(self.payload) + FRAME_OVERHEAD
+    
     def serialize(self) -> bytes:
         """Serialize message to bytes."""
-        header = struct.pack('BB', self.msg_type, len(self.payload))
-        checksum = self._calculate_checksum(header + self.payload)
-        return header + self.payload + struct.pack('B', checksum)
+        payload = self.payload
+        if not isinstance(payload, bytes):
+            payload = bytes(payload)  # struct needs bytes (decoded payloads are memoryviews)
+        length = len(payload)
+        code = self.msg_type | self.version << VERSION_SHIFT
+        checksum = (code + length + sum(payload)) & 0xFF
+        return _frame_struct(length).pack(code, length, payload, checksum)
+    
+    def serialize_into(self, buffer: Union[bytearray, memoryview], offset: int = 0) -> int:
+        """
+        Serialize message into a writable buffer without intermediate copies.
+        
+        Args:
+            buffer: Writable buffer with at least serialized_size bytes
+                from offset on
+            offset: Position to write at
+            
+        Returns:
+            Number of bytes written
+        """
+        payload = self.payload
+        if not isinstance(payload, bytes):
+            payload = bytes(payload)
+        length = len(payload)
+        code = self.msg_type | self.version << VERSION_SHIFT
+        checksum = (code + length + sum(payload)) & 0xFF
+        frame = _frame_struct(length)
+        frame.pack_into(buffer, offset, code, length, payload, checksum)
+        return frame.size
     
     @staticmethod
     def deserialize(data: bytes) -> Optional['Message']:
@@ -70,7 +167,9 @@ class Message:
         if checksum != calculated_checksum:
             return None
         
-        return Message(MessageType(msg_type), payload)
+        message = Message(MessageType(msg_type & TYPE_MASK), payload)
+        message.version = msg_type >> VERSION_SHIFT
+        return message
     
     @staticmethod
     def _calculate_checksum(data: bytes) -> int:
@@ -102,16 +201,18 @@ class PatternMessage(Message):
     def _serialize_pattern(events: List[dict]) -> bytes:
         """Serialize pattern events to bytes."""
         # Format: [actuator_count: 1 byte] [events...]
-        # Each event: [actuator_id: 1] [time_offset: 2] [duration: 1] [intensity: 1]
-        data = struct.pack('B', len(events))
+        # Each event (7 bytes, _EVENT_FORMAT in native byte order):
+        # [actuator_id: 1] [pad: 1] [time_offset: 2] [duration: 2] [intensity: 1]
+        # The packed 5-byte layout of wire version 1 is in codec.py
+        values = [len(events)]
         for event in events:
-            data += struct.pack('BHHB', 
+            values += (
                 event['actuator'],
                 event['time_offset'],
                 event['duration'],
                 event.get('intensity', 200)
             )
-        return data
+        return _pattern_struct(len(events)).pack(*values)
     
     @staticmethod
     def deserialize_pattern(data: bytes) -> tuple:
@@ -120,23 +221,42 @@ class PatternMessage(Message):
             return None, None
         
         char = chr(data[0])
-        actuator_count = data[1]
-        
-        events = []
-        offset = 2
-        for _ in range(actuator_count):
-            if len(data) < offset + 5:  # actuator (1) + time_offset (2) + duration (1) + intensity (1)
-                break
-            actuator, time_offset, duration, intensity = struct.unpack('BHHB', data[offset:offset+5])
-            events.append({
+        # Events are packed as 'BHHB' (7 bytes, see _serialize_pattern); a
+        # truncated last event is dropped
+        actuator_count = min(data[1], (len(data) - 2) // _EVENT.size)
+        return char, PatternMessage._deserialize_events(data, 2, actuator_count)
+    
+    @staticmethod
+    def _deserialize_events(data: bytes, offset: int, count: int) -> List[dict]:
+        """Deserialize count pattern events starting at offset."""
+        return [
+            {
                 'actuator': actuator,
                 'time_offset': time_offset,
                 'duration': duration,
                 'intensity': intensity
-            })
-            offset += 5
+            }
+            for actuator, time_offset, duration, intensity
+            in _EVENT.iter_unpack(data[offset:offset + count * _EVENT.size])
+        ]
+    
+    @classmethod
+    def from_payload(cls, payload: bytes) -> Optional['PatternMessage']:
+        """
+        Build a message from a received payload without re-serializing it.
         
-        return char, events
+        Args:
+            payload: Message payload (bytes or memoryview)
+            
+        Returns:
+            PatternMessage, or None if the payload is malformed
+        """
+        if len(payload) < 2 or len(payload) != 2 + payload[1] * _EVENT.size:
+            return None
+        message = cls.__new__(cls)
+        Message.__init__(message, MessageType.PATTERN, payload)
+        message.char, message.pattern_events = cls.deserialize_pattern(payload)
+        return message
 
 
 class PatternBatchMessage(Message):
@@ -149,14 +269,65 @@ class PatternBatchMessage(Message):
         Args:
             patterns: List of (char, pattern_events) tuples
         """
-        payload = struct.pack('B', len(patterns))
+        # Join the parts once (linear in batch size)
+        parts = [_BYTE.pack(len(patterns))]
         for char, events in patterns:
             char_byte = ord(char) if len(char) == 1 else 0
             pattern_data = PatternMessage._serialize_pattern(events)
-            payload += struct.pack('B', char_byte) + struct.pack('H', len(pattern_data)) + pattern_data
+            parts.append(_BATCH_ENTRY.pack(char_byte, len(pattern_data)))
+            parts.append(pattern_data)
+        payload = b''.join(parts)
         
         super().__init__(MessageType.PATTERN_BATCH, payload)
         self.patterns = patterns
+    
+    @staticmethod
+    def deserialize_batch(data: bytes) -> Optional[List[tuple]]:
+        """
+        Deserialize patterns from a batch payload.
+        
+        Args:
+            data: Message payload
+            
+        Returns:
+            List of (char, pattern_events) tuples, or None if malformed
+        """
+        if not data:
+            return None
+        patterns = []
+        offset = 1
+        for _ in range(data[0]):
+            if len(data) < offset + _BATCH_ENTRY.size + 1:
+                return None
+            char_byte, size = _BATCH_ENTRY.unpack_from(data, offset)
+            offset += _BATCH_ENTRY.size
+            count = data[offset]
+            if size != 1 + count * _EVENT.size or len(data) < offset + size:
+                return None
+            patterns.append((chr(char_byte), PatternMessage._deserialize_events(data, offset + 1, count)))
+            offset += size
+        if offset != len(data):
+            return None
+        return patterns
+    
+    @classmethod
+    def from_payload(cls, payload: bytes) -> Optional['PatternBatchMessage']:
+        """
+        Build a message from a received payload without re-serializing it.
+        
+        Args:
+            payload: Message payload (bytes or memoryview)
+            
+        Returns:
+            PatternBatchMessage, or None if the payload is malformed
+        """
+        patterns = cls.deserialize_batch(payload)
+        if patterns is None:
+            return None
+        message = cls.__new__(cls)
+        Message.__init__(message, MessageType.PATTERN_BATCH, payload)
+        message.patterns = patterns
+        return message
 
 
 class ConfigMessage(Message):
@@ -176,6 +347,29 @@ class ConfigMessage(Message):
             return None, None
         config_type, value = struct.unpack('BB', data[:2])
         return ConfigType(config_type), value
+    
+    @classmethod
+    def from_payload(cls, payload: bytes) -> Optional['ConfigMessage']:
+        """
+        Build a message from a received payload without re-serializing it.
+        
+        Args:
+            payload: Message payload (bytes or memoryview)
+            
+        Returns:
+            ConfigMessage, or None if the payload is malformed
+        """
+        if len(payload) != 2:
+            return None
+        try:
+            config_type, value = cls.deserialize_config(payload)
+        except ValueError:
+            return None
+        message = cls.__new__(cls)
+        Message.__init__(message, MessageType.CONFIG, payload)
+        message.config_type = config_type
+        message.value = value
+        return message
 
 
 class StatusResponseMessage(Message):
@@ -183,7 +377,8 @@ class StatusResponseMessage(Message):
     
     def __init__(self, battery_level: int, connection_quality: int, error_code: int, queue_length: int):
         """Initialize status response message."""
-        payload = struct.pack('BBBB', battery_level, connection_quality, error_code, queue_length)
+        # Connection quality is a signed RSSI (-128 to 127 dBm)
+        payload = struct.pack('BbBB', battery_level, connection_quality, error_code, queue_length)
         super().__init__(MessageType.STATUS_RESPONSE, payload)
         self.battery_level = battery_level
         self.connection_quality = connection_quality
@@ -195,8 +390,27 @@ class StatusResponseMessage(Message):
         """Deserialize status from message payload."""
         if len(data) < 4:
             return None, None, None, None
-        battery, quality, error, queue = struct.unpack('BBBB', data[:4])
+        battery, quality, error, queue = struct.unpack('BbBB', data[:4])
         return battery, quality, error, queue
+    
+    @classmethod
+    def from_payload(cls, payload: bytes) -> Optional['StatusResponseMessage']:
+        """
+        Build a message from a received payload without re-serializing it.
+        
+        Args:
+            payload: Message payload (bytes or memoryview)
+            
+        Returns:
+            StatusResponseMessage, or None if the payload is malformed
+        """
+        if len(payload) != 4:
+            return None
+        message = cls.__new__(cls)
+        Message.__init__(message, MessageType.STATUS_RESPONSE, payload)
+        (message.battery_level, message.connection_quality,
+         message.error_code, message.queue_length) = cls.deserialize_status(payload)
+        return message
 
 
 class ErrorMessage(Message):
@@ -204,11 +418,292 @@ class ErrorMessage(Message):
     
     def __init__(self, error_code: ErrorCode, message: str = ''):
         """Initialize error message."""
-        msg_bytes = message.encode('ascii', errors='ignore')[:255]
+        msg_bytes = message.encode('ascii', errors='ignore')[:MAX_PAYLOAD_SIZE - 1]
         payload = struct.pack('B', error_code) + msg_bytes
         super().__init__(MessageType.ERROR, payload)
         self.error_code = error_code
         self.message = message
+    
+    @classmethod
+    def from_payload(cls, payload: bytes) -> Optional['ErrorMessage']:
+        """
+        Build a message from a received payload without re-serializing it.
+        
+        Args:
+            payload: Message payload (bytes or memoryview)
+            
+        Returns:
+            ErrorMessage, or None if the payload is malformed
+        """
+        if not payload:
+            return None
+        try:
+            error_code = ErrorCode(payload[0])
+        except ValueError:
+            return None
+        message = cls.__new__(cls)
+        Message.__init__(message, MessageType.ERROR, payload)
+        message.error_code = error_code
+        message.message = bytes(payload[1:]).decode('ascii', errors='ignore')
+        return message
 
 
+class PatternDefineMessage(Message):
+    """Pattern definition message (stores a pattern in a device cache slot)."""
+    
+    def __init__(self, slot: int, char: str, pattern_events: List[dict]):
+        """
+        Initialize pattern definition message.
+        
+        Args:
+            slot: Device cache slot (0-255)
+            char: Character the pattern encodes (ASCII, informational)
+            pattern_events: List of actuator events
+        """
+        # Payload: slot (1 byte) + the PatternMessage payload
+        char_byte = ord(char) if len(char) == 1 else 0
+        payload = _BYTE.pack(slot) + _BYTE.pack(char_byte) + \
+            PatternMessage._serialize_pattern(pattern_events)
+        super().__init__(MessageType.PATTERN_DEFINE, payload)
+        self.slot = slot
+        self.char = char
+        self.pattern_events = pattern_events
+    
+    @classmethod
+    def from_payload(cls, payload: bytes) -> Optional['PatternDefineMessage']:
+        """
+        Build a message from a received payload without re-serializing it.
+        
+        Args:
+            payload: Message payload (bytes or memoryview)
+            
+        Returns:
+            PatternDefineMessage, or None if the payload is malformed
+        """
+        if len(payload) < 3 or len(payload) != 3 + payload[2] * _EVENT.size:
+            return None
+        message = cls.__new__(cls)
+        Message.__init__(message, MessageType.PATTERN_DEFINE, payload)
+        message.slot = payload[0]
+        message.char, message.pattern_events = PatternMessage.deserialize_pattern(payload[1:])
+        return message
+
+
+class _SlotListMessage(Message):
+    """Message whose payload is a list of device cache slots (1 byte each)."""
+    
+    MESSAGE_TYPE: MessageType
+    
+    def __init__(self, slots: List[int]):
+        """
+        Initialize slot list message.
+        
+        Args:
+            slots: Device cache slots (0-255, at most 255 of them)
+        """
+        super().__init__(self.MESSAGE_TYPE, bytes(slots))
+        self.slots = list(slots)
+    
+    @classmethod
+    def from_payload(cls, payload: bytes) -> Optional['_SlotListMessage']:
+        """
+        Build a message from a received payload without re-serializing it.
+        
+        Args:
+            payload: Message payload (bytes or memoryview)
+            
+        Returns:
+            Message with its slots (never None: any byte is a valid slot)
+        """
+        message = cls.__new__(cls)
+        Message.__init__(message, cls.MESSAGE_TYPE, payload)
+        message.slots = list(payload)
+        return message
+
+
+class PatternPlayMessage(_SlotListMessage):
+    """Pattern play message (plays cached patterns in order)."""
+    
+    MESSAGE_TYPE = MessageType.PATTERN_PLAY
+
+
+class PatternEvictMessage(_SlotListMessage):
+    """Pattern evict message (frees cache slots; no slots frees all of them)."""
+    
+    MESSAGE_TYPE = MessageType.PATTERN_EVICT
+
+
+class SymbolStreamMessage(Message):
+    """Symbol stream message (one code per character or phoneme)."""
+    
+    def __init__(self, table_id: int, symbols: bytes):
+        """
+        Initialize symbol stream message.
+        
+        Args:
+            table_id: Symbol table the codes refer to (see symbols.py)
+            symbols: Symbol codes (at most MAX_PAYLOAD_SIZE - 2)
+        """
+        payload = _BYTE.pack(ExtendedType.SYMBOL_STREAM) + _BYTE.pack(table_id) + bytes(symbols)
+        super().__init__(MessageType.EXTENDED, payload)
+        self.table_id = table_id
+        self.symbols = bytes(symbols)
+    
+    @classmethod
+    def from_payload(cls, payload: bytes) -> Optional['SymbolStreamMessage']:
+        """
+        Build a message from a received payload without re-serializing it.
+        
+        Args:
+            payload: Message payload including the extended type byte
+            
+        Returns:
+            SymbolStreamMessage, or None if the payload is malformed
+        """
+        if len(payload) < 2:
+            return None
+        message = cls.__new__(cls)
+        Message.__init__(message, MessageType.EXTENDED, payload)
+        message.table_id = payload[1]
+        message.symbols = bytes(payload[2:])
+        return message
+
+
+class TableInfoMessage(Message):
+    """Symbol table info message (table ID and content digest)."""
+    
+    _INFO = struct.Struct('<BBI')     # [extended type] [table ID] [digest]
+    
+    def __init__(self, table_id: int, digest: int = 0):
+        """
+        Initialize table info message.
+        
+        Args:
+            table_id: Symbol table ID
+            digest: CRC-32 of the table contents (0: table not available)
+        """
+        payload = self._INFO.pack(ExtendedType.TABLE_INFO, table_id, digest)
+        super().__init__(MessageType.EXTENDED, payload)
+        self.table_id = table_id
+        self.digest = digest
+    
+    @classmethod
+    def from_payload(cls, payload: bytes) -> Optional['TableInfoMessage']:
+        """
+        Build a message from a received payload without re-serializing it.
+        
+        Args:
+            payload: Message payload including the extended type byte
+            
+        Returns:
+            TableInfoMessage, or None if the payload is malformed
+        """
+        if len(payload) != cls._INFO.size:
+            return None
+        message = cls.__new__(cls)
+        Message.__init__(message, MessageType.EXTENDED, payload)
+        _, message.table_id, message.digest = cls._INFO.unpack(payload)
+        return message
+
+
+EXTENDED_BUILDERS = {
+    ExtendedType.SYMBOL_STREAM: SymbolStreamMessage.from_payload,
+    ExtendedType.TABLE_INFO: TableInfoMessage.from_payload,
+}
 
+
+def build_extended(payload: bytes) -> Optional[Message]:
+    """
+    Build an EXTENDED message from its payload.
+    
+    Args:
+        payload: Message payload (extended type byte first)
+        
+    Returns:
+        Typed message, or None if the extended type is unknown or the
+        payload malformed
+    """
+    builder = EXTENDED_BUILDERS.get(payload[0]) if len(payload) else None
+    return builder(payload) if builder is not None else None
+
+
+class MessageSerializer:
+    """
+    Serializes messages into one reusable buffer.
+    
+    Results are memoryviews into the buffer, valid until the next call;
+    copy them (bytes(view)) to keep them. The buffer only grows, and a
+    grown buffer is a new bytearray, so views still held by the caller
+    stay intact.
+    """
+    
+    def __init__(self, capacity: int = 4096):
+        """
+        Initialize serializer.
+        
+        Args:
+            capacity: Initial buffer size in bytes
+        """
+        self._buffer = bytearray(capacity)
+    
+    @property
+    def capacity(self) -> int:
+        """Current buffer size in bytes."""
+        return len(self._buffer)
+    
+    def serialize(self, message: Message) -> memoryview:
+        """
+        Serialize one message.
+        
+        Args:
+            message: Message to serialize
+            
+        Returns:
+            memoryview of the serialized message
+        """
+        buffer = self._reserve(message.serialized_size)
+        size = message.serialize_into(buffer)
+        return memoryview(buffer)[:size]
+    
+    def write_many(self, messages: Iterable[Message]) -> memoryview:
+        """
+        Serialize messages back to back into the buffer.
+        
+        Args:
+            messages: Messages to serialize
+            
+        Returns:
+            memoryview of the concatenated serialized messages
+        """
+        buffer = self._buffer
+        capacity = len(buffer)
+        offset = 0
+        # Message.serialize_into, inlined
+        for message in messages:
+            payload = message.payload
+            if not isinstance(payload, bytes):
+                payload = bytes(payload)
+            length = len(payload)
+            code = message.msg_type | message.version << VERSION_SHIFT
+            frame = _FRAMES.get(length) or _frame_struct(length)
+            end = offset + frame.size
+            if end > capacity:
+                buffer = self._grow(end, offset)
+                capacity = len(buffer)
+            frame.pack_into(buffer, offset, code, length, payload,
+                            (code + length + sum(payload)) & 0xFF)
+            offset = end
+        return memoryview(buffer)[:offset]
+    
+    def _reserve(self, size: int) -> bytearray:
+        """Get a buffer of at least size bytes."""
+        if size > len(self._buffer):
+            self._grow(size, 0)
+        return self._buffer
+    
+    def _grow(self, size: int, keep: int) -> bytearray:
+        """Replace the buffer with one of at least size bytes, keeping its first keep bytes."""
+        buffer = bytearray(max(size, 2 * len(self._buffer)))
+        buffer[:keep] = self._buffer[:keep]
+        self._buffer = buffer
+        return buffer
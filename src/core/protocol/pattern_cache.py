@@ -0,0 +1,267 @@
+"""
+Device pattern cache and its host-side mirror.
+
+A PatternMessage carries the full event list every time, although the
+encoders only produce a few hundred distinct patterns. The device keeps
+a fixed number of pattern slots instead. The host defines a pattern in a
+slot once (PATTERN_DEFINE) and afterwards plays it with a 1-byte slot
+reference (PATTERN_PLAY), with consecutive references sharing one frame.
+
+The host cannot query the device cache, so PatternCacheMirror tracks
+which pattern is in which slot and picks the least recently used slot to
+overwrite on a miss. Both sides stay in sync as long as every message
+the sender produces is delivered in order. After a reconnect or device
+reset, call CachedPatternSender.reset() and send the PATTERN_EVICT
+message it returns.
+"""
+
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Tuple
+
+from .message import (
+    ErrorCode,
+    ErrorMessage,
+    Message,
+    PatternDefineMessage,
+    PatternEvictMessage,
+    PatternPlayMessage,
+)
+
+MAX_SLOTS = 256             # Slots are addressed by one byte
+MAX_PLAY_SLOTS = 255        # Slot references per PATTERN_PLAY frame
+
+PatternKey = Tuple[Tuple[int, int, int, int], ...]
+
+
+def pattern_key(pattern_events: List[dict]) -> PatternKey:
+    """
+    Get the cache key of a pattern (identical events share a slot).
+
+    Args:
+        pattern_events: List of actuator events
+
+    Returns:
+        Hashable key
+    """
+    return tuple(
+        (event['actuator'], event['time_offset'], event['duration'], event.get('intensity', 200))
+        for event in pattern_events
+    )
+
+
+class PatternCacheMirror:
+    """
+    Host-side copy of the device slot table with LRU replacement.
+
+    Counters:
+        hits: Lookups of cached patterns
+        misses: Lookups of patterns that had to be defined
+        evictions: Cached patterns replaced to free a slot
+    """
+
+    def __init__(self, capacity: int = 64):
+        """
+        Initialize mirror.
+
+        Args:
+            capacity: Number of device slots (1-256)
+        """
+        if not 1 <= capacity <= MAX_SLOTS:
+            raise ValueError(f"capacity must be between 1 and {MAX_SLOTS}")
+        self.capacity = capacity
+        self._slots: 'OrderedDict[Hashable, int]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def lookup(self, key: Hashable) -> Optional[int]:
+        """
+        Get the slot of a cached pattern, marking it as recently used.
+
+        Args:
+            key: Pattern key
+
+        Returns:
+            Slot, or None on a miss
+        """
+        slot = self._slots.get(key)
+        if slot is None:
+            self.misses += 1
+            return None
+        self._slots.move_to_end(key)
+        self.hits += 1
+        return slot
+
+    def assign(self, key: Hashable) -> Tuple[int, Optional[Hashable]]:
+        """
+        Assign a slot to a pattern that is not cached.
+
+        Args:
+            key: Pattern key
+
+        Returns:
+            (slot, key of the evicted pattern or None)
+        """
+        slots = self._slots
+        evicted = None
+        if len(slots) < self.capacity:
+            slot = len(slots)
+        else:
+            evicted, slot = slots.popitem(last=False)
+            self.evictions += 1
+        slots[key] = slot
+        return slot, evicted
+
+    def clear(self):
+        """Forget all cached patterns (the device cache was cleared)."""
+        self._slots.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._slots
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def hit_rate(self) -> float:
+        """Get the fraction of lookups that were hits."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        return {
+            'size': len(self._slots),
+            'capacity': self.capacity,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hit_rate(),
+        }
+
+
+class CachedPatternSender:
+    """
+    Turns patterns into PATTERN_DEFINE/PATTERN_PLAY messages.
+
+    Cached patterns are sent as slot references; consecutive references
+    are coalesced into one PATTERN_PLAY message (up to 255 per frame).
+    A miss flushes the pending references, defines the pattern in the
+    least recently used slot and then references it.
+    """
+
+    def __init__(self, capacity: int = 64, mirror: Optional[PatternCacheMirror] = None):
+        """
+        Initialize sender.
+
+        Args:
+            capacity: Number of device slots (ignored if mirror is given)
+            mirror: Mirror to use (e.g. shared with a status display)
+        """
+        self.mirror = mirror if mirror is not None else PatternCacheMirror(capacity)
+
+    def iter_messages(self, patterns: Iterable[Tuple[str, List[dict]]]) -> Iterator[Message]:
+        """
+        Encode patterns as cache messages.
+
+        Args:
+            patterns: (char, pattern_events) tuples in playback order
+
+        Yields:
+            Messages to send in order
+        """
+        mirror = self.mirror
+        pending: List[int] = []
+        for char, events in patterns:
+            key = pattern_key(events)
+            slot = mirror.lookup(key)
+            if slot is None:
+                if pending:
+                    yield PatternPlayMessage(pending)
+                    pending = []
+                slot, _ = mirror.assign(key)
+                yield PatternDefineMessage(slot, char, events)
+            pending.append(slot)
+            if len(pending) == MAX_PLAY_SLOTS:
+                yield PatternPlayMessage(pending)
+                pending = []
+        if pending:
+            yield PatternPlayMessage(pending)
+
+    def messages(self, patterns: Iterable[Tuple[str, List[dict]]]) -> List[Message]:
+        """
+        Encode patterns as cache messages.
+
+        Args:
+            patterns: (char, pattern_events) tuples in playback order
+
+        Returns:
+            Messages to send in order
+        """
+        return list(self.iter_messages(patterns))
+
+    def reset(self) -> PatternEvictMessage:
+        """
+        Forget the device cache (after a reconnect or device reset).
+
+        Returns:
+            Message clearing every device slot, to send before any other
+            cache message
+        """
+        self.mirror.clear()
+        return PatternEvictMessage([])
+
+
+class DevicePatternCache:
+    """
+    Reference model of the device slot table.
+
+    Applies cache messages the way the firmware does; used to check the
+    host mirror and to replay captured traffic.
+    """
+
+    def __init__(self, capacity: int = 64):
+        """
+        Initialize device cache.
+
+        Args:
+            capacity: Number of slots (1-256)
+        """
+        if not 1 <= capacity <= MAX_SLOTS:
+            raise ValueError(f"capacity must be between 1 and {MAX_SLOTS}")
+        self.capacity = capacity
+        self._slots: Dict[int, Tuple[str, List[dict]]] = {}
+
+    def apply(self, message: Message) -> Tuple[List[Tuple[str, List[dict]]], Optional[ErrorMessage]]:
+        """
+        Apply a cache message.
+
+        Args:
+            message: PatternDefineMessage, PatternPlayMessage or
+                PatternEvictMessage (other messages are ignored)
+
+        Returns:
+            (patterns to play, error to report or None); playback stops at
+            the first unknown slot
+        """
+        if isinstance(message, PatternDefineMessage):
+            if message.slot >= self.capacity:
+                return [], ErrorMessage(ErrorCode.UNKNOWN_SLOT, f"Slot {message.slot}")
+            self._slots[message.slot] = (message.char, message.pattern_events)
+        elif isinstance(message, PatternPlayMessage):
+            played = []
+            for slot in message.slots:
+                pattern = self._slots.get(slot)
+                if pattern is None:
+                    return played, ErrorMessage(ErrorCode.UNKNOWN_SLOT, f"Slot {slot}")
+                played.append(pattern)
+            return played, None
+        elif isinstance(message, PatternEvictMessage):
+            if message.slots:
+                for slot in message.slots:
+                    self._slots.pop(slot, None)
+            else:
+                self._slots.clear()
+        return [], None
+
+    def __len__(self) -> int:
+        return len(self._slots)
@@ -0,0 +1,401 @@
+"""
+Acknowledged delivery with a sliding window (selective repeat).
+
+Messages sent through ReliableSender are wrapped in SEQ_DATA messages
+with an 8-bit sequence number and kept until acknowledged. Up to
+``window`` messages are in flight at once, so the link is not idle
+while waiting for a round trip. ReliableReceiver delivers messages in
+order, buffers those that arrive early and answers with ACK messages:
+
+    SEQ_DATA payload: [sequence: 1] [header byte 0 of the message] [payload...]
+    ACK payload:      [next expected sequence: 1] [selective bitmap...]
+
+The cumulative part acknowledges everything before the next expected
+sequence; bit i of the bitmap (least significant bit first) acknowledges
+sequence next + 1 + i, received out of order. On a timeout the sender
+retransmits only the messages that are still unacknowledged.
+
+Other message types are unaffected and can share the link. SEQ_DATA and
+ACK frames always use the legacy header version; the wrapped message
+keeps its own encoding version. LossyLink simulates an unreliable link
+in-process for tests and tuning.
+"""
+
+import random
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from . import codec
+from .message import TYPE_MASK, Message, MessageType
+
+SEQUENCE_SPACE = 256
+MAX_WINDOW = SEQUENCE_SPACE // 2    # Selective repeat needs window <= half the space
+
+
+class SequencedMessage(Message):
+    """Sequence-numbered message (SEQ_DATA)."""
+
+    def __init__(self, seq: int, message: Message, version: Optional[int] = None):
+        """
+        Initialize sequenced message.
+
+        Args:
+            seq: Sequence number (0-255)
+            message: Message to deliver
+            version: Encoding of the wrapped message (None: its own)
+        """
+        code, payload = codec.header_and_payload(message, version)
+        super().__init__(MessageType.SEQ_DATA, bytes((seq, code)) + payload)
+        self.seq = seq
+        self.message = message
+
+    @classmethod
+    def from_payload(cls, payload, builders: Dict[int, Callable]) -> Optional['SequencedMessage']:
+        """
+        Build a message from a received payload.
+
+        Args:
+            payload: Message payload (bytes or memoryview)
+            builders: Message builders by header byte 0 (as used by
+                MessageStreamDecoder) for the wrapped message
+
+        Returns:
+            SequencedMessage, or None if the payload is malformed
+        """
+        if len(payload) < 2 or payload[1] & TYPE_MASK in (MessageType.SEQ_DATA, MessageType.ACK,
+                                                           MessageType.FRAGMENT):
+            return None
+        builder = builders.get(payload[1])
+        inner = builder(payload[2:]) if builder is not None else None
+        if inner is None:
+            return None
+        message = cls.__new__(cls)
+        Message.__init__(message, MessageType.SEQ_DATA, payload)
+        message.seq = payload[0]
+        message.message = inner
+        return message
+
+
+class AckMessage(Message):
+    """Cumulative and selective acknowledgement (ACK)."""
+
+    def __init__(self, next_seq: int, selective: Tuple[int, ...] = ()):
+        """
+        Initialize acknowledgement.
+
+        Args:
+            next_seq: Next expected sequence (all earlier ones are received)
+            selective: Sequences received out of order (within 255 after
+                next_seq)
+        """
+        bitmap = bytearray()
+        for seq in selective:
+            bit = (seq - next_seq - 1) % SEQUENCE_SPACE
+            if bit >= MAX_WINDOW:
+                raise ValueError(f"Sequence {seq} is outside the window after {next_seq}")
+            if bit // 8 >= len(bitmap):
+                bitmap.extend(bytes(bit // 8 + 1 - len(bitmap)))
+            bitmap[bit // 8] |= 1 << bit % 8
+        super().__init__(MessageType.ACK, bytes((next_seq,)) + bitmap)
+        self.next_seq = next_seq
+        self.selective = tuple(sorted(selective, key=lambda seq: (seq - next_seq) % SEQUENCE_SPACE))
+
+    @classmethod
+    def from_payload(cls, payload) -> Optional['AckMessage']:
+        """
+        Build a message from a received payload without re-serializing it.
+
+        Args:
+            payload: Message payload (bytes or memoryview)
+
+        Returns:
+            AckMessage, or None if the payload is malformed
+        """
+        if not 1 <= len(payload) <= 1 + MAX_WINDOW // 8:
+            return None
+        next_seq = payload[0]
+        message = cls.__new__(cls)
+        Message.__init__(message, MessageType.ACK, payload)
+        message.next_seq = next_seq
+        message.selective = tuple(
+            (next_seq + 1 + index * 8 + bit) % SEQUENCE_SPACE
+            for index, byte in enumerate(payload[1:])
+            for bit in range(8)
+            if byte >> bit & 1
+        )
+        return message
+
+
+class ReliableSender:
+    """
+    Sends messages with sequence numbers and retransmits unacknowledged ones.
+
+    The sender has no timer of its own: call poll() at next_deadline.
+
+    Counters:
+        sent: SEQ_DATA messages sent for the first time
+        retransmitted: SEQ_DATA messages sent again after a timeout
+        acknowledged: Messages confirmed by the receiver
+    """
+
+    def __init__(self, window: int = 32, timeout_ms: float = 100.0, version: Optional[int] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize sender.
+
+        Args:
+            window: Maximum messages in flight (1-128)
+            timeout_ms: Time without acknowledgement before a message is
+                retransmitted (should exceed the round-trip time)
+            version: Encoding of the wrapped messages (None: their own)
+            clock: Time source in seconds
+        """
+        if not 1 <= window <= MAX_WINDOW:
+            raise ValueError(f"window must be between 1 and {MAX_WINDOW}")
+        self.window = window
+        self.timeout = timeout_ms / 1000.0
+        self.version = version
+        self.clock = clock
+        self._queue: Deque[Message] = deque()
+        # In-flight messages by sequence: [SequencedMessage, last send time]
+        self._unacked: Dict[int, list] = {}
+        self._base = 0          # Oldest unacknowledged sequence
+        self._next_seq = 0
+        self.sent = 0
+        self.retransmitted = 0
+        self.acknowledged = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Number of messages sent but not acknowledged."""
+        return len(self._unacked)
+
+    @property
+    def queued(self) -> int:
+        """Number of messages waiting for room in the window."""
+        return len(self._queue)
+
+    @property
+    def idle(self) -> bool:
+        """Whether every message has been acknowledged."""
+        return not self._unacked and not self._queue
+
+    @property
+    def next_deadline(self) -> Optional[float]:
+        """Clock time of the next retransmission timeout (None if nothing in flight)."""
+        if not self._unacked:
+            return None
+        return min(entry[1] for entry in self._unacked.values()) + self.timeout
+
+    def send(self, message: Message, now: Optional[float] = None) -> List[SequencedMessage]:
+        """
+        Queue a message for acknowledged delivery.
+
+        Args:
+            message: Message to deliver
+            now: Current clock time (read from the clock if None)
+
+        Returns:
+            SEQ_DATA messages to transmit now
+        """
+        self._queue.append(message)
+        return self._fill(self.clock() if now is None else now)
+
+    def on_ack(self, ack: AckMessage, now: Optional[float] = None) -> List[SequencedMessage]:
+        """
+        Process an acknowledgement.
+
+        Args:
+            ack: Received ACK message
+            now: Current clock time (read from the clock if None)
+
+        Returns:
+            SEQ_DATA messages to transmit now (the window may have opened)
+        """
+        unacked = self._unacked
+        advance = (ack.next_seq - self._base) % SEQUENCE_SPACE
+        if advance <= (self._next_seq - self._base) % SEQUENCE_SPACE:
+            for offset in range(advance):
+                if unacked.pop((self._base + offset) % SEQUENCE_SPACE, None) is not None:
+                    self.acknowledged += 1
+            self._base = ack.next_seq
+            for seq in ack.selective:
+                if unacked.pop(seq, None) is not None:
+                    self.acknowledged += 1
+        # Otherwise a stale acknowledgement from before the window moved
+        return self._fill(self.clock() if now is None else now)
+
+    def poll(self, now: Optional[float] = None) -> List[SequencedMessage]:
+        """
+        Retransmit messages whose acknowledgement timed out.
+
+        Args:
+            now: Current clock time (read from the clock if None)
+
+        Returns:
+            SEQ_DATA messages to transmit again, oldest first
+        """
+        if now is None:
+            now = self.clock()
+        expired = []
+        for entry in self._unacked.values():
+            if now - entry[1] >= self.timeout:
+                entry[1] = now
+                expired.append(entry[0])
+        self.retransmitted += len(expired)
+        return expired
+
+    def _fill(self, now: float) -> List[SequencedMessage]:
+        """Send queued messages while the window has room."""
+        sent = []
+        queue = self._queue
+        while queue and (self._next_seq - self._base) % SEQUENCE_SPACE < self.window:
+            message = SequencedMessage(self._next_seq, queue.popleft(), self.version)
+            self._unacked[self._next_seq] = [message, now]
+            self._next_seq = (self._next_seq + 1) % SEQUENCE_SPACE
+            sent.append(message)
+        self.sent += len(sent)
+        return sent
+
+
+class ReliableReceiver:
+    """
+    Delivers SEQ_DATA messages in order, exactly once.
+
+    Counters:
+        delivered: Messages delivered
+        duplicates: SEQ_DATA messages received again (already delivered
+            or buffered)
+    """
+
+    def __init__(self, window: int = 32):
+        """
+        Initialize receiver.
+
+        Args:
+            window: Receive window (1-128, at least the sender's window)
+        """
+        if not 1 <= window <= MAX_WINDOW:
+            raise ValueError(f"window must be between 1 and {MAX_WINDOW}")
+        self.window = window
+        self._expected = 0
+        self._buffer: Dict[int, Message] = {}
+        self.delivered = 0
+        self.duplicates = 0
+
+    def receive(self, message: SequencedMessage) -> Tuple[List[Message], AckMessage]:
+        """
+        Process a received SEQ_DATA message.
+
+        Args:
+            message: Received SequencedMessage
+
+        Returns:
+            (messages now deliverable in order, ACK to send back)
+        """
+        delivered: List[Message] = []
+        offset = (message.seq - self._expected) % SEQUENCE_SPACE
+        if offset >= self.window or message.seq in self._buffer:
+            self.duplicates += 1
+        else:
+            self._buffer[message.seq] = message.message
+            buffer = self._buffer
+            while self._expected in buffer:
+                delivered.append(buffer.pop(self._expected))
+                self._expected = (self._expected + 1) % SEQUENCE_SPACE
+            self.delivered += len(delivered)
+        return delivered, self.ack()
+
+    def ack(self) -> AckMessage:
+        """
+        Get the acknowledgement for the current receive state.
+
+        Returns:
+            AckMessage
+        """
+        return AckMessage(self._expected, tuple(self._buffer))
+
+
+class LossyLink:
+    """
+    In-process unreliable link for testing.
+
+    Packets are dropped, corrupted or duplicated at random and delivered
+    after a delay with jitter (so they may be reordered). The random
+    generator is seeded, so runs are reproducible.
+
+    Counters:
+        sent: Packets offered to the link
+        dropped: Packets lost
+        corrupted: Packets delivered with one byte flipped
+    """
+
+    def __init__(self, loss: float = 0.0, delay_ms: float = 10.0, jitter_ms: float = 0.0,
+                 corrupt: float = 0.0, duplicate: float = 0.0, seed: int = 0):
+        """
+        Initialize link.
+
+        Args:
+            loss: Probability that a packet is dropped
+            delay_ms: One-way delay
+            jitter_ms: Maximum extra random delay
+            corrupt: Probability that a delivered packet has a byte flipped
+            duplicate: Probability that a delivered packet arrives twice
+            seed: Random seed
+        """
+        self.loss = loss
+        self.delay = delay_ms / 1000.0
+        self.jitter = jitter_ms / 1000.0
+        self.corrupt = corrupt
+        self.duplicate = duplicate
+        self._random = random.Random(seed)
+        self._in_transit: List[Tuple[float, int, bytes]] = []
+        self._order = 0
+        self.sent = 0
+        self.dropped = 0
+        self.corrupted = 0
+
+    @property
+    def in_transit(self) -> int:
+        """Number of packets on their way."""
+        return len(self._in_transit)
+
+    def send(self, packet: bytes, now: float):
+        """
+        Offer a packet to the link.
+
+        Args:
+            packet: Packet bytes
+            now: Current (simulated) time in seconds
+        """
+        rand = self._random
+        self.sent += 1
+        if rand.random() < self.loss:
+            self.dropped += 1
+            return
+        if rand.random() < self.corrupt:
+            damaged = bytearray(packet)
+            damaged[rand.randrange(len(damaged))] ^= 1 << rand.randrange(8)
+            packet = bytes(damaged)
+            self.corrupted += 1
+        copies = 2 if rand.random() < self.duplicate else 1
+        for _ in range(copies):
+            arrival = now + self.delay + rand.random() * self.jitter
+            self._in_transit.append((arrival, self._order, packet))
+            self._order += 1
+
+    def receive(self, now: float) -> List[bytes]:
+        """
+        Take the packets that have arrived.
+
+        Args:
+            now: Current (simulated) time in seconds
+
+        Returns:
+            Packets in arrival order
+        """
+        arrived = sorted(item for item in self._in_transit if item[0] <= now)
+        if arrived:
+            self._in_transit = [item for item in self._in_transit if item[0] > now]
+        return [packet for _, _, packet in arrived]
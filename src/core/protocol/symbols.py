@@ -0,0 +1,278 @@
+"""
+Symbol streams: the device expands symbol codes with its own tables.
+
+Instead of actuator events, the host sends one code per character or
+phoneme in SYMBOL_STREAM messages and the device looks the patterns up
+in the same table the host encoder uses. Each table is identified by a
+1-byte ID and versioned by a CRC-32 digest of its contents, so a device
+with an older table is detected before any text is sent:
+
+    host   -> TABLE_INFO(table ID, host digest)
+    device -> TABLE_INFO(table ID, device digest, 0 if it has no such table)
+
+The host sends symbol streams only if both digests match and otherwise
+keeps sending patterns. SymbolStreamSender is the host side;
+SymbolStreamExpander is the reference device side.
+
+Tables (ID: encoder, codes):
+
+    1      PatternEncoder: code = character (latin-1)
+    2      PhonemeEncoder: code = 0x80 + phoneme ID (PHONEME_SYMBOLS), 0x20 = space
+    3-7    SingleByteEncoder (ring_based, pure, micro_temporal, intensity,
+           grouped): code = byte value
+    8      SymbolStreamEncoder (adaptive, rendered 'pure'): its own codes
+"""
+
+import struct
+import zlib
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from ..encoding.pattern import Pattern, PatternEncoder
+from ..encoding.phoneme import PhonemeEncoder
+from ..encoding.single_byte import SingleByteEncoder
+from ..encoding.symbol_stream import PHONEME_CODES, SPACE_CODE, SymbolStreamEncoder
+from .message import (
+    MAX_PAYLOAD_SIZE,
+    ErrorCode,
+    ErrorMessage,
+    Message,
+    SymbolStreamMessage,
+    TableInfoMessage,
+)
+
+# Symbol codes per SYMBOL_STREAM message (payload: extended type, table ID, codes)
+MAX_SYMBOLS = MAX_PAYLOAD_SIZE - 2
+
+_DIGEST_EVENT = struct.Struct('<BHHB')
+
+
+class SymbolTable:
+    """256-entry code -> pattern table shared by host and device."""
+
+    def __init__(self, table_id: int, name: str, patterns: Sequence[Optional[Pattern]],
+                 encode: Callable[[str], bytes]):
+        """
+        Initialize symbol table.
+
+        Args:
+            table_id: Table ID sent in SYMBOL_STREAM and TABLE_INFO (1-255)
+            name: Encoder spec the table comes from (see analysis.throughput)
+            patterns: Pattern per code (None for unassigned codes)
+            encode: Host-side text -> codes function
+        """
+        if len(patterns) != 256:
+            raise ValueError("Symbol tables have 256 entries")
+        self.table_id = table_id
+        self.name = name
+        self.patterns = tuple(patterns)
+        self.encode = encode
+        self._digest: Optional[int] = None
+
+    @property
+    def digest(self) -> int:
+        """CRC-32 of the table contents (never 0, which means 'no table')."""
+        if self._digest is None:
+            parts = []
+            for code, pattern in enumerate(self.patterns):
+                if pattern is None:
+                    continue
+                parts.append(bytes((code, len(pattern.events))))
+                parts.extend(_DIGEST_EVENT.pack(*event.as_tuple()) for event in pattern.events)
+            self._digest = zlib.crc32(b''.join(parts)) or 1
+        return self._digest
+
+    def expand(self, codes: bytes) -> List[Pattern]:
+        """
+        Expand codes into patterns (unassigned codes are skipped).
+
+        Args:
+            codes: Symbol codes
+
+        Returns:
+            List of Pattern objects
+        """
+        patterns = self.patterns
+        return [patterns[code] for code in codes if patterns[code] is not None]
+
+
+def _letter_table(table_id: int) -> SymbolTable:
+    table = PatternEncoder().pattern_table
+    patterns = [table.get(chr(code)) for code in range(256)]
+    return SymbolTable(table_id, 'letter', patterns,
+                       lambda text: bytes(ord(char) for char in text if char in table))
+
+
+def _phoneme_table(table_id: int) -> SymbolTable:
+    encoder = PhonemeEncoder()
+    patterns: List[Optional[Pattern]] = [None] * 256
+    codes = dict(PHONEME_CODES)
+    codes[' '] = SPACE_CODE
+    for phoneme, code in codes.items():
+        patterns[code] = encoder.phoneme_table.get(phoneme)
+    return SymbolTable(table_id, 'phoneme', patterns,
+                       lambda text: bytes(codes[ph] for ph in encoder.text_to_phonemes(text) if ph in codes))
+
+
+def _single_byte_table(mode: str) -> Callable[[int], SymbolTable]:
+    def build(table_id: int) -> SymbolTable:
+        encoder = SingleByteEncoder(mode)
+        return SymbolTable(table_id, f'single_byte:{mode}', encoder.pattern_table,
+                           lambda text: bytes(ord(char) & 0xFF for char in text))
+    return build
+
+
+def _symbol_stream_table(table_id: int) -> SymbolTable:
+    encoder = SymbolStreamEncoder('adaptive')
+    return SymbolTable(table_id, 'symbol_stream', encoder.renderer.pattern_table, encoder.encode_symbols)
+
+
+SYMBOL_TABLE_BUILDERS: Dict[int, Callable[[int], SymbolTable]] = {
+    1: _letter_table,
+    2: _phoneme_table,
+    3: _single_byte_table('ring_based'),
+    4: _single_byte_table('pure'),
+    5: _single_byte_table('micro_temporal'),
+    6: _single_byte_table('intensity'),
+    7: _single_byte_table('grouped'),
+    8: _symbol_stream_table,
+}
+
+_tables: Dict[int, SymbolTable] = {}
+
+
+def get_symbol_table(table_id: int) -> SymbolTable:
+    """
+    Get a symbol table by ID (built on first use and shared).
+
+    Args:
+        table_id: Table ID (see SYMBOL_TABLE_BUILDERS)
+
+    Returns:
+        SymbolTable
+
+    Raises:
+        KeyError: If the table ID is unknown
+    """
+    table = _tables.get(table_id)
+    if table is None:
+        table = _tables[table_id] = SYMBOL_TABLE_BUILDERS[table_id](table_id)
+    return table
+
+
+class SymbolStreamSender:
+    """Host side: negotiates a table and encodes text as symbol streams."""
+
+    def __init__(self, table_id: int = 1):
+        """
+        Initialize sender.
+
+        Args:
+            table_id: Symbol table to use
+        """
+        self.table = get_symbol_table(table_id)
+        self.negotiated = False
+
+    def table_query(self) -> TableInfoMessage:
+        """
+        Get the TABLE_INFO message announcing the host's table.
+
+        Returns:
+            TableInfoMessage to send to the device
+        """
+        return TableInfoMessage(self.table.table_id, self.table.digest)
+
+    def on_table_info(self, reply: TableInfoMessage) -> bool:
+        """
+        Process the device's TABLE_INFO answer.
+
+        Args:
+            reply: Received TableInfoMessage
+
+        Returns:
+            Whether symbol streams may be sent (the device has the same table)
+        """
+        if reply.table_id == self.table.table_id:
+            self.negotiated = reply.digest == self.table.digest
+        return self.negotiated
+
+    def messages(self, text: str) -> List[SymbolStreamMessage]:
+        """
+        Encode text as SYMBOL_STREAM messages.
+
+        Args:
+            text: Text to send
+
+        Returns:
+            Messages of up to MAX_SYMBOLS codes each
+
+        Raises:
+            ValueError: If the device has not confirmed the table
+        """
+        if not self.negotiated:
+            raise ValueError(f"Table {self.table.table_id} has not been confirmed by the device")
+        codes = self.table.encode(text)
+        return [
+            SymbolStreamMessage(self.table.table_id, codes[start:start + MAX_SYMBOLS])
+            for start in range(0, len(codes), MAX_SYMBOLS)
+        ]
+
+
+class SymbolStreamExpander:
+    """
+    Reference device side: answers table queries and expands symbol streams.
+    """
+
+    def __init__(self, table_ids: Optional[Sequence[int]] = None):
+        """
+        Initialize expander.
+
+        Args:
+            table_ids: Tables the device holds (default: all)
+        """
+        ids = SYMBOL_TABLE_BUILDERS if table_ids is None else table_ids
+        self.tables = {table_id: get_symbol_table(table_id) for table_id in ids}
+
+    def table_info(self, query: TableInfoMessage) -> TableInfoMessage:
+        """
+        Answer a TABLE_INFO query.
+
+        Args:
+            query: Received TableInfoMessage
+
+        Returns:
+            TableInfoMessage with the device's digest (0 if it has no such table)
+        """
+        table = self.tables.get(query.table_id)
+        return TableInfoMessage(query.table_id, table.digest if table is not None else 0)
+
+    def expand(self, message: SymbolStreamMessage) -> Tuple[List[Pattern], Optional[ErrorMessage]]:
+        """
+        Expand a symbol stream into patterns.
+
+        Args:
+            message: Received SymbolStreamMessage
+
+        Returns:
+            (patterns to play, error to report or None)
+        """
+        table = self.tables.get(message.table_id)
+        if table is None:
+            return [], ErrorMessage(ErrorCode.UNKNOWN_TABLE, f"Table {message.table_id}")
+        return table.expand(message.symbols), None
+
+    def apply(self, message: Message) -> Tuple[List[Pattern], Optional[Message]]:
+        """
+        Handle an extended message.
+
+        Args:
+            message: Received message (others than SYMBOL_STREAM and
+                TABLE_INFO are ignored)
+
+        Returns:
+            (patterns to play, reply to send or None)
+        """
+        if isinstance(message, TableInfoMessage):
+            return [], self.table_info(message)
+        if isinstance(message, SymbolStreamMessage):
+            return self.expand(message)
+        return [], None
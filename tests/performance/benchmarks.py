@@ -0,0 +1,497 @@
+"""
+Benchmark suite for Teletypathy with stored baselines.
+
+Measures, at input sizes from a single keystroke to 100x the reference
+article:
+- encode throughput of every encoder and mode
+- text_to_phonemes throughput
+- Message.serialize/deserialize and PatternBatchMessage build rates
+- peak memory and retained allocations (tracemalloc)
+
+Results are keyed 'group/name@size'. Timings are the median of several
+samples (after a warm-up run, so caches are hot); memory is measured in a
+separate traced run. The stored baseline is the median of BASELINE_RUNS
+suite runs, so single lucky samples do not tighten the gate.
+
+Usage:
+
+    python -m tests.performance.benchmarks                  # compare to baseline
+    python -m tests.performance.benchmarks --update-baseline   # median of 5 runs
+    python -m tests.performance.benchmarks -k encode/ --size keystroke --size article
+"""
+
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+from src.core.analysis.throughput import create_encoder
+from src.core.encoding.phoneme import PhonemeEncoder
+from src.core.encoding.single_byte import SingleByteEncoder
+from src.core.protocol.message import Message, MessageSerializer, PatternBatchMessage, PatternMessage
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is an optional dependency
+    np = None
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ARTICLE_PATH = os.path.join(ROOT, 'article_text.txt')
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+SIZES = ('keystroke', 'word', 'sentence', 'article', 'article_x100')
+
+# Allowed slowdown/growth relative to the baseline before a metric fails
+# (timings are noisy on shared machines: fail at 2x slower)
+TIME_TOLERANCE = 1.0
+MEMORY_TOLERANCE = 0.1
+# Absolute slack, so tiny inputs don't fail on allocator noise
+MEMORY_SLACK_BYTES = 4096
+BLOCK_SLACK = 16
+
+# Suite runs whose median is stored by --update-baseline
+BASELINE_RUNS = 5
+
+# Per-keystroke encode budget (docs/architecture/data_flow.md)
+KEYSTROKE_BUDGET_MS = 1.0
+
+# Batch size limit of PatternBatchMessage (1-byte pattern count)
+MAX_BATCH_PATTERNS = 255
+
+
+def load_text(size: str) -> str:
+    """
+    Get the input text for a size.
+
+    Args:
+        size: One of SIZES
+
+    Returns:
+        Text
+    """
+    with open(ARTICLE_PATH, encoding='utf-8') as f:
+        article = f.read()
+    if size == 'keystroke':
+        return 'e'
+    if size == 'word':
+        return 'hello '
+    if size == 'sentence':
+        return article[:article.index('.') + 1]
+    if size == 'article':
+        return article
+    if size == 'article_x100':
+        return article * 100
+    raise ValueError(f"Unknown size: {size}")
+
+
+class Benchmark(NamedTuple):
+    """One benchmark: prepare(text) returns (callable to time, units processed)."""
+    name: str
+    prepare: Callable[[str], tuple]
+    unit: str = 'char'
+    max_size: str = SIZES[-1]
+    requires_numpy: bool = False
+
+
+def _encode(spec: str) -> Callable[[str], tuple]:
+    def prepare(text):
+        encoder = create_encoder(spec)
+        return (lambda: encoder.encode_text(text)), len(text)
+    return prepare
+
+
+def _encode_bulk(text):
+    encoder = SingleByteEncoder()
+    return (lambda: encoder.encode_bulk(text)), len(text)
+
+
+def _text_to_phonemes(text):
+    encoder = PhonemeEncoder()
+    return (lambda: encoder.text_to_phonemes(text)), len(text)
+
+
+def _pattern_events(pattern) -> List[dict]:
+    return [
+        {
+            'actuator': event.actuator_id,
+            'time_offset': event.time_offset_ms,
+            'duration': event.duration_ms,
+            'intensity': event.intensity
+        }
+        for event in pattern.events
+    ]
+
+
+def _letter_patterns(text) -> List[tuple]:
+    """(char, events) for every 1-byte character of text, sharing events per character."""
+    encoder = create_encoder('letter')
+    events = {}
+    patterns = []
+    for char in text:
+        if ord(char) > 0xFF:
+            continue  # The protocol carries 1-byte characters
+        if char not in events:
+            pattern = encoder.encode_character(char)
+            events[char] = _pattern_events(pattern) if pattern else []
+        patterns.append((char, events[char]))
+    return patterns
+
+
+def _serialize(text):
+    messages = {}
+    sequence = []
+    for char, events in _letter_patterns(text):
+        if char not in messages:
+            messages[char] = PatternMessage(char, events)
+        sequence.append(messages[char])
+    return (lambda: [message.serialize() for message in sequence]), len(sequence)
+
+
+def _write_many(text):
+    messages = {}
+    sequence = []
+    for char, events in _letter_patterns(text):
+        if char not in messages:
+            messages[char] = PatternMessage(char, events)
+        sequence.append(messages[char])
+    serializer = MessageSerializer()
+    return (lambda: serializer.write_many(sequence)), len(sequence)
+
+
+def _deserialize(text):
+    serialized = {}
+    sequence = []
+    for char, events in _letter_patterns(text):
+        if char not in serialized:
+            serialized[char] = PatternMessage(char, events).serialize()
+        sequence.append(serialized[char])
+    deserialize = Message.deserialize
+    return (lambda: [deserialize(data) for data in sequence]), len(sequence)
+
+
+def _batch_build(text):
+    patterns = _letter_patterns(text)
+    batches = [patterns[i:i + MAX_BATCH_PATTERNS]
+               for i in range(0, len(patterns), MAX_BATCH_PATTERNS)]
+    return (lambda: [PatternBatchMessage(batch) for batch in batches]), len(patterns)
+
+
+BENCHMARKS = (
+    Benchmark('encode/letter', _encode('letter')),
+    Benchmark('encode/phoneme', _encode('phoneme')),
+    Benchmark('encode/single_byte:ring_based', _encode('single_byte:ring_based')),
+    Benchmark('encode/single_byte:pure', _encode('single_byte:pure')),
+    Benchmark('encode/single_byte:micro_temporal', _encode('single_byte:micro_temporal')),
+    Benchmark('encode/single_byte:intensity', _encode('single_byte:intensity')),
+    Benchmark('encode/single_byte:grouped', _encode('single_byte:grouped')),
+    Benchmark('encode/single_byte_bulk', _encode_bulk, requires_numpy=True),
+    Benchmark('encode/hybrid:adaptive', _encode('hybrid:adaptive')),
+    Benchmark('encode/hybrid:character', _encode('hybrid:character')),
+    Benchmark('encode/hybrid:word_level', _encode('hybrid:word_level')),
+    Benchmark('encode/hybrid:word_contraction', _encode('hybrid:word_contraction')),
+    Benchmark('encode/word', _encode('word')),
+    Benchmark('encode/symbol_stream', _encode('symbol_stream')),
+    # Several seconds per run at article_x100
+    Benchmark('encode/multi_ring', _encode('multi_ring'), max_size='article'),
+    Benchmark('phoneme/text_to_phonemes', _text_to_phonemes),
+    Benchmark('protocol/serialize', _serialize, unit='message'),
+    Benchmark('protocol/write_many', _write_many, unit='message'),
+    Benchmark('protocol/deserialize', _deserialize, unit='message'),
+    Benchmark('protocol/batch_build', _batch_build, unit='pattern'),
+)
+
+
+def time_call(func: Callable, min_time: float = 0.2, max_repeat: int = 20) -> float:
+    """
+    Get the median wall time of one call of func.
+
+    Runs once to warm up, calibrates how many calls make up a sample of
+    at least 1 ms (so a single keystroke is timed above timer noise), then
+    takes samples until min_time has been spent or max_repeat samples are
+    done. The median is stable from run to run, where the best sample is
+    an optimistic outlier.
+
+    Args:
+        func: Callable to time
+        min_time: Total time to spend (s)
+        max_repeat: Maximum number of samples
+
+    Returns:
+        Median time per call (s)
+    """
+    func()
+    number = 1
+    while True:
+        elapsed = _time_sample(func, number)
+        if elapsed >= 1e-3 or number >= 1 << 20:
+            break
+        number *= 10
+    samples = [elapsed]
+    spent = elapsed
+    for _ in range(max_repeat - 1):
+        if spent >= min_time:
+            break
+        elapsed = _time_sample(func, number)
+        samples.append(elapsed)
+        spent += elapsed
+    return statistics.median(samples) / number
+
+
+def _time_sample(func: Callable, number: int) -> float:
+    """Time number calls of func (s)."""
+    start = time.perf_counter()
+    for _ in range(number):
+        func()
+    return time.perf_counter() - start
+
+
+def trace_memory(func: Callable) -> Dict[str, int]:
+    """
+    Measure the memory one call of func allocates.
+
+    Args:
+        func: Callable to measure (already warmed up)
+
+    Returns:
+        {'peak_bytes': peak traced memory above the starting point,
+         'retained_blocks': net allocated blocks still alive in the result}
+    """
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename'))
+    del result
+    return {'peak_bytes': max(0, peak - start), 'retained_blocks': max(0, blocks)}
+
+
+def run_benchmark(benchmark: Benchmark, text: str, memory: bool = True) -> dict:
+    """
+    Run one benchmark on one input.
+
+    Args:
+        benchmark: Benchmark to run
+        text: Input text
+        memory: Also measure memory (a separate traced run)
+
+    Returns:
+        Metrics dictionary
+    """
+    func, units = benchmark.prepare(text)
+    seconds = time_call(func)
+    result = {
+        'units': units,
+        'unit': benchmark.unit,
+        'seconds': seconds,
+        'ns_per_unit': seconds * 1e9 / units if units else 0.0,
+    }
+    if memory:
+        result.update(trace_memory(func))
+    return result
+
+
+def run_suite(sizes: Sequence[str] = SIZES, pattern: Optional[str] = None,
+              memory: bool = True, log: Optional[Callable[[str], None]] = None) -> dict:
+    """
+    Run the benchmark suite.
+
+    Args:
+        sizes: Input sizes to run
+        pattern: Only run benchmarks whose name contains this string
+        memory: Also measure memory
+        log: Called with a progress line per result
+
+    Returns:
+        {'meta': {...}, 'results': {'group/name@size': metrics}}
+    """
+    results = {}
+    for size in sizes:
+        text = load_text(size)
+        for benchmark in BENCHMARKS:
+            if pattern and pattern not in benchmark.name:
+                continue
+            if SIZES.index(size) > SIZES.index(benchmark.max_size):
+                continue
+            if benchmark.requires_numpy and np is None:
+                continue
+            key = f"{benchmark.name}@{size}"
+            results[key] = run_benchmark(benchmark, text, memory)
+            if log:
+                log(format_result(key, results[key]))
+    return {
+        'meta': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'numpy': np.__version__ if np is not None else None,
+        },
+        'results': results,
+    }
+
+
+def median_results(runs: Sequence[dict]) -> dict:
+    """
+    Combine several suite runs into one, taking the median of every metric.
+
+    Args:
+        runs: Outputs of run_suite over the same benchmarks
+
+    Returns:
+        Output of run_suite with median metrics
+    """
+    results = {}
+    for key, first in runs[0]['results'].items():
+        samples = [run['results'][key] for run in runs if key in run['results']]
+        results[key] = {
+            metric: statistics.median(sample[metric] for sample in samples)
+            if isinstance(value, (int, float)) else value
+            for metric, value in first.items()
+        }
+    return {'meta': dict(runs[0]['meta'], runs=len(runs)), 'results': results}
+
+
+def compare(results: dict, baseline: dict, time_tolerance: float = TIME_TOLERANCE,
+            memory_tolerance: float = MEMORY_TOLERANCE) -> List[str]:
+    """
+    Find metrics that regressed beyond tolerance.
+
+    Results without a baseline entry are not checked.
+
+    Args:
+        results: Output of run_suite
+        baseline: Stored output of run_suite
+        time_tolerance: Allowed relative slowdown of ns_per_unit
+        memory_tolerance: Allowed relative growth of peak_bytes and retained_blocks
+
+    Returns:
+        One line per regression (empty if none)
+    """
+    regressions = []
+    reference = baseline.get('results', {})
+    for key, current in results['results'].items():
+        previous = reference.get(key)
+        if previous is None:
+            continue
+        limits = (
+            ('ns_per_unit', time_tolerance, 0),
+            ('peak_bytes', memory_tolerance, MEMORY_SLACK_BYTES),
+            ('retained_blocks', memory_tolerance, BLOCK_SLACK),
+        )
+        for metric, tolerance, slack in limits:
+            if metric not in current or metric not in previous:
+                continue
+            limit = previous[metric] * (1 + tolerance) + slack
+            if current[metric] > limit:
+                regressions.append(
+                    f"{key}: {metric} {current[metric]:,.0f} > {limit:,.0f} "
+                    f"(baseline {previous[metric]:,.0f})")
+    return regressions
+
+
+def check_budget(results: dict, budget_ms: float = KEYSTROKE_BUDGET_MS) -> List[str]:
+    """
+    Find encoders that exceed the per-keystroke encode budget.
+
+    Args:
+        results: Output of run_suite (with the keystroke size)
+        budget_ms: Budget per keystroke (ms)
+
+    Returns:
+        One line per encoder over budget (empty if none)
+    """
+    return [
+        f"{key}: {metrics['seconds'] * 1000:.3f} ms > {budget_ms} ms"
+        for key, metrics in results['results'].items()
+        if key.startswith('encode/') and key.endswith('@keystroke')
+        and metrics['seconds'] * 1000 > budget_ms
+    ]
+
+
+def load_baseline(path: str = BASELINE_PATH) -> dict:
+    """Load a stored baseline (empty if the file does not exist)."""
+    if not os.path.exists(path):
+        return {'results': {}}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(results: dict, path: str = BASELINE_PATH, merge: bool = True):
+    """
+    Store results as the baseline.
+
+    Args:
+        results: Output of run_suite
+        path: Baseline file
+        merge: Keep baseline entries that were not re-run
+    """
+    baseline = load_baseline(path) if merge else {'results': {}}
+    baseline['meta'] = results['meta']
+    baseline['results'].update(results['results'])
+    baseline['results'] = dict(sorted(baseline['results'].items()))
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2)
+        f.write('\n')
+
+
+def format_result(key: str, metrics: dict) -> str:
+    """Format one result as a line."""
+    line = f"{key:<48} {metrics['ns_per_unit']:>12,.0f} ns/{metrics['unit']}"
+    if 'peak_bytes' in metrics:
+        line += f" {metrics['peak_bytes'] / 1024:>12,.1f} KiB peak {metrics['retained_blocks']:>10,} blocks"
+    return line
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the Teletypathy benchmark suite.")
+    parser.add_argument('--size', action='append', choices=SIZES, dest='sizes',
+                        help="Input size, repeatable (default: all)")
+    parser.add_argument('-k', dest='pattern', help="Only run benchmarks containing this string")
+    parser.add_argument('--no-memory', action='store_true', help="Skip tracemalloc runs")
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true',
+                        help="Store the results as the new baseline instead of comparing")
+    parser.add_argument('--runs', type=int,
+                        help="Suite runs to take the median of (default: 1, "
+                             f"{BASELINE_RUNS} with --update-baseline)")
+    parser.add_argument('--time-tolerance', type=float, default=TIME_TOLERANCE)
+    parser.add_argument('--memory-tolerance', type=float, default=MEMORY_TOLERANCE)
+    parser.add_argument('--json', metavar='PATH', help="Also write the results to PATH")
+    args = parser.parse_args(argv)
+
+    runs = args.runs or (BASELINE_RUNS if args.update_baseline else 1)
+    results = median_results([
+        run_suite(args.sizes or SIZES, args.pattern, not args.no_memory, print)
+        for _ in range(runs)
+    ])
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+    if args.update_baseline:
+        save_baseline(results, args.baseline)
+        print(f"Baseline updated: {args.baseline}")
+        return 0
+
+    failures = compare(results, load_baseline(args.baseline),
+                       args.time_tolerance, args.memory_tolerance)
+    failures += check_budget(results)
+    for failure in failures:
+        print(f"REGRESSION {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
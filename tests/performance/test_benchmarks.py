@@ -0,0 +1,96 @@
+"""
+Performance regression tests for Teletypathy.
+
+The benchmark run is opt-in, since timings depend on the machine:
+
+    TELETYPATHY_BENCHMARKS=1 python -m pytest tests/performance
+
+TELETYPATHY_BENCHMARK_SIZES (comma-separated, default: all sizes) and
+TELETYPATHY_BENCHMARK_TOLERANCE (relative slowdown, default: 1.0) tune
+the run. Refresh the baseline with
+python -m tests.performance.benchmarks --update-baseline.
+"""
+
+import os
+import unittest
+
+from tests.performance.benchmarks import (
+    BASELINE_PATH,
+    SIZES,
+    TIME_TOLERANCE,
+    check_budget,
+    compare,
+    load_baseline,
+    median_results,
+    run_suite,
+)
+
+
+ENABLED = bool(os.environ.get('TELETYPATHY_BENCHMARKS'))
+
+
+def _result(**metrics):
+    return {'results': {'encode/letter@article': metrics}}
+
+
+class TestRegressionGate(unittest.TestCase):
+    """Test baseline comparison."""
+    
+    def test_within_tolerance(self):
+        """Test that metrics within tolerance pass."""
+        baseline = _result(ns_per_unit=100, peak_bytes=100000, retained_blocks=10)
+        current = _result(ns_per_unit=140, peak_bytes=105000, retained_blocks=20)
+        self.assertEqual(compare(current, baseline, time_tolerance=0.5), [])
+    
+    def test_regressions(self):
+        """Test that slower or bigger results fail."""
+        baseline = _result(ns_per_unit=100, peak_bytes=100000, retained_blocks=10)
+        current = _result(ns_per_unit=160, peak_bytes=200000, retained_blocks=10)
+        regressions = compare(current, baseline, time_tolerance=0.5)
+        self.assertEqual(len(regressions), 2)
+        self.assertIn('ns_per_unit', regressions[0])
+        self.assertIn('peak_bytes', regressions[1])
+    
+    def test_new_benchmarks_pass(self):
+        """Test that results without a baseline entry are not checked."""
+        self.assertEqual(compare(_result(ns_per_unit=100), {'results': {}}), [])
+    
+    def test_keystroke_budget(self):
+        """Test the per-keystroke budget check."""
+        results = {'results': {
+            'encode/letter@keystroke': {'seconds': 0.0005},
+            'encode/multi_ring@keystroke': {'seconds': 0.002},
+            'encode/letter@article': {'seconds': 0.002},
+        }}
+        self.assertEqual(len(check_budget(results, budget_ms=1.0)), 1)
+    
+    def test_median_results(self):
+        """Test that runs combine into their median, ignoring outliers."""
+        runs = [
+            dict(_result(ns_per_unit=ns, unit='char'), meta={'python': '3'})
+            for ns in (100, 40, 120, 110, 300)
+        ]
+        combined = median_results(runs)
+        metrics = combined['results']['encode/letter@article']
+        self.assertEqual(metrics, {'ns_per_unit': 110, 'unit': 'char'})
+        self.assertEqual(combined['meta'], {'python': '3', 'runs': 5})
+
+
+@unittest.skipUnless(ENABLED, "set TELETYPATHY_BENCHMARKS=1 to run benchmarks")
+class TestBenchmarks(unittest.TestCase):
+    """Run the benchmark suite against the stored baseline."""
+    
+    def test_no_regressions(self):
+        """Test that no metric regressed beyond tolerance and keystrokes stay in budget."""
+        sizes = os.environ.get('TELETYPATHY_BENCHMARK_SIZES')
+        sizes = sizes.split(',') if sizes else SIZES
+        tolerance = float(os.environ.get('TELETYPATHY_BENCHMARK_TOLERANCE', TIME_TOLERANCE))
+        
+        results = run_suite(sizes)
+        failures = compare(results, load_baseline(BASELINE_PATH), time_tolerance=tolerance)
+        failures += check_budget(results)
+        self.assertEqual(failures, [], '\n'.join(failures))
+
+
+if __name__ == '__main__':
+    unittest.main()
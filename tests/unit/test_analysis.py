@@ -0,0 +1,158 @@
+"""Unit tests for analysis tools."""
+
+import os
+import tempfile
+import unittest
+
+from src.core.analysis.throughput import (
+    ThroughputStats,
+    _iter_pattern_batches,
+    _PatternHistogram,
+    analyze_corpus,
+    create_encoder,
+    iter_corpus,
+    measure_throughput,
+    np,
+)
+from src.core.analysis.wire_size import (
+    analyze_corpus_sizes,
+    analyze_tables,
+    measure_sizes,
+    pattern_sizes,
+    table_patterns,
+)
+from src.core.encoding.hybrid import HybridEncoder
+from src.core.encoding.pattern import PatternEncoder
+from src.core.encoding.timeline import NO_SPACING, SpacingRules, compile_timeline
+
+
+TEXT = "Hello world. The quick brown fox jumps 42 times! Visit example.com now? "
+
+
+@unittest.skipIf(np is None, "numpy not installed")
+class TestThroughput(unittest.TestCase):
+    """Test throughput estimation."""
+    
+    def test_create_encoder(self):
+        """Test encoder specs."""
+        encoder = create_encoder('hybrid:word_level')
+        self.assertIsInstance(encoder, HybridEncoder)
+        self.assertEqual(encoder.strategy, 'word_level')
+        self.assertEqual(create_encoder('single_byte:pure').mode, 'pure')
+        with self.assertRaises(ValueError):
+            create_encoder('morse')
+    
+    def test_matches_compiled_timeline(self):
+        """Test durations agree with compile_timeline for every encoder."""
+        text = TEXT * 20
+        chunks = [text[i:i + 37] for i in range(0, len(text), 37)]
+        specs = ('letter', 'phoneme', 'single_byte', 'hybrid', 'word', 'symbol_stream')
+        for spec in specs:
+            for rules in (NO_SPACING, SpacingRules()):
+                with self.subTest(spec=spec, rules=rules):
+                    stats = measure_throughput(create_encoder(spec), chunks, spec, rules,
+                                               batch_size=16)
+                    timeline = compile_timeline(create_encoder(spec).encode_text(text), rules)
+                    self.assertEqual(stats.duration_ms, timeline.end_ms)
+                    self.assertEqual(stats.patterns, timeline.pattern_count)
+                    self.assertEqual(stats.actuator_on_ms, timeline.actuator_on_ms)
+    
+    def test_registers_distinct_patterns(self):
+        """Test that freshly built equal patterns are registered once."""
+        histogram = _PatternHistogram(NO_SPACING)
+        batches = _iter_pattern_batches(create_encoder('multi_ring'), ["the cat sat. "] * 200,
+                                        histogram, 64)
+        self.assertEqual(sum(len(index) for index, _ in batches), 600)
+        self.assertEqual(len(histogram.durations), 3)
+    
+    def test_character_table_skips_unmapped(self):
+        """Test that the letter fast path drops characters outside the table."""
+        text = "Caf\u00e9 \u2603 HELLO \U0001F600 world. "
+        stats = measure_throughput(PatternEncoder(), [text, text])
+        timeline = compile_timeline(PatternEncoder().encode_text(text * 2), NO_SPACING)
+        self.assertEqual(stats.patterns, timeline.pattern_count)
+        self.assertEqual(stats.duration_ms, timeline.end_ms)
+    
+    def test_counts_and_rates(self):
+        """Test character/word counts across chunk boundaries."""
+        encoder = create_encoder('letter')
+        stats = measure_throughput(encoder, ['Hel', 'lo wo', 'rld'])
+        duration = sum(p.total_duration_ms for p in encoder.encode_text('hello world'))
+        self.assertEqual(stats.characters, 11)
+        self.assertEqual(stats.words, 2)
+        self.assertEqual(stats.patterns, 10)
+        self.assertEqual(stats.gap_ms, 0)
+        self.assertEqual(stats.duration_ms, duration)
+        self.assertAlmostEqual(stats.cps, 11 * 1000 / duration)
+        self.assertAlmostEqual(stats.wpm, 2 * 60000 / duration)
+        self.assertEqual(stats.to_dict()['duration_ms'], duration)
+    
+    def test_mode_switches(self):
+        """Test mode switches between phoneme and character segments."""
+        self.assertEqual(measure_throughput(create_encoder('hybrid'), ['cat dog']).mode_switches, 0)
+        self.assertEqual(measure_throughput(create_encoder('hybrid'), ['cat 42 dog']).mode_switches, 2)
+        self.assertEqual(measure_throughput(create_encoder('symbol_stream'), ['cat 42']).mode_switches, 1)
+        self.assertEqual(measure_throughput(create_encoder('letter'), ['cat 42']).mode_switches, 0)
+    
+    def test_spaces_keep_mode(self):
+        """Test that spaces between words of one mode are not mode switches."""
+        text = ['cat dog and the end']
+        for spec in ('hybrid', 'symbol_stream'):
+            self.assertEqual(measure_throughput(create_encoder(spec), text).mode_switches, 0)
+        self.assertEqual(measure_throughput(create_encoder('symbol_stream'), ['cat 42 dog']).mode_switches, 2)
+    
+    def test_analyze_directory(self):
+        """Test analyzing a directory of text files."""
+        with tempfile.TemporaryDirectory() as directory:
+            for name, text in (('a.txt', 'hello '), ('b.txt', 'world')):
+                with open(os.path.join(directory, name), 'w') as f:
+                    f.write(text)
+            self.assertEqual(list(iter_corpus(directory, chunk_size=4)),
+                             ['hell', 'o ', 'worl', 'd'])
+            results = analyze_corpus(directory, ['letter', 'single_byte'])
+        self.assertEqual([r.encoder for r in results], ['letter', 'single_byte'])
+        self.assertIsInstance(results[0], ThroughputStats)
+        self.assertEqual(results[0].characters, 11)
+        self.assertEqual(results[0].words, 2)
+
+
+class TestWireSize(unittest.TestCase):
+    """Test the wire size report."""
+    
+    def test_chord_is_one_step(self):
+        """Test an 8-actuator chord packs into a single step."""
+        period = PatternEncoder().encode_character('.')
+        legacy, packed, compact, steps = pattern_sizes(period)
+        self.assertEqual(len(period.events), 8)
+        self.assertEqual(steps, 1)
+        self.assertEqual(packed, 2 + 8 * 5)
+        self.assertEqual(compact, 2 + 3)
+        self.assertGreater(legacy, packed)
+    
+    def test_tables(self):
+        """Test table reports cover distinct patterns and shrink in v2."""
+        letter, single_byte = analyze_tables(('letter', 'single_byte'))
+        self.assertEqual(single_byte.patterns, 255)
+        self.assertEqual(single_byte.steps, 255)
+        for stats in (letter, single_byte):
+            self.assertLess(stats.compact_bytes, stats.packed_bytes)
+            self.assertLess(stats.packed_bytes, stats.legacy_bytes)
+            self.assertEqual(stats.fallbacks, 0)
+        with self.assertRaises(ValueError):
+            table_patterns(create_encoder('hybrid'))
+    
+    def test_weighted_and_fallback(self):
+        """Test corpus weighting and multi-ring fallbacks."""
+        patterns = PatternEncoder().encode_text('EEE')
+        self.assertEqual(measure_sizes(patterns, 'letter').patterns, 3)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'corpus.txt')
+            with open(path, 'w') as f:
+                f.write(TEXT)
+            ring, = analyze_corpus_sizes(path, ('multi_ring',))
+        self.assertGreater(ring.fallbacks, 0)
+        self.assertLessEqual(ring.compact_bytes, ring.packed_bytes)
+
+
+if __name__ == '__main__':
+    unittest.main()
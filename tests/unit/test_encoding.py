@@ -1,7 +1,26 @@
 """Unit tests for pattern encoding."""
 
+import os
+import tempfile
 import unittest
 from src.core.encoding.pattern import PatternEncoder, Pattern, ActuatorEvent
+from src.core.encoding.phoneme import PhonemeEncoder
+from src.core.encoding.single_byte import SingleByteEncoder, np
+from src.core.encoding.trie import CompiledTrie
+from src.core.encoding.cache import WordCache
+from src.core.encoding.frequency import COMMON_WORDS, CodeTable, count_symbols
+from src.core.encoding.lexicon import Lexicon, compile_lexicon
+from src.core.encoding import hybrid
+from src.core.encoding.hybrid import HybridEncoder
+from src.core.encoding.stream import iter_split_whitespace, split_whitespace
+from src.core.encoding.tokenizer import TokenKind, iter_tokenize, tokenize
+from src.core.encoding.word import WordEncoder
+from src.core.encoding.multi_ring import MultiRingPhonemeEncoder, split_syllables
+from src.core.encoding.timeline import NO_SPACING, SpacingRules, compile_timeline
+from src.core.encoding.scheduler import PipelineScheduler, actuator_conflicts
+from src.core.encoding.symbol_stream import (
+    PHONEME_CODES, SymbolStreamEncoder, decode_symbols
+)
 
 
 class TestPatternEncoder(unittest.TestCase):
@@ -53,6 +72,589 @@ class TestPatternEncoder(unittest.TestCase):
         duration = pattern.get_duration()
         self.assertGreater(duration, 0)
         self.assertLessEqual(duration, 500)  # Reasonable upper bound
+    
+    def test_patterns_are_shared(self):
+        """Test that compiled patterns are shared between calls and encoders."""
+        other = PatternEncoder()
+        self.assertIs(self.encoder.encode_character('E'), other.encode_character('E'))
+        self.assertIs(self.encoder.encode_character('e'), self.encoder.encode_character('E'))
+    
+    def test_patterns_are_immutable(self):
+        """Test that shared patterns cannot be mutated."""
+        pattern = self.encoder.encode_character('N')
+        with self.assertRaises(AttributeError):
+            pattern.total_duration_ms = 0
+        with self.assertRaises(AttributeError):
+            pattern.events[0].actuator_id = 7
+        with self.assertRaises(TypeError):
+            pattern.events[0] = ActuatorEvent(7, 0, 100)
+        with self.assertRaises(TypeError):
+            self.encoder.pattern_table['E'] = pattern
+
+
+class TestPatternValues(unittest.TestCase):
+    """Test value semantics of events and patterns."""
+    
+    def test_event_equality_and_hash(self):
+        """Test that events compare and hash by their fields."""
+        a = ActuatorEvent(1, 0, 100, 200)
+        b = ActuatorEvent(1, 0, 100)
+        self.assertEqual(a, b)
+        self.assertEqual(hash(a), hash(b))
+        self.assertNotEqual(a, ActuatorEvent(1, 0, 100, 180))
+        self.assertFalse(hasattr(a, '__dict__'))
+    
+    def test_pattern_equality_and_hash(self):
+        """Test that patterns compare by events regardless of input order."""
+        first = Pattern([ActuatorEvent(1, 150, 100), ActuatorEvent(0, 0, 100)])
+        second = Pattern([ActuatorEvent(0, 0, 100), ActuatorEvent(1, 150, 100)])
+        self.assertEqual(first, second)
+        self.assertEqual(len({first, second, PatternEncoder().encode_character('N')}), 1)
+        self.assertNotEqual(first, Pattern([]))
+    
+    def test_chord_order(self):
+        """Test that simultaneous events compare equal in any input order."""
+        first = Pattern([ActuatorEvent(0, 0, 100), ActuatorEvent(7, 0, 100), ActuatorEvent(7, 0, 50)])
+        second = Pattern([ActuatorEvent(7, 0, 50), ActuatorEvent(7, 0, 100), ActuatorEvent(0, 0, 100)])
+        self.assertEqual(first, second)
+        self.assertEqual(hash(first), hash(second))
+        self.assertEqual(first.events, second.events)
+    
+    def test_pickle_round_trip(self):
+        """Test that immutable values survive pickling."""
+        import pickle
+        pattern = PatternEncoder().encode_character('X')
+        self.assertEqual(pickle.loads(pickle.dumps(pattern)), pattern)
+
+
+class TestPhonemeEncoder(unittest.TestCase):
+    """Test phoneme encoder."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.encoder = PhonemeEncoder()
+    
+    def test_encode_phoneme_shared(self):
+        """Test that phoneme patterns are shared between encoders."""
+        pattern = self.encoder.encode_phoneme('ŋ')
+        self.assertEqual(len(pattern.events), 3)
+        self.assertIs(pattern, PhonemeEncoder().encode_phoneme('ŋ'))
+    
+    def test_encode_phoneme_unsupported(self):
+        """Test encoding unsupported phoneme."""
+        self.assertIsNone(self.encoder.encode_phoneme('x'))
+    
+    def test_encode_text(self):
+        """Test encoding text into phoneme patterns."""
+        patterns = self.encoder.encode_text("the cat")
+        # th, e, space, c, a, t
+        self.assertEqual(len(patterns), 6)
+        self.assertEqual(patterns[2].events, ())
+    
+    def test_text_to_phonemes_digraphs(self):
+        """Test longest-match conversion of digraphs and multi-phoneme rules."""
+        self.assertEqual(self.encoder.text_to_phonemes("thing"), ['θ', 'ɪ', 'ŋ'])
+        self.assertEqual(self.encoder.text_to_phonemes("Queen"), ['k', 'w', 'i', 'n'])
+    
+    def test_text_to_phonemes_silent_and_unknown(self):
+        """Test that silent graphemes and unknown characters emit nothing."""
+        self.assertEqual(self.encoder.text_to_phonemes("night"), ['n', 'ɪ', 't'])
+        self.assertEqual(self.encoder.text_to_phonemes(" a, b "), ['æ', ' ', 'b'])
+
+    
+    def test_word_cache_hits(self):
+        """Test that repeated words are served from the word cache."""
+        encoder = PhonemeEncoder(word_cache=WordCache(maxsize=16))
+        first = encoder.encode_text("the cat the cat")
+        self.assertEqual(encoder.word_cache.misses, 2)
+        self.assertEqual(encoder.word_cache.hits, 2)
+        self.assertEqual(first, PhonemeEncoder(word_cache=WordCache()).encode_text("the cat the cat"))
+    
+    def test_warm_cache(self):
+        """Test pre-warming the cache from a frequency list."""
+        cache = WordCache(maxsize=10)
+        encoder = PhonemeEncoder(word_cache=cache)
+        encoder.warm_cache(COMMON_WORDS)
+        self.assertEqual(len(cache), 10)
+        encoder.encode_text("the")
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+
+
+class TestWordCache(unittest.TestCase):
+    """Test bounded LRU word cache."""
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted."""
+        cache = WordCache(maxsize=2)
+        cache.put('a', 1)
+        cache.put('b', 2)
+        cache.get('a')
+        cache.put('c', 3)
+        self.assertIn('a', cache)
+        self.assertNotIn('b', cache)
+        self.assertEqual(cache.evictions, 1)
+    
+    def test_counters(self):
+        """Test hit/miss counters."""
+        cache = WordCache()
+        self.assertIsNone(cache.get('x'))
+        self.assertEqual(cache.get_or_compute('x', lambda: 42), 42)
+        self.assertEqual(cache.get('x'), 42)
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertEqual(cache.stats()['misses'], 2)
+
+
+class TestLexicon(unittest.TestCase):
+    """Test memory-mapped pronunciation lexicon."""
+    
+    def setUp(self):
+        """Compile a small lexicon from a CMUdict-style word list."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        source = os.path.join(self.tmpdir.name, 'words.txt')
+        self.path = os.path.join(self.tmpdir.name, 'lexicon.bin')
+        with open(source, 'w', encoding='utf-8') as f:
+            f.write(";;; comment\n"
+                    "HELLO  HH AH0 L OW1\n"
+                    "ONE  W AH1 N\n"
+                    "ONE(2)  HH W AH1 N\n"
+                    "knight n aɪ t\n")
+        self.assertEqual(compile_lexicon(source, self.path), 3)
+    
+    def tearDown(self):
+        self.tmpdir.cleanup()
+    
+    def test_lookup(self):
+        """Test binary-search lookup in the mapped file."""
+        with Lexicon(self.path) as lexicon:
+            self.assertEqual(len(lexicon), 3)
+            self.assertEqual(lexicon.get('hello'), ('h', 'ə', 'l', 'oʊ'))
+            self.assertEqual(lexicon.get('one'), ('w', 'ʌ', 'n'))
+            self.assertIsNone(lexicon.get('cat'))
+    
+    def test_phoneme_encoder_fallback(self):
+        """Test lexicon words use the lexicon and others fall back to rules."""
+        with Lexicon(self.path) as lexicon:
+            encoder = PhonemeEncoder(word_cache=WordCache(), lexicon=lexicon)
+            self.assertEqual(encoder.text_to_phonemes("Knight, cat"),
+                             ['n', 'aɪ', 't', ' ', 'k', 'æ', 't'])
+    
+    def test_invalid_file(self):
+        """Test that non-lexicon files are rejected."""
+        bogus = os.path.join(self.tmpdir.name, 'bogus.bin')
+        with open(bogus, 'wb') as f:
+            f.write(b'not a lexicon file')
+        with self.assertRaises(ValueError):
+            Lexicon(bogus).get('x')
+
+
+class TestStreaming(unittest.TestCase):
+    """Test streaming iter_encode APIs."""
+    
+    TEXT = "  The thing sang,  then  www.example.com 42 quickly!\n"
+    
+    def chunkings(self):
+        """All two-way splits of the test text, plus one chunk per character."""
+        for cut in range(len(self.TEXT) + 1):
+            yield [self.TEXT[:cut], self.TEXT[cut:]]
+        yield list(self.TEXT)
+    
+    def test_split_matches_whole_text(self):
+        """Test that streaming split reassembles tokens across chunks."""
+        expected = split_whitespace(self.TEXT)
+        for chunks in self.chunkings():
+            self.assertEqual(list(iter_split_whitespace(chunks)), expected)
+        self.assertEqual(list(iter_split_whitespace([])), [''])
+    
+    def test_iter_encode_matches_encode_text(self):
+        """Test that every encoder streams the same patterns across chunk boundaries."""
+        encoders = [PatternEncoder(), PhonemeEncoder(), SingleByteEncoder()]
+        encoders += [HybridEncoder(strategy) for strategy in
+                     ('adaptive', 'word_level', 'character', 'phoneme')]
+        for encoder in encoders:
+            expected = encoder.encode_text(self.TEXT)
+            for chunks in self.chunkings():
+                self.assertEqual(list(encoder.iter_encode(chunks)), expected)
+    
+    def test_iter_encode_is_incremental(self):
+        """Test that patterns are yielded before the input is exhausted."""
+        def endless():
+            while True:
+                yield "think "
+        
+        stream = PhonemeEncoder().iter_encode(endless())
+        first = next(stream)
+        self.assertIs(first, PhonemeEncoder().encode_phoneme('θ'))
+        
+        for strategy in ('character', 'phoneme'):
+            mode, run = next(HybridEncoder(strategy).iter_encode_segments(endless()))
+            self.assertEqual(mode, strategy)
+            self.assertEqual(len(run), hybrid.SEGMENT_SIZE)
+
+
+class TestTokenizer(unittest.TestCase):
+    """Test compiled single-pass tokenizer."""
+    
+    def test_classification(self):
+        """Test that tokens are classified in one scan."""
+        tokens = list(tokenize("Don't 3.14 www.example.com 2nd -- ok!"))
+        kinds = [kind for kind, _ in tokens if kind is not TokenKind.WHITESPACE]
+        self.assertEqual(kinds, [TokenKind.WORD, TokenKind.NUMBER, TokenKind.CODE,
+                                 TokenKind.CODE, TokenKind.PUNCTUATION, TokenKind.WORD])
+        self.assertEqual(''.join(token for _, token in tokens),
+                         "Don't 3.14 www.example.com 2nd -- ok!")
+    
+    def test_streaming_matches_whole_text(self):
+        """Test that chunked tokenization reclassifies tokens split across chunks."""
+        text = "abc123 def  4.5"
+        expected = list(tokenize(text))
+        for cut in range(len(text) + 1):
+            self.assertEqual(list(iter_tokenize([text[:cut], text[cut:]])), expected)
+    
+    def test_hybrid_token_cache(self):
+        """Test that repeated tokens are served from the hybrid token cache."""
+        encoder = HybridEncoder('adaptive', token_cache=WordCache())
+        patterns = encoder.encode_text("the cat, the cat, 42")
+        self.assertEqual(encoder.token_cache.hits, 2)
+        self.assertEqual(patterns, HybridEncoder('adaptive', token_cache=WordCache())
+                         .encode_text("the cat, the cat, 42"))
+        # Whitespace runs become exactly one space pattern
+        self.assertEqual(encoder.encode_text("  the"), encoder.encode_text(" the"))
+
+
+class TestCompiledTrie(unittest.TestCase):
+    """Test longest-match trie."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.trie = CompiledTrie({'t': 1, 'th': 2, 'the': 3, 's': 4})
+    
+    def test_longest_match(self):
+        """Test that the longest key wins."""
+        self.assertEqual(self.trie.longest_match("them", 0), (3, 3))
+        self.assertEqual(self.trie.longest_match("thy", 0), (2, 2))
+        self.assertEqual(self.trie.longest_match("x", 0), (0, None))
+    
+    def test_scan(self):
+        """Test tokenizing a string by repeated longest match."""
+        tokens = [value for _, _, value in self.trie.scan("thexts")]
+        self.assertEqual(tokens, [3, None, 1, 4])
+    
+    def test_exact_lookup(self):
+        """Test exact key lookup."""
+        self.assertIn('th', self.trie)
+        self.assertNotIn('h', self.trie)
+        self.assertEqual(len(self.trie), 4)
+
+
+class TestWordEncoder(unittest.TestCase):
+    """Test word-level contraction encoder."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.encoder = WordEncoder()
+        self.letters = PatternEncoder()
+    
+    def test_common_word_is_one_pattern(self):
+        """Test that a common word plays as a single dedicated pattern."""
+        patterns = self.encoder.encode_text("The")
+        self.assertEqual(patterns, [self.encoder.encode_word('the')])
+        self.assertNotIn(patterns[0], set(self.letters.pattern_table.values()))
+        # Edge punctuation is still spelled out
+        self.assertEqual(self.encoder.encode_text("the."),
+                         patterns + [self.letters.encode_character('.')])
+    
+    def test_clusters_and_fallback(self):
+        """Test that rare words use clusters, and non-words use characters."""
+        patterns = self.encoder.encode_text("thing")
+        self.assertEqual(patterns, [self.encoder.cluster_patterns['th'],
+                                    self.encoder.cluster_patterns['ing']])
+        self.assertEqual(self.encoder.encode_text("42"), self.letters.encode_text("42"))
+    
+    def test_report_saving(self):
+        """Test the per-document playback-time report."""
+        text = "the cat and the dog"
+        report = self.encoder.report(text)
+        self.assertEqual(report.total_words, 5)
+        self.assertEqual(report.contracted_words, 3)
+        self.assertEqual(report.encoded_ms,
+                         sum(p.total_duration_ms for p in self.encoder.encode_text(text)))
+        self.assertEqual(report.baseline_ms,
+                         sum(p.total_duration_ms for p in self.letters.encode_text(text)))
+        self.assertGreater(report.saving_ms, 0)
+    
+    def test_streaming_and_hybrid_strategy(self):
+        """Test streaming and the hybrid 'word_contraction' strategy."""
+        text = "It was the best of times, it was 1859."
+        expected = self.encoder.encode_text(text)
+        self.assertEqual(list(self.encoder.iter_encode([text[:9], text[9:]])), expected)
+        self.assertEqual(HybridEncoder('word_contraction').encode_text(text), expected)
+
+
+class TestMultiRingPhonemeEncoder(unittest.TestCase):
+    """Test multi-ring parallel phoneme encoder."""
+    
+    def test_word_fits_in_one_frame(self):
+        """Test that each phoneme of a short word gets its own ring."""
+        encoder = MultiRingPhonemeEncoder(num_rings=6)
+        word = encoder.encode_word('signal')
+        self.assertEqual(len(word.frames), 1)
+        self.assertEqual(word.duration_ms, 80)
+        frame = word.frames[0]
+        self.assertEqual(frame.symbols, word.phonemes)
+        rings = {event.actuator_id // 8 for event in frame.pattern.events}
+        self.assertEqual(rings, set(range(len(word.phonemes))))
+        # Every ring fires its phoneme-mode indicator
+        indicators = [e.actuator_id for e in frame.pattern.events if e.actuator_id % 8 == 7]
+        self.assertEqual(len(indicators), len(word.phonemes))
+    
+    def test_overflow_strategies(self):
+        """Test the documented overflow strategies on an 11-phoneme word."""
+        def frames(overflow):
+            encoder = MultiRingPhonemeEncoder(num_rings=8, overflow=overflow)
+            return encoder.encode_word('intensifying')
+        
+        sequential = frames('sequential')
+        self.assertEqual(len(sequential.phonemes), 11)
+        self.assertTrue(sequential.overflow)
+        self.assertEqual([len(f.symbols) for f in sequential.frames], [8, 1, 1, 1])
+        self.assertEqual(sequential.duration_ms, 320)
+        
+        split = frames('split')
+        self.assertEqual(tuple(p for f in split.frames for p in f.symbols), split.phonemes)
+        self.assertTrue(all(len(f.symbols) <= 8 for f in split.frames))
+        
+        truncated = frames('truncate')
+        self.assertEqual(len(truncated.frames), 1)
+        self.assertEqual(truncated.dropped, 3)
+        
+        hybrid = frames('hybrid')
+        self.assertEqual(''.join(f.symbols[0] for f in hybrid.frames), 'intensifying')
+    
+    def test_word_timings(self):
+        """Test that words are timed back to back with the configured gaps."""
+        encoder = MultiRingPhonemeEncoder(word_gap_ms=100)
+        words = encoder.encode_words("the cat  sat")
+        self.assertEqual([w.start_ms for w in words], [0, 180, 360])
+        self.assertEqual(list(encoder.iter_encode(["the c", "at  sat"])),
+                         encoder.encode_text("the cat  sat"))
+        summary = encoder.summarize(words)
+        self.assertEqual(summary['coverage'], 1.0)
+        self.assertGreater(summary['speedup'], 1.0)
+    
+    def test_pattern_rings_need_eight_actuators(self):
+        """Test that phoneme and letter patterns are not folded onto smaller rings."""
+        with self.assertRaises(ValueError):
+            MultiRingPhonemeEncoder(actuators_per_ring=6, ring_encoding='pattern')
+        with self.assertRaises(ValueError):
+            MultiRingPhonemeEncoder(num_rings=2, actuators_per_ring=7, overflow='hybrid')
+        # Code rings of 7 still work when nothing is spelled
+        MultiRingPhonemeEncoder(num_rings=2, actuators_per_ring=7)
+        encoder = MultiRingPhonemeEncoder(actuators_per_ring=8, ring_encoding='pattern')
+        self.assertEqual(encoder.encode_word('cat').frames[0].symbols, ('k', 'æ', 't'))
+    
+    def test_split_syllables(self):
+        """Test vowel-nucleus syllable splitting."""
+        self.assertEqual(split_syllables(['s', 'ɪ', 'g', 'n', 'æ', 'l']),
+                         [('s', 'ɪ', 'g'), ('n', 'æ', 'l')])
+
+
+class TestSymbolStreamEncoder(unittest.TestCase):
+    """Test 8-bit mode-indicator symbol stream."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.encoder = SymbolStreamEncoder(token_cache=WordCache())
+    
+    def test_code_space(self):
+        """Test that words become phoneme codes and the rest ASCII codes."""
+        codes = self.encoder.encode_symbols("in 42!")
+        phonemes = self.encoder.phoneme_encoder.text_to_phonemes("in")
+        self.assertEqual(codes, bytes(PHONEME_CODES[p] for p in phonemes) + b' 42!')
+        self.assertTrue(all(code >= 128 for code in codes[:len(phonemes)]))
+        self.assertEqual(decode_symbols(codes)[-3:], [(False, '4'), (False, '2'), (False, '!')])
+        # Edge punctuation stays in character mode
+        self.assertEqual(self.encoder.encode_symbols("in,")[-1:], b',')
+        self.assertEqual(SymbolStreamEncoder('character').encode_symbols("in  42"), b'in 42')
+    
+    def test_render_mode_indicator(self):
+        """Test that phoneme codes fire actuator 7 and render lazily from bytes."""
+        codes = self.encoder.encode_symbol_array("the cat")
+        patterns = self.encoder.render(codes)
+        self.assertEqual(len(patterns), len(codes))
+        for code, pattern in zip(codes, patterns):
+            actuators = {event.actuator_id for event in pattern.events}
+            self.assertEqual(7 in actuators, code >= 128)
+            self.assertEqual(pattern.total_duration_ms, 80 if actuators else 0)
+        self.assertEqual(list(self.encoder.iter_render(codes)), patterns)
+    
+    def test_streaming(self):
+        """Test that chunked encoding produces the same byte stream."""
+        text = "Visit example.com at 10:30, then rest."
+        expected = self.encoder.encode_symbols(text)
+        for cut in range(len(text) + 1):
+            chunks = [text[:cut], text[cut:]]
+            self.assertEqual(b''.join(self.encoder.iter_encode_symbols(chunks)), expected)
+
+
+class TestTimeline(unittest.TestCase):
+    """Test timeline compiler."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.encoder = PatternEncoder()
+        self.rules = SpacingRules(symbol_gap_ms=100, word_gap_ms=300, sentence_gap_ms=600)
+    
+    def test_spacing_rules(self):
+        """Test symbol, word and sentence gaps."""
+        timeline = compile_timeline(self.encoder.encode_text("ea  e. e"), self.rules)
+        # e (150ms) +100 a (150ms) +300 e (150ms) +100 . (200ms) +600 e
+        self.assertEqual(list(timeline.pattern_starts), [0, 250, 700, 950, 1750])
+        self.assertEqual(timeline.end_ms, 1900)
+        self.assertEqual([event.actuator for event in timeline][:2], [0, 2])
+        self.assertEqual(timeline.pattern_count, 5)
+    
+    def test_no_spacing_is_back_to_back(self):
+        """Test that NO_SPACING matches the summed pattern durations."""
+        patterns = PhonemeEncoder().encode_text("the cat sat")
+        timeline = compile_timeline(patterns, NO_SPACING)
+        self.assertEqual(timeline.end_ms, sum(p.total_duration_ms for p in patterns))
+        self.assertEqual(list(timeline.times), sorted(timeline.times))
+    
+    def test_slice_by_time(self):
+        """Test slicing a timeline by onset time."""
+        timeline = compile_timeline(self.encoder.encode_text("hello world"), self.rules)
+        window = timeline.slice(500, 1500)
+        self.assertTrue(all(500 <= event.time_ms < 1500 for event in window))
+        self.assertEqual(len(window) + len(timeline.slice(0, 500)) + len(timeline.slice(1500)),
+                         len(timeline))
+        self.assertTrue(all(500 <= start < 1500 for start in window.pattern_starts))
+    
+    def test_pattern_spacing_config(self):
+        """Test mapping the PATTERN_SPACING config value."""
+        rules = SpacingRules.from_pattern_spacing(150)
+        self.assertEqual((rules.word_gap_ms, rules.sentence_gap_ms), (350, 700))
+        self.assertEqual(rules.pattern_spacing, 150)
+        with self.assertRaises(ValueError):
+            SpacingRules.from_pattern_spacing(300)
+
+
+class TestPipelineScheduler(unittest.TestCase):
+    """Test overlap-aware pattern pipelining."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.encoder = PatternEncoder()
+        self.rules = SpacingRules(symbol_gap_ms=150, word_gap_ms=350, sentence_gap_ms=700)
+    
+    def test_next_pattern_starts_when_actuators_free(self):
+        """Test that a pattern starts once its actuators are free, not when the previous ends."""
+        scheduler = PipelineScheduler(min_onset_ms=100, actuator_gap_ms=50, rules=self.rules)
+        # Q is a long pattern; E only needs actuator 0
+        timeline = scheduler.schedule(self.encoder.encode_text("QE"))
+        q = self.encoder.encode_character('Q')
+        last_use_of_0 = max(e.time_offset_ms + e.duration_ms
+                            for e in q.events if e.actuator_id == 0)
+        expected = max(100, last_use_of_0 + 50)
+        self.assertEqual(list(timeline.pattern_starts), [0, expected])
+        self.assertLess(expected, q.total_duration_ms + 150)
+    
+    def test_no_double_booking(self):
+        """Test that no actuator is double-booked and word gaps are kept."""
+        scheduler = PipelineScheduler(min_onset_ms=60, actuator_gap_ms=40, rules=self.rules)
+        patterns = self.encoder.encode_text("the quick brown fox jumps over the lazy dog.")
+        timeline = scheduler.schedule(patterns)
+        self.assertEqual(actuator_conflicts(timeline, min_gap_ms=40), [])
+        self.assertEqual(list(timeline.times), sorted(timeline.times))
+        self.assertEqual(timeline.pattern_count, sum(1 for p in patterns if p.events))
+    
+    def test_report_against_serialized(self):
+        """Test the cps report against back-to-back playback."""
+        text = "Quiz box jazz, lazy fox."
+        report = PipelineScheduler(rules=self.rules).report_text(self.encoder, text)
+        self.assertEqual(report.serialized_ms,
+                         compile_timeline(self.encoder.encode_text(text), self.rules).end_ms)
+        self.assertLess(report.duration_ms, report.serialized_ms)
+        self.assertGreater(report.cps, report.serialized_cps)
+        self.assertEqual(report.characters, len(text))
+
+
+class TestSingleByteEncoder(unittest.TestCase):
+    """Test single-byte encoder."""
+    
+    MODES = ['ring_based', 'pure', 'micro_temporal', 'intensity', 'grouped']
+    
+    def test_encode_character_bits(self):
+        """Test that 'A' (0x41) fires actuators 0 and 6."""
+        pattern = SingleByteEncoder('pure').encode_character('A')
+        self.assertEqual([e.actuator_id for e in pattern.events], [0, 6])
+    
+    @unittest.skipIf(np is None, "numpy not installed")
+    def test_encode_bulk_matches_patterns(self):
+        """Test that the bulk path agrees with per-character patterns in every mode."""
+        text = "Hello, wörld — 123!\n"
+        for mode in self.MODES:
+            encoder = SingleByteEncoder(mode)
+            bulk = encoder.encode_bulk(text)
+            patterns = encoder.encode_text(text)
+            self.assertEqual(encoder.patterns_from_codes(bulk.codes), patterns)
+            for row, pattern in enumerate(patterns):
+                mask = 0
+                for event in pattern.events:
+                    mask |= 1 << event.actuator_id
+                    self.assertEqual(bulk.offsets[row, event.actuator_id], event.time_offset_ms)
+                    self.assertEqual(bulk.durations[row, event.actuator_id], event.duration_ms)
+                    self.assertEqual(bulk.intensities[row, event.actuator_id], event.intensity)
+                self.assertEqual(bulk.masks[row], mask)
+                self.assertEqual(bulk.pattern_durations[row], pattern.total_duration_ms)
+    
+    def test_frequency_code_table(self):
+        """Test that frequent symbols get the fewest active actuators in every mode."""
+        corpus = "the rain in spain stays mainly in the plain. " * 5
+        table = CodeTable.from_corpus(corpus)
+        counts = count_symbols(corpus)
+        self.assertLess(table.mean_active_bits(counts),
+                        CodeTable.identity().mean_active_bits(counts))
+        # Space keeps the empty code; every other symbol fires an actuator
+        self.assertEqual(table.codes[ord(' ')], 0)
+        self.assertNotIn(0, table.codes[:ord(' ')] + table.codes[ord(' ') + 1:])
+        self.assertEqual(bin(table.codes[ord('n')]).count('1'), 1)
+        for mode in self.MODES:
+            encoder = SingleByteEncoder(mode, code_table=table)
+            plain = SingleByteEncoder(mode)
+            self.assertEqual(encoder.encode_character('n'),
+                             plain.encode_character(chr(table.codes[ord('n')])))
+            self.assertEqual(encoder.frequency_map['n'], table.codes[ord('n')])
+        self.assertEqual(SingleByteEncoder().frequency_map, {})
+    
+    def test_code_table_persistence(self):
+        """Test saving and loading a code table."""
+        table = CodeTable.from_corpus("abracadabra", layout='linear')
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'codes.json')
+            table.save(path)
+            self.assertEqual(CodeTable.load(path), table)
+            encoder = SingleByteEncoder('pure', layout='linear', code_table=path)
+        self.assertEqual(encoder.code_table.layout, 'linear')
+        self.assertEqual(table.inverse[table.codes[ord('a')]], ord('a'))
+        with self.assertRaises(ValueError):
+            CodeTable([0] * 256)
+    
+    @unittest.skipIf(np is None, "numpy not installed")
+    def test_encode_bulk_code_table(self):
+        """Test that the bulk path applies the code table."""
+        encoder = SingleByteEncoder('pure', code_table=CodeTable.from_corpus("eeeeee tt aa"))
+        bulk = encoder.encode_bulk("eta e")
+        self.assertEqual(list(bulk.codes), [ord(c) for c in "eta e"])
+        # The most frequent letter is felt; only the space is silent
+        self.assertEqual([bin(mask).count('1') for mask in bulk.masks], [1, 1, 1, 0, 1])
+        self.assertEqual(encoder.patterns_from_codes(bulk.codes), encoder.encode_text("eta e"))
+    
+    @unittest.skipIf(np is None, "numpy not installed")
+    def test_encode_bulk_bytes(self):
+        """Test that byte buffers are encoded one symbol per byte."""
+        encoder = SingleByteEncoder()
+        bulk = encoder.encode_bulk(b'\x00\xff')
+        self.assertEqual(list(bulk.masks), [0x00, 0xFF])
 
 
 if __name__ == '__main__':
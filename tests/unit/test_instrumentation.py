@@ -0,0 +1,135 @@
+"""Unit tests for latency instrumentation."""
+
+import asyncio
+import json
+import unittest
+
+from src.core import instrumentation
+from src.core.encoding import HybridEncoder, PatternEncoder, PhonemeEncoder
+from src.core.instrumentation import LatencyHistogram, LatencyRecorder
+from src.core.protocol.message import Message, MessageType, PatternMessage
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    """Test fixed-bucket histograms."""
+    
+    def test_percentiles(self):
+        """Test percentiles resolve to bucket bounds."""
+        histogram = LatencyHistogram(budget_ms=1.0)
+        for _ in range(98):
+            histogram.record(1500)          # 1.5 us -> 2 us bucket
+        histogram.record(300000)            # 0.3 ms -> 0.5 ms bucket
+        histogram.record(3000000)           # 3 ms, over budget
+        self.assertEqual(histogram.count, 100)
+        self.assertEqual(histogram.percentile(50), 2000)
+        self.assertEqual(histogram.percentile(99), 500000)
+        self.assertEqual(histogram.percentile(100), 3000000)
+        self.assertEqual(histogram.over_budget(), 1)
+        
+        stats = histogram.to_dict()
+        self.assertEqual(stats['max_ms'], 3.0)
+        self.assertEqual(stats['min_ms'], 0.0015)
+        self.assertEqual(stats['buckets'], {'0.002': 98, '0.5': 1, '5.0': 1})
+    
+    def test_empty_and_merge(self):
+        """Test empty histograms and merging."""
+        a = LatencyHistogram()
+        self.assertEqual(a.percentile(99), 0)
+        b = LatencyHistogram()
+        b.record(10)
+        b.record(20 * 10 ** 9)              # Overflow bucket
+        a.merge(b)
+        self.assertEqual(a.count, 2)
+        self.assertEqual(a.min_ns, 10)
+        self.assertEqual(a.percentile(100), 20 * 10 ** 9)
+        a.clear()
+        self.assertEqual(a.count, 0)
+
+
+class TestInstrumentation(unittest.TestCase):
+    """Test probe installation."""
+    
+    def tearDown(self):
+        instrumentation.disable()
+    
+    def test_disabled_has_no_wrappers(self):
+        """Test that enable/disable restore the original methods."""
+        originals = (PatternEncoder.encode_text, Message.serialize, Message.__dict__['deserialize'])
+        instrumentation.enable()
+        self.assertIsNot(PatternEncoder.encode_text, originals[0])
+        self.assertTrue(instrumentation.is_enabled())
+        instrumentation.disable()
+        self.assertIs(PatternEncoder.encode_text, originals[0])
+        self.assertIs(Message.serialize, originals[1])
+        self.assertIs(Message.__dict__['deserialize'], originals[2])
+        self.assertIsNone(instrumentation.get_recorder())
+    
+    def test_records_stages(self):
+        """Test encoder and protocol probes."""
+        hybrid = HybridEncoder()
+        with instrumentation.instrumented() as recorder:
+            patterns = PatternEncoder().encode_text('hi')
+            PhonemeEncoder().encode_text('hello')
+            hybrid.encode_text('hello 42')   # Nested encoder calls are not samples
+            data = PatternMessage('h', []).serialize()
+            self.assertEqual(Message.deserialize(data).msg_type, MessageType.PATTERN)
+        self.assertEqual(len(patterns), 2)
+        
+        snapshot = recorder.snapshot()
+        probes = snapshot['probes']
+        self.assertEqual(probes['encode.PatternEncoder.encode_text']['count'], 1)
+        self.assertEqual(probes['encode.PhonemeEncoder.encode_text']['count'], 1)
+        self.assertEqual(probes['encode.HybridEncoder.encode_text']['count'], 1)
+        self.assertEqual(probes['encode.PatternEncoder.encode_character']['count'], 0)
+        self.assertEqual(probes['serialize.Message']['count'], 1)
+        self.assertEqual(probes['deserialize.Message']['count'], 1)
+        self.assertEqual(snapshot['stages']['encode']['budget_ms'], 1.0)
+        self.assertEqual(snapshot['stages']['encode']['count'], 3)
+        self.assertEqual(json.loads(recorder.to_json())['stages']['serialize']['count'], 1)
+        
+        recorder.reset()
+        self.assertEqual(recorder.histogram('serialize.Message').count, 0)
+    
+    def test_transport(self):
+        """Test wrapping a transport instance, including coroutine methods."""
+        class Link:
+            def __init__(self):
+                self.sent = []
+            
+            def write(self, data):
+                self.sent.append(data)
+                return len(data)
+            
+            async def write_gatt_char(self, uuid, data):
+                self.sent.append(data)
+        
+        link = Link()
+        instrumentation.instrument_transport(link)     # Disabled: no-op
+        self.assertNotIn('write', vars(link))
+        
+        recorder = instrumentation.enable()
+        instrumentation.instrument_transport(link, methods=('write', 'write_gatt_char', 'missing'),
+                                             name='ble')
+        self.assertEqual(link.write(b'ab'), 2)
+        asyncio.run(link.write_gatt_char('uuid', b'cd'))
+        self.assertEqual(link.sent, [b'ab', b'cd'])
+        self.assertEqual(recorder.histogram('transport.ble.write').count, 1)
+        self.assertEqual(recorder.histogram('transport.ble.write_gatt_char').count, 1)
+        self.assertEqual(recorder.histogram('transport.ble.write').budget_ns, 5000000)
+        
+        instrumentation.disable()
+        self.assertNotIn('write', vars(link))
+    
+    def test_measure(self):
+        """Test manual probes."""
+        recorder = LatencyRecorder()
+        with recorder.measure('queue'):
+            pass
+        recorder.record('execute.device', 1500000)
+        snapshot = recorder.snapshot()['stages']
+        self.assertEqual(snapshot['queue']['count'], 1)
+        self.assertEqual(snapshot['execute']['over_budget'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
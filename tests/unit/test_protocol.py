@@ -1,5 +1,6 @@
 """Unit tests for communication protocol."""
 
+import struct
 import unittest
 from src.core.protocol.message import (
     Message,
@@ -9,8 +10,42 @@ from src.core.protocol.message import (
     StatusResponseMessage,
     ErrorMessage,
     ConfigType,
-    ErrorCode
+    ErrorCode,
+    PatternBatchMessage,
+    MessageSerializer,
+    PatternDefineMessage,
+    PatternPlayMessage,
+    PatternEvictMessage,
+    SymbolStreamMessage,
+    TableInfoMessage
 )
+from src.core.protocol.decoder import MessageStreamDecoder
+from src.core.protocol import codec
+from src.core.protocol.pattern_cache import (
+    PatternCacheMirror,
+    CachedPatternSender,
+    DevicePatternCache,
+    pattern_key
+)
+from src.core.protocol.framing import MtuFramer, FragmentReassembler, fragment, INCOMPLETE
+from src.core.protocol.reliable import (
+    AckMessage,
+    LossyLink,
+    ReliableReceiver,
+    ReliableSender,
+    SequencedMessage
+)
+from src.core.protocol.symbols import (
+    SYMBOL_TABLE_BUILDERS,
+    SymbolStreamExpander,
+    SymbolStreamSender,
+    get_symbol_table
+)
+from src.core.analysis.wire_size import pattern_events
+from src.core.encoding import PatternEncoder
+from src.core.encoding.phoneme import PhonemeEncoder
+from src.core.encoding.single_byte import SingleByteEncoder
+from src.core.encoding.symbol_stream import SymbolStreamEncoder
 
 
 class TestMessage(unittest.TestCase):
@@ -72,6 +107,622 @@ class TestMessage(unittest.TestCase):
         self.assertEqual(deserialized.msg_type, MessageType.ERROR)
 
 
+class TestSerialization(unittest.TestCase):
+    """Test preallocated serialization."""
+    
+    EVENTS = [
+        {'actuator': 0, 'time_offset': 0, 'duration': 150, 'intensity': 200},
+        {'actuator': 3, 'time_offset': 300, 'duration': 80},
+    ]
+    
+    def test_known_bytes(self):
+        """Test the wire format is unchanged."""
+        msg = PatternMessage('E', self.EVENTS)
+        payload = (struct.pack('B', ord('E')) + struct.pack('B', 2)
+                   + struct.pack('BHHB', 0, 0, 150, 200) + struct.pack('BHHB', 3, 300, 80, 200))
+        header = struct.pack('BB', MessageType.PATTERN, len(payload))
+        expected = header + payload + struct.pack('B', sum(header + payload) & 0xFF)
+        self.assertEqual(msg.serialize(), expected)
+        self.assertEqual(msg.serialized_size, len(expected))
+    
+    def test_batch_payload(self):
+        """Test batch payload layout."""
+        batch = PatternBatchMessage([('a', self.EVENTS), ('b', [])])
+        first = PatternMessage._serialize_pattern(self.EVENTS)
+        expected = (struct.pack('B', 2)
+                    + struct.pack('B', ord('a')) + struct.pack('H', len(first)) + first
+                    + struct.pack('B', ord('b')) + struct.pack('H', 1) + b'\x00')
+        self.assertEqual(batch.payload, expected)
+    
+    def test_serialize_into(self):
+        """Test serializing at an offset of a caller's buffer."""
+        msg = ConfigMessage(ConfigType.SPEED, 7)
+        buffer = bytearray(10)
+        written = msg.serialize_into(buffer, 3)
+        self.assertEqual(written, msg.serialized_size)
+        self.assertEqual(bytes(buffer[3:3 + written]), msg.serialize())
+        self.assertEqual(bytes(buffer[:3]), b'\x00\x00\x00')
+    
+    def test_serializer_reuses_buffer(self):
+        """Test MessageSerializer views and growth."""
+        serializer = MessageSerializer(capacity=8)
+        messages = [PatternMessage(c, self.EVENTS) for c in 'abc']
+        
+        view = serializer.serialize(messages[0])
+        self.assertIsInstance(view, memoryview)
+        self.assertEqual(bytes(view), messages[0].serialize())
+        self.assertGreaterEqual(serializer.capacity, len(view))
+        
+        kept = bytes(view)
+        many = serializer.write_many(messages)
+        self.assertEqual(bytes(many), b''.join(m.serialize() for m in messages))
+        self.assertEqual(bytes(view), kept)     # Growth leaves old views intact
+        decoded = Message.deserialize(bytes(many[:messages[0].serialized_size]))
+        self.assertEqual(decoded.payload, messages[0].payload)
+        
+        capacity = serializer.capacity
+        serializer.serialize(messages[1])
+        self.assertEqual(serializer.capacity, capacity)
+
+
+class TestMessageStreamDecoder(unittest.TestCase):
+    """Test incremental stream decoding."""
+    
+    EVENTS = [
+        {'actuator': 0, 'time_offset': 0, 'duration': 150, 'intensity': 200},
+        {'actuator': 3, 'time_offset': 300, 'duration': 80, 'intensity': 255},
+    ]
+    
+    def _messages(self):
+        return [
+            PatternMessage('E', self.EVENTS),
+            PatternBatchMessage([('h', self.EVENTS), ('i', self.EVENTS[:1])]),
+            ConfigMessage(ConfigType.SPEED, 7),
+            StatusResponseMessage(80, 50, 0, 5),
+            ErrorMessage(ErrorCode.QUEUE_FULL, "Queue is full"),
+            Message(MessageType.HEARTBEAT),
+        ]
+    
+    def test_typed_messages(self):
+        """Test concatenated messages decode into typed messages."""
+        messages = self._messages()
+        decoded = MessageStreamDecoder().feed(b''.join(m.serialize() for m in messages))
+        self.assertEqual([type(m) for m in decoded], [type(m) for m in messages])
+        self.assertEqual([bytes(m.payload) for m in decoded], [m.payload for m in messages])
+        
+        pattern, batch, config, status, error, heartbeat = decoded
+        self.assertEqual(pattern.char, 'E')
+        self.assertEqual(pattern.pattern_events, self.EVENTS)
+        self.assertEqual(batch.patterns, [('h', self.EVENTS), ('i', self.EVENTS[:1])])
+        self.assertEqual((config.config_type, config.value), (ConfigType.SPEED, 7))
+        self.assertEqual((status.battery_level, status.queue_length), (80, 5))
+        self.assertEqual((error.error_code, error.message), (ErrorCode.QUEUE_FULL, "Queue is full"))
+        self.assertEqual(heartbeat.msg_type, MessageType.HEARTBEAT)
+        self.assertIsInstance(pattern.payload, memoryview)
+        self.assertEqual(pattern.serialize(), messages[0].serialize())
+    
+    def test_arbitrary_chunks(self):
+        """Test every split of the stream gives the same messages."""
+        stream = b''.join(m.serialize() for m in self._messages())
+        expected = [bytes(m.payload) for m in MessageStreamDecoder().feed(stream)]
+        for size in (1, 2, 3, 5, 17, 64):
+            decoder = MessageStreamDecoder()
+            chunks = [stream[i:i + size] for i in range(0, len(stream), size)]
+            decoded = list(decoder.iter_decode(chunks))
+            self.assertEqual([bytes(m.payload) for m in decoded], expected, size)
+            self.assertEqual(decoder.pending, 0)
+            self.assertEqual(decoder.bytes_skipped, 0)
+    
+    def test_resync_after_corruption(self):
+        """Test the decoder skips a corrupted frame and recovers."""
+        first, second, third = (PatternMessage(c, self.EVENTS).serialize() for c in 'abc')
+        corrupted = bytearray(second)
+        corrupted[5] ^= 0xFF
+        stream = b'\xff\x00' + first + bytes(corrupted) + third
+        for size in (1, 4, len(stream)):
+            decoder = MessageStreamDecoder()
+            chunks = [stream[i:i + size] for i in range(0, len(stream), size)]
+            decoded = list(decoder.iter_decode(chunks))
+            self.assertEqual([m.char for m in decoded], ['a', 'c'], size)
+            self.assertGreaterEqual(decoder.checksum_errors, 1)
+            self.assertGreaterEqual(decoder.bytes_skipped, 2 + 1)
+    
+    def test_malformed_payload(self):
+        """Test a frame with a valid checksum but bad payload is dropped whole."""
+        bad = Message(MessageType.CONFIG, bytes([0x7F, 1])).serialize()
+        good = ConfigMessage(ConfigType.INTENSITY, 3).serialize()
+        decoder = MessageStreamDecoder()
+        decoded = decoder.feed(bad + good)
+        self.assertEqual([m.value for m in decoded], [3])
+        self.assertEqual(decoder.malformed, 1)
+        self.assertEqual(decoder.bytes_skipped, 0)
+    
+    def test_deserialize_pattern(self):
+        """Test pattern payloads round-trip."""
+        msg = PatternMessage('E', self.EVENTS)
+        self.assertEqual(PatternMessage.deserialize_pattern(msg.payload), ('E', self.EVENTS))
+
+
+class TestCodec(unittest.TestCase):
+    """Test the packed version-1 wire codec."""
+    
+    EVENTS = TestMessageStreamDecoder.EVENTS
+    
+    def _messages(self):
+        return TestMessageStreamDecoder._messages(self) + [
+            StatusResponseMessage(55, -70, 2, 0),
+            Message(MessageType.STATUS_REQUEST),
+            Message(MessageType.RESET),
+        ]
+    
+    def test_known_bytes(self):
+        """Test the packed layout of a pattern frame."""
+        frame = codec.encode(PatternMessage('E', self.EVENTS[1:]))
+        payload = b'E\x01' + b'\x03\x2c\x01\x50\xff'
+        header = bytes([0x10 | MessageType.PATTERN, len(payload)])
+        self.assertEqual(frame, header + payload + bytes([sum(header + payload) & 0xFF]))
+    
+    def test_event_size(self):
+        """Test events take 5 bytes instead of the padded 7."""
+        one = len(codec.encode(PatternMessage('E', self.EVENTS[:1])))
+        two = len(codec.encode(PatternMessage('E', self.EVENTS)))
+        self.assertEqual(two - one, codec.EVENT_SIZE)
+        self.assertEqual(codec.EVENT_SIZE, 5)
+        self.assertEqual(codec.pattern_size(2), two - 3)
+        self.assertLess(two, PatternMessage('E', self.EVENTS).serialized_size)
+    
+    def test_round_trip(self):
+        """Test every message type round-trips and re-serializes as version 1."""
+        for message in self._messages():
+            frame = codec.encode(message)
+            decoded = codec.decode(frame)
+            self.assertIsInstance(decoded, type(message))
+            self.assertEqual(decoded.msg_type, message.msg_type)
+            self.assertEqual(decoded.version, codec.CODEC_VERSION)
+            self.assertEqual(decoded.serialize(), frame)
+            self.assertEqual(codec.encode(decoded), frame)
+        status = codec.decode(codec.encode(StatusResponseMessage(55, -70, 2, 0)))
+        self.assertEqual(status.connection_quality, -70)
+    
+    def _unpacked_messages(self):
+        """Messages of types that only have the legacy layout."""
+        return [
+            Message(MessageType.FRAGMENT, b'\x00\x00\x01\x06'),
+            SequencedMessage(3, Message(MessageType.HEARTBEAT)),
+            AckMessage(3),
+            SymbolStreamMessage(1, b'cat'),
+            TableInfoMessage(1, 0x12345678),
+        ]
+    
+    def test_types_without_packed_layout(self):
+        """Test packed frames of legacy-only types are rejected, not crashed on."""
+        for message in self._unpacked_messages():
+            for version in codec.VERSION_CODECS:
+                code = message.msg_type | version << 4
+                self.assertIsNone(codec.decode(bytes([code, 0, code])), message)
+                with self.assertRaises(ValueError):
+                    codec.encode(message, version)
+            decoded = codec.decode(message.serialize())
+            self.assertEqual((decoded.msg_type, decoded.version), (message.msg_type, 0))
+            if message.msg_type == MessageType.EXTENDED:
+                self.assertIsInstance(decoded, type(message))
+            self.assertEqual(decoded.serialize(), message.serialize())
+    
+    def test_decode_legacy(self):
+        """Test decode() accepts legacy frames and rejects bad ones."""
+        message = PatternMessage('E', self.EVENTS)
+        decoded = codec.decode(message.serialize())
+        self.assertEqual((decoded.char, decoded.version), ('E', 0))
+        corrupted = bytearray(codec.encode(message))
+        corrupted[-1] ^= 0xFF
+        self.assertIsNone(codec.decode(bytes(corrupted)))
+        self.assertIsNone(codec.decode(codec.encode(message)[:-2]))
+    
+    def test_out_of_range(self):
+        """Test fields that do not fit the packed layout are rejected."""
+        too_long = [{'actuator': 0, 'time_offset': 0, 'duration': 300, 'intensity': 200}]
+        with self.assertRaises(ValueError):
+            codec.encode(PatternMessage('E', too_long))
+    
+    def test_mixed_stream(self):
+        """Test legacy and packed frames interleave on one stream."""
+        messages = self._messages()
+        stream = b''.join(
+            codec.encode(m) if i % 2 else m.serialize() for i, m in enumerate(messages)
+        )
+        for size in (1, 3, len(stream)):
+            decoder = MessageStreamDecoder()
+            chunks = [stream[i:i + size] for i in range(0, len(stream), size)]
+            decoded = list(decoder.iter_decode(chunks))
+            self.assertEqual([type(m) for m in decoded], [type(m) for m in messages], size)
+            self.assertEqual([m.version for m in decoded], [i % 2 for i in range(len(messages))])
+            self.assertEqual(decoded[1].patterns, messages[1].patterns)
+            self.assertEqual(decoder.bytes_skipped, 0)
+
+
+class TestPatternCache(unittest.TestCase):
+    """Test the device pattern cache protocol."""
+    
+    TEXT = "the quick brown fox jumps over the lazy dog and the cat sat on the mat"
+    
+    def _patterns(self, text):
+        encoder = PatternEncoder()
+        return [
+            (char, [
+                {
+                    'actuator': event.actuator_id,
+                    'time_offset': event.time_offset_ms,
+                    'duration': event.duration_ms,
+                    'intensity': event.intensity
+                }
+                for event in encoder.encode_character(char).events
+            ])
+            for char in text
+        ]
+    
+    def test_messages_round_trip(self):
+        """Test cache messages round-trip in both encodings."""
+        events = TestMessageStreamDecoder.EVENTS
+        messages = [
+            PatternDefineMessage(7, 'E', events),
+            PatternPlayMessage([7, 0, 255]),
+            PatternEvictMessage([]),
+        ]
+        for encode in (Message.serialize, codec.encode):
+            decoded = MessageStreamDecoder().feed(b''.join(encode(m) for m in messages))
+            define, play, evict = decoded
+            self.assertEqual((define.slot, define.char, define.pattern_events), (7, 'E', events))
+            self.assertEqual(play.slots, [7, 0, 255])
+            self.assertEqual(evict.slots, [])
+            self.assertEqual([m.serialize() for m in decoded], [encode(m) for m in messages])
+    
+    def test_mirror_lru(self):
+        """Test the mirror replaces the least recently used slot."""
+        mirror = PatternCacheMirror(capacity=2)
+        self.assertEqual(mirror.assign('a'), (0, None))
+        self.assertEqual(mirror.assign('b'), (1, None))
+        self.assertEqual(mirror.lookup('a'), 0)
+        self.assertEqual(mirror.assign('c'), (1, 'b'))
+        self.assertIsNone(mirror.lookup('b'))
+        self.assertEqual(mirror.stats()['evictions'], 1)
+        with self.assertRaises(ValueError):
+            PatternCacheMirror(capacity=257)
+    
+    def test_sender_matches_device(self):
+        """Test the device plays back exactly the sent patterns."""
+        patterns = self._patterns(self.TEXT)
+        for capacity in (4, 64):
+            sender = CachedPatternSender(capacity)
+            device = DevicePatternCache(capacity)
+            played = []
+            for message in sender.messages(patterns):
+                result, error = device.apply(codec.decode(codec.encode(message)))
+                self.assertIsNone(error)
+                played.extend(result)
+            self.assertEqual([pattern_key(e) for _, e in played], [pattern_key(e) for _, e in patterns])
+            self.assertLessEqual(len(device), capacity)
+    
+    def test_airtime(self):
+        """Test cached text needs far fewer bytes once the cache is warm."""
+        patterns = self._patterns(self.TEXT)
+        sender = CachedPatternSender(64)
+        sender.messages(patterns)
+        cached = sum(len(codec.encode(m)) for m in sender.messages(patterns))
+        uncached = sum(len(codec.encode(PatternMessage(c, e))) for c, e in patterns)
+        self.assertLess(cached * 10, uncached)
+    
+    def test_reset(self):
+        """Test reset clears the mirror and the device."""
+        patterns = self._patterns('abc')
+        sender = CachedPatternSender(8)
+        device = DevicePatternCache(8)
+        for message in sender.messages(patterns):
+            device.apply(message)
+        device.apply(sender.reset())
+        self.assertEqual((len(sender.mirror), len(device)), (0, 0))
+        _, error = device.apply(PatternPlayMessage([0]))
+        self.assertEqual(error.error_code, ErrorCode.UNKNOWN_SLOT)
+
+
+class TestFraming(unittest.TestCase):
+    """Test MTU packet framing and fragmentation."""
+    
+    def _batch(self, count):
+        patterns = TestPatternCache._patterns(self, 'abcdefghijklmnopqrstuvwxyz' * 3)[:count]
+        return PatternBatchMessage(patterns)
+    
+    def test_oversize_payload(self):
+        """Test payloads over 255 bytes raise instead of overflowing."""
+        batch = self._batch(60)
+        self.assertGreater(len(batch.payload), 255)
+        with self.assertRaises(ValueError):
+            batch.serialize()
+        with self.assertRaises(ValueError):
+            MessageSerializer().write_many([batch])
+        with self.assertRaises(ValueError):
+            codec.encode(batch)
+    
+    def test_coalesce_to_mtu(self):
+        """Test messages share packets up to the MTU."""
+        messages = [PatternMessage(c, TestMessageStreamDecoder.EVENTS) for c in 'abcdefghijklmnopqrst']
+        framer = MtuFramer(mtu=100, deadline_ms=1000, clock=lambda: 0.0)
+        packets = framer.add_many(messages) + framer.flush()
+        self.assertTrue(all(len(p) <= 97 for p in packets))
+        self.assertLess(len(packets), len(messages))
+        self.assertEqual(b''.join(packets), b''.join(m.serialize() for m in messages))
+    
+    def test_deadline(self):
+        """Test a lone keystroke is sent once its deadline passes."""
+        framer = MtuFramer(deadline_ms=10, clock=lambda: 0.0)
+        message = PatternMessage('a', TestMessageStreamDecoder.EVENTS)
+        self.assertEqual(framer.add(message, now=1.0), [])
+        self.assertAlmostEqual(framer.next_deadline, 1.010)
+        self.assertEqual(framer.poll(now=1.005), [])
+        self.assertEqual(framer.poll(now=1.010), [message.serialize()])
+        self.assertIsNone(framer.next_deadline)
+        immediate = MtuFramer(deadline_ms=0)
+        self.assertEqual(immediate.add(message), [message.serialize()])
+    
+    def test_fragment_reassembly(self):
+        """Test an oversize batch is fragmented and reassembled in both encodings."""
+        batch = self._batch(60)
+        for version in (None, codec.CODEC_VERSION):
+            framer = MtuFramer(mtu=64, deadline_ms=0, version=version)
+            packets = framer.add(batch) + framer.add(PatternMessage('z', TestMessageStreamDecoder.EVENTS))
+            self.assertTrue(all(len(p) <= 61 for p in packets))
+            self.assertEqual(framer.fragmented, 1)
+            decoder = MessageStreamDecoder()
+            decoded = list(decoder.iter_decode(packets))
+            self.assertEqual([type(m) for m in decoded], [PatternBatchMessage, PatternMessage])
+            self.assertEqual(decoded[0].patterns, batch.patterns)
+            self.assertEqual(decoder.reassembler.completed, 1)
+    
+    def test_lost_fragment(self):
+        """Test a transfer with a lost fragment is dropped, not misassembled."""
+        frames = fragment(self._batch(60), max_frame=64, transfer_id=3)
+        decoder = MessageStreamDecoder()
+        decoded = decoder.feed(b''.join(frames[:1] + frames[2:]))
+        self.assertEqual(decoded, [])
+        self.assertEqual(decoder.reassembler.dropped, 1)
+        self.assertEqual(decoder.feed(b''.join(frames))[0].patterns, self._batch(60).patterns)
+    
+    def test_reassembler_incomplete(self):
+        """Test the reassembler reports incomplete transfers."""
+        frames = fragment(self._batch(60), max_frame=128)
+        reassembler = FragmentReassembler({})
+        self.assertIs(reassembler.add(frames[0][2:-1]), INCOMPLETE)
+        self.assertIsNone(reassembler.add(b'\x00\x05\x02'))
+
+
+class TestCompactCodec(unittest.TestCase):
+    """Test the compact chord-step pattern format (version 2)."""
+    
+    CHORD = [{'actuator': a, 'time_offset': 0, 'duration': 200, 'intensity': 200} for a in range(8)]
+    
+    def test_chord_step(self):
+        """Test a chord packs into one step with implicit intensity."""
+        self.assertEqual(codec.pack_steps(self.CHORD), bytes([1, 0xFF, 0x00, 200]))
+        self.assertEqual(codec.unpack_steps(codec.pack_steps(self.CHORD)), (self.CHORD, 4))
+    
+    def test_steps_round_trip(self):
+        """Test deltas, varints and explicit intensities round-trip."""
+        events = [
+            {'actuator': 1, 'time_offset': 0, 'duration': 100, 'intensity': 255},
+            {'actuator': 5, 'time_offset': 0, 'duration': 100, 'intensity': 200},
+            {'actuator': 2, 'time_offset': 150, 'duration': 80, 'intensity': 200},
+            {'actuator': 7, 'time_offset': 1150, 'duration': 80, 'intensity': 10},
+        ]
+        packed = codec.pack_steps(events)
+        decoded, end = codec.unpack_steps(packed)
+        self.assertEqual(end, len(packed))
+        key = lambda e: (e['time_offset'], e['actuator'])
+        self.assertEqual(sorted(decoded, key=key), sorted(events, key=key))
+        with self.assertRaises(ValueError):
+            codec.pack_steps([{'actuator': 8, 'time_offset': 0, 'duration': 1}])
+    
+    def test_messages(self):
+        """Test pattern-carrying messages round-trip as version 2."""
+        messages = [
+            PatternMessage('.', self.CHORD),
+            PatternBatchMessage([('.', self.CHORD), ('E', TestMessageStreamDecoder.EVENTS)]),
+            PatternDefineMessage(3, '.', self.CHORD),
+            ConfigMessage(ConfigType.SPEED, 7),
+        ]
+        stream = b''.join(codec.encode(m, codec.COMPACT_VERSION) for m in messages)
+        decoded = MessageStreamDecoder().feed(stream)
+        self.assertEqual([type(m) for m in decoded], [type(m) for m in messages])
+        self.assertEqual([m.version for m in decoded], [codec.COMPACT_VERSION] * 4)
+        self.assertEqual(decoded[0].pattern_events, self.CHORD)
+        self.assertEqual(decoded[1].patterns[1][1], TestMessageStreamDecoder.EVENTS)
+        self.assertEqual(decoded[2].slot, 3)
+        self.assertEqual(b''.join(m.serialize() for m in decoded), stream)
+        self.assertEqual(len(codec.encode(messages[0], codec.COMPACT_VERSION)), 3 + 5)
+        self.assertEqual(len(codec.encode(messages[0])), 3 + 2 + 8 * 5)
+    
+    def test_truncated(self):
+        """Test truncated steps are rejected."""
+        frame = codec.encode(PatternMessage('.', self.CHORD), codec.COMPACT_VERSION)
+        payload = frame[2:-2]
+        self.assertIsNone(codec.decode_payload(MessageType.PATTERN, payload, codec.COMPACT_VERSION))
+
+
+class TestReliableDelivery(unittest.TestCase):
+    """Test sliding-window acknowledged delivery."""
+    
+    def _transfer(self, messages, forward, backward, window=16, timeout_ms=60, tick=0.002):
+        """Send messages over simulated links; returns (delivered, sender, receiver, elapsed)."""
+        sender = ReliableSender(window, timeout_ms)
+        receiver = ReliableReceiver(window)
+        host, device = MessageStreamDecoder(), MessageStreamDecoder()
+        delivered = []
+        now = 0.0
+        for message in messages:
+            for out in sender.send(message, now):
+                forward.send(out.serialize(), now)
+        while not sender.idle:
+            self.assertLess(now, 60.0, "transfer stalled")
+            now += tick
+            for packet in forward.receive(now):
+                for received in device.feed(packet):
+                    ready, ack = receiver.receive(received)
+                    delivered.extend(ready)
+                    backward.send(ack.serialize(), now)
+            for packet in backward.receive(now):
+                for ack in host.feed(packet):
+                    for out in sender.on_ack(ack, now):
+                        forward.send(out.serialize(), now)
+            for out in sender.poll(now):
+                forward.send(out.serialize(), now)
+        return delivered, sender, receiver, now
+    
+    def _messages(self, count):
+        return [PatternMessage(chr(32 + i % 90), TestMessageStreamDecoder.EVENTS[:1 + i % 2])
+                for i in range(count)]
+    
+    def test_ack_bitmap(self):
+        """Test cumulative and selective acknowledgements round-trip."""
+        ack = AckMessage(250, (252, 255, 3))
+        self.assertEqual(ack.payload, bytes([250, 0b00010010, 0b00000001]))
+        decoded = AckMessage.from_payload(ack.payload)
+        self.assertEqual((decoded.next_seq, decoded.selective), (250, (252, 255, 3)))
+        self.assertEqual(AckMessage(7).payload, bytes([7]))
+    
+    def test_sequenced_round_trip(self):
+        """Test SEQ_DATA wraps messages of any encoding version."""
+        message = PatternMessage('E', TestMessageStreamDecoder.EVENTS)
+        for version in (None, codec.CODEC_VERSION, codec.COMPACT_VERSION):
+            wrapped = SequencedMessage(200, message, version)
+            decoded, = MessageStreamDecoder().feed(wrapped.serialize())
+            self.assertIsInstance(decoded, SequencedMessage)
+            self.assertEqual(decoded.seq, 200)
+            self.assertEqual(decoded.message.pattern_events, message.pattern_events)
+            self.assertEqual(decoded.serialize(), wrapped.serialize())
+    
+    def test_packed_framer(self):
+        """Test SEQ_DATA and ACK pass through framers with a packed encoding."""
+        message = PatternMessage('E', TestMessageStreamDecoder.EVENTS)
+        for version in (codec.CODEC_VERSION, codec.COMPACT_VERSION):
+            framer = MtuFramer(deadline_ms=0, version=version)
+            packets = framer.add_many([SequencedMessage(3, message, version), AckMessage(250, (252,))], 0.0)
+            sequenced, ack = MessageStreamDecoder().feed(b''.join(packets))
+            self.assertEqual(sequenced.seq, 3)
+            self.assertEqual(sequenced.message.version, version)
+            self.assertEqual(sequenced.message.pattern_events, message.pattern_events)
+            self.assertEqual((ack.next_seq, ack.selective), (250, (252,)))
+    
+    def test_window(self):
+        """Test the sender keeps at most window messages in flight."""
+        sender = ReliableSender(window=4)
+        sent = [m for message in self._messages(10) for m in sender.send(message, 0.0)]
+        self.assertEqual([m.seq for m in sent], [0, 1, 2, 3])
+        self.assertEqual((sender.in_flight, sender.queued), (4, 6))
+        sent = sender.on_ack(AckMessage(2), 0.0)
+        self.assertEqual([m.seq for m in sent], [4, 5])
+        with self.assertRaises(ValueError):
+            ReliableSender(window=129)
+    
+    def test_retransmits_only_missing(self):
+        """Test a timeout resends only unacknowledged messages."""
+        sender = ReliableSender(window=8, timeout_ms=50)
+        for message in self._messages(5):
+            sender.send(message, 0.0)
+        sender.on_ack(AckMessage(1, (3,)), 0.01)
+        self.assertEqual(sender.poll(0.04), [])
+        self.assertEqual([m.seq for m in sender.poll(0.05)], [1, 2, 4])
+        self.assertAlmostEqual(sender.next_deadline, 0.1)
+    
+    def test_in_order_exactly_once(self):
+        """Test the receiver buffers early messages and drops duplicates."""
+        sender = ReliableSender(window=8)
+        wrapped = [m for message in self._messages(4) for m in sender.send(message, 0.0)]
+        receiver = ReliableReceiver(window=8)
+        ready, ack = receiver.receive(wrapped[1])
+        self.assertEqual((ready, ack.next_seq, ack.selective), ([], 0, (1,)))
+        ready, ack = receiver.receive(wrapped[0])
+        self.assertEqual(len(ready), 2)
+        self.assertEqual(ack.next_seq, 2)
+        receiver.receive(wrapped[0])
+        self.assertEqual(receiver.duplicates, 1)
+    
+    def test_lossy_link(self):
+        """Test every message arrives once and in order over a lossy link."""
+        messages = self._messages(600)
+        forward = LossyLink(loss=0.2, delay_ms=10, jitter_ms=5, corrupt=0.05, duplicate=0.05, seed=1)
+        backward = LossyLink(loss=0.2, delay_ms=10, jitter_ms=5, seed=2)
+        delivered, sender, receiver, _ = self._transfer(messages, forward, backward)
+        self.assertEqual([m.char for m in delivered], [m.char for m in messages])
+        self.assertEqual([m.pattern_events for m in delivered], [m.pattern_events for m in messages])
+        self.assertGreater(sender.retransmitted, 0)
+        self.assertGreater(forward.dropped, 0)
+    
+    def test_pipelining(self):
+        """Test a window keeps the link busy instead of one round trip per message."""
+        messages = self._messages(200)
+        _, _, _, pipelined = self._transfer(messages, LossyLink(), LossyLink(), window=32)
+        _, _, _, stop_and_wait = self._transfer(messages, LossyLink(), LossyLink(), window=1)
+        self.assertLess(pipelined * 10, stop_and_wait)
+
+
+class TestSymbolStream(unittest.TestCase):
+    """Test symbol streams expanded on the device."""
+    
+    TEXT = "Hello world. The quick brown fox jumps over the lazy dog 42 times! "
+    
+    def _negotiated(self, table_id, device=None):
+        sender = SymbolStreamSender(table_id)
+        device = device or SymbolStreamExpander()
+        reply, = MessageStreamDecoder().feed(device.table_info(sender.table_query()).serialize())
+        sender.on_table_info(reply)
+        return sender, device
+    
+    def test_messages_round_trip(self):
+        """Test SYMBOL_STREAM and TABLE_INFO decode from the wire."""
+        messages = [SymbolStreamMessage(3, b'abc'), TableInfoMessage(8, 0xDEADBEEF)]
+        stream, info = MessageStreamDecoder().feed(b''.join(m.serialize() for m in messages))
+        self.assertEqual((stream.table_id, stream.symbols), (3, b'abc'))
+        self.assertEqual((info.table_id, info.digest), (8, 0xDEADBEEF))
+        self.assertEqual(MessageStreamDecoder().feed(Message(MessageType.EXTENDED, b'\x7f').serialize()), [])
+    
+    def test_expands_like_encoders(self):
+        """Test every table expands to the encoder's own patterns."""
+        encoders = {
+            'letter': PatternEncoder(),
+            'phoneme': PhonemeEncoder(),
+            'symbol_stream': SymbolStreamEncoder(),
+        }
+        for table_id in SYMBOL_TABLE_BUILDERS:
+            table = get_symbol_table(table_id)
+            name, _, mode = table.name.partition(':')
+            encoder = encoders.get(name) or SingleByteEncoder(mode)
+            sender, device = self._negotiated(table_id)
+            self.assertTrue(sender.negotiated, table.name)
+            patterns = []
+            for message in sender.messages(self.TEXT * 10):
+                decoded, = MessageStreamDecoder().feed(message.serialize())
+                expanded, error = device.expand(decoded)
+                self.assertIsNone(error)
+                patterns.extend(expanded)
+            self.assertEqual(patterns, encoder.encode_text(self.TEXT * 10), table.name)
+    
+    def test_negotiation(self):
+        """Test symbol streams are refused without a matching device table."""
+        sender, device = self._negotiated(1, SymbolStreamExpander([2]))
+        self.assertFalse(sender.negotiated)
+        with self.assertRaises(ValueError):
+            sender.messages('hi')
+        patterns, error = device.expand(SymbolStreamMessage(1, b'hi'))
+        self.assertEqual((patterns, error.error_code), ([], ErrorCode.UNKNOWN_TABLE))
+        self.assertNotEqual(get_symbol_table(3).digest, get_symbol_table(7).digest)
+    
+    def test_bandwidth(self):
+        """Test symbol streams need about 20x fewer bytes than patterns."""
+        sender, _ = self._negotiated(1)
+        text = self.TEXT * 20
+        symbol_bytes = sum(len(m.serialize()) for m in sender.messages(text))
+        pattern_bytes = sum(len(codec.encode(PatternMessage('x', pattern_events(p))))
+                            for p in PatternEncoder().encode_text(text))
+        self.assertGreater(pattern_bytes, 15 * symbol_bytes)
+
 if __name__ == '__main__':
     unittest.main()
 